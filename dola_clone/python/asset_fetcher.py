@@ -0,0 +1,990 @@
+import asyncio
+import base64
+import shutil
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+import requests
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from host_concurrency import (
+    BACKOFF_BASE_SECONDS,
+    BACKOFF_MAX_SECONDS,
+    DEFAULT_HOST_INITIAL,
+    DEFAULT_HOST_MAX,
+    LATENCY_TOLERANCE,
+    THROTTLE_STATUSES,
+    HostConcurrency,
+    classify_status,
+    parse_retry_after,
+)
+from asset_storage import (
+    DEFAULT_STREAM_THRESHOLD,
+    STREAM_CHUNK_SIZE,
+    write_bytes,
+    write_chunks,
+)
+
+
+FETCH_BACKENDS = ("page", "request")
+
+# Upper bound on the base64 payload returned by a single chunk call
+DEFAULT_BATCH_CHUNK_BYTES = 8 * 1024 * 1024
+
+# How long a chunk call keeps collecting finished downloads before returning
+DEFAULT_BATCH_LINGER_MS = 500
+
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# Keep the in-page host controller on the same settings as the Python one
+HOST_CONTROL_OPTIONS = {
+    "initial": DEFAULT_HOST_INITIAL,
+    "maximum": DEFAULT_HOST_MAX,
+    "latencyTolerance": LATENCY_TOLERANCE,
+    "backoffBase": BACKOFF_BASE_SECONDS,
+    "backoffMax": BACKOFF_MAX_SECONDS,
+    "throttleStatuses": sorted(THROTTLE_STATUSES),
+}
+
+# Asset types the request backend always downloads as a stream
+STREAMED_ASSET_TYPES = {"videos"}
+
+# Request client errors that mean the host dropped or refused the connection
+CONNECTION_ERROR_MARKERS = (
+    "ECONNRESET",
+    "ECONNREFUSED",
+    "ETIMEDOUT",
+    "EPIPE",
+    "socket hang up",
+    "net::ERR_CONNECTION",
+    "net::ERR_TIMED_OUT",
+)
+
+
+def is_host_pushback(error):
+    """Whether a failed fetch looks like the host timing out or dropping connections.
+
+    Anything else, such as a disk error or a closed page, is local and
+    won't get better by backing off.
+    """
+    if isinstance(
+        error,
+        (
+            asyncio.TimeoutError,
+            PlaywrightTimeoutError,
+            requests.Timeout,
+            requests.ConnectionError,
+        ),
+    ):
+        return True
+    message = str(error)
+    return any(marker in message for marker in CONNECTION_ERROR_MARKERS)
+
+
+def content_length(response):
+    """A response's Content-Length, or 0 when it doesn't send one"""
+    length = response.headers.get("content-length", "")
+    return int(length) if length.isdigit() else 0
+
+
+def requests_proxies(proxy):
+    """A Playwright proxy setting ({"server", "username", "password"}) for requests"""
+    if not proxy:
+        return None
+    server = proxy["server"]
+    if "://" not in server:
+        server = "http://" + server
+    if proxy.get("username"):
+        parts = urlsplit(server)
+        credentials = quote(proxy["username"], safe="")
+        if proxy.get("password"):
+            credentials += ":" + quote(proxy["password"], safe="")
+        server = f"{parts.scheme}://{credentials}@{parts.netloc}{parts.path}"
+    return {"http": server, "https": server}
+
+
+# Registered with the extraction scripts; provides window.downloadAssetAsBase64
+BATCH_FETCH_SCRIPT = r"""
+        window.__assetBatches = window.__assetBatches || {};
+        window.__assetBatchSeq = window.__assetBatchSeq || 0;
+        window.__assetStreams = window.__assetStreams || {};
+        window.__assetStreamSeq = window.__assetStreamSeq || 0;
+
+        // Per-host AIMD limits, the in-page twin of host_concurrency.HostConcurrency
+        window.__hostControl = window.__hostControl || {
+            initial: 2,
+            maximum: 16,
+            latencyTolerance: 2.0,
+            backoffBase: 0.5,
+            backoffMax: 10.0,
+            throttleStatuses: [429, 500, 502, 503, 504],
+            timeoutMs: 30000,
+            hosts: {}
+        };
+
+        window.configureHostControl = function(options = {}) {
+            Object.assign(window.__hostControl, options);
+        };
+
+        window.hostSlotState = function(url) {
+            let host;
+            try {
+                host = new URL(url, location.href).host;
+            } catch (error) {
+                host = url;
+            }
+
+            const control = window.__hostControl;
+            if (!control.hosts[host]) {
+                control.hosts[host] = {
+                    limit: control.initial,
+                    peakLimit: control.initial,
+                    inFlight: 0,
+                    pausedUntil: 0,
+                    consecutiveThrottles: 0,
+                    bestLatency: null,
+                    latency: null,
+                    ok: 0,
+                    throttled: 0,
+                    failed: 0,
+                    waiters: []
+                };
+            }
+            return control.hosts[host];
+        };
+
+        window.classifyStatus = function(status) {
+            if (status >= 200 && status < 400) {
+                return 'ok';
+            }
+            if (window.__hostControl.throttleStatuses.includes(status) || status >= 500) {
+                return 'throttled';
+            }
+            return 'failed';
+        };
+
+        // Wait until the host is neither paused nor at its limit
+        window.acquireHostSlot = async function(url) {
+            const state = window.hostSlotState(url);
+            while (true) {
+                const pause = state.pausedUntil - Date.now();
+                if (pause > 0) {
+                    await new Promise(resolve => setTimeout(resolve, pause));
+                    continue;
+                }
+                if (state.inFlight < Math.max(1, Math.floor(state.limit))) {
+                    break;
+                }
+                await new Promise(resolve => state.waiters.push(resolve));
+            }
+
+            state.inFlight++;
+            return performance.now();
+        };
+
+        window.releaseHostSlot = function(url, started, outcome, retryAfter = null) {
+            const control = window.__hostControl;
+            const state = window.hostSlotState(url);
+            const latency = (performance.now() - started) / 1000;
+            state.inFlight--;
+
+            if (outcome === 'ok') {
+                state.ok++;
+                state.consecutiveThrottles = 0;
+                state.latency = state.latency === null ? latency : state.latency * 0.8 + latency * 0.2;
+                if (state.bestLatency === null || latency < state.bestLatency) {
+                    state.bestLatency = latency;
+                }
+
+                // Additive increase while the host keeps answering quickly
+                if (state.latency <= state.bestLatency * control.latencyTolerance + 0.05) {
+                    state.limit = Math.min(control.maximum, state.limit + 1 / state.limit);
+                    state.peakLimit = Math.max(state.peakLimit, state.limit);
+                }
+            } else if (outcome === 'throttled') {
+                // Multiplicative decrease, and a pause before anyone retries
+                state.throttled++;
+                state.consecutiveThrottles++;
+                state.limit = Math.max(1, state.limit / 2);
+                let backoff = Math.min(
+                    control.backoffMax,
+                    control.backoffBase * 2 ** (state.consecutiveThrottles - 1)
+                );
+                if (retryAfter !== null) {
+                    backoff = Math.min(control.backoffMax, Math.max(backoff, retryAfter));
+                }
+                state.pausedUntil = Math.max(state.pausedUntil, Date.now() + backoff * 1000);
+            } else {
+                state.failed++;
+            }
+
+            state.waiters.splice(0).forEach(resolve => resolve());
+        };
+
+        window.describeHosts = function() {
+            const hosts = {};
+            for (const [host, state] of Object.entries(window.__hostControl.hosts)) {
+                hosts[host] = {
+                    limit: Math.round(state.limit * 100) / 100,
+                    peak_limit: Math.round(state.peakLimit * 100) / 100,
+                    in_flight: state.inFlight,
+                    latency_ms: state.latency === null ? null : Math.round(state.latency * 1000),
+                    ok: state.ok,
+                    throttled: state.throttled,
+                    failed: state.failed
+                };
+            }
+            return hosts;
+        };
+
+        // Fetch one asset under its host's limit. Bodies at or above
+        // streamThreshold stay in the page as a stream handle that Python
+        // reads back in chunks; smaller ones come back as a data URL.
+        window.downloadAssetStreamed = async function(url, streamThreshold = Infinity, retries = 3) {
+            let error = 'Unknown error';
+            for (let i = 0; i < retries; i++) {
+                const started = await window.acquireHostSlot(url);
+                const abort = new AbortController();
+                const timer = setTimeout(() => abort.abort(), window.__hostControl.timeoutMs);
+                let outcome = null;
+                let retryAfter = null;
+
+                try {
+                    const response = await fetch(url, {
+                        mode: 'cors',
+                        credentials: 'omit',
+                        signal: abort.signal
+                    });
+
+                    if (!response.ok) {
+                        outcome = window.classifyStatus(response.status);
+                        const header = parseFloat(response.headers.get('retry-after'));
+                        retryAfter = isNaN(header) ? null : header;
+                        throw new Error(`HTTP ${response.status}`);
+                    }
+
+                    // Validators for the HTTP cache; cross-origin ETags are only
+                    // readable when the server exposes them
+                    const etag = response.headers.get('etag');
+                    const lastModified = response.headers.get('last-modified');
+
+                    const blob = await response.blob();
+                    outcome = 'ok';
+                    if (blob.size >= streamThreshold) {
+                        const streamId = `stream_${++window.__assetStreamSeq}`;
+                        window.__assetStreams[streamId] = blob;
+                        return {
+                            success: true,
+                            streamId: streamId,
+                            contentType: blob.type,
+                            size: blob.size,
+                            etag: etag,
+                            lastModified: lastModified,
+                            url: url
+                        };
+                    }
+
+                    return await new Promise((resolve) => {
+                        const reader = new FileReader();
+                        reader.onloadend = () => resolve({
+                            success: true,
+                            data: reader.result,
+                            contentType: blob.type,
+                            size: blob.size,
+                            etag: etag,
+                            lastModified: lastModified,
+                            url: url
+                        });
+                        reader.onerror = () => resolve({
+                            success: false,
+                            error: 'FileReader error',
+                            url: url
+                        });
+                        reader.readAsDataURL(blob);
+                    });
+                } catch (e) {
+                    if (e.name === 'AbortError') {
+                        // Timeouts count as the host pushing back
+                        error = 'Timed out';
+                        outcome = 'throttled';
+                    } else {
+                        error = e.message;
+                        // fetch() rejects with a TypeError when CORS or the
+                        // network blocks the request; that is not the host
+                        outcome = outcome || 'failed';
+                    }
+                    if (outcome === 'failed') {
+                        // A 404, 403 or CORS block won't get better by asking again
+                        break;
+                    }
+                } finally {
+                    clearTimeout(timer);
+                    window.releaseHostSlot(url, started, outcome, retryAfter);
+                }
+            }
+
+            return {success: false, error: error, url: url};
+        };
+
+        window.downloadAssetAsBase64 = function(url, retries = 3) {
+            return window.downloadAssetStreamed(url, Infinity, retries);
+        };
+
+        // Base64 of one slice of a streamed body
+        window.readAssetStreamChunk = function(streamId, offset, length) {
+            const blob = window.__assetStreams[streamId];
+            if (!blob) {
+                return Promise.resolve(null);
+            }
+
+            return new Promise((resolve, reject) => {
+                const reader = new FileReader();
+                reader.onloadend = () => resolve(reader.result.split(',')[1] || '');
+                reader.onerror = () => reject(new Error('FileReader error'));
+                reader.readAsDataURL(blob.slice(offset, offset + length));
+            });
+        };
+
+        window.closeAssetStream = function(streamId) {
+            delete window.__assetStreams[streamId];
+        };
+
+        window.downloadAssetForBatch = function(url, streamThreshold) {
+            return window.downloadAssetStreamed(url, streamThreshold || Infinity);
+        };
+
+        // Start fetching a list of {url, type} items with bounded parallelism
+        window.startAssetBatch = function(items, options = {}) {
+            const concurrency = Math.max(1, options.concurrency || 8);
+            const typeLimits = options.typeLimits || {};
+            const streamThreshold = options.streamThreshold || 0;
+            window.configureHostControl(options.hostControl || {});
+            const id = `batch_${++window.__assetBatchSeq}`;
+            const batch = {
+                ready: [],
+                readyBytes: 0,
+                remaining: items.length,
+                waiters: []
+            };
+            window.__assetBatches[id] = batch;
+
+            const queue = items.map(item => typeof item === 'string' ? {url: item, type: ''} : item);
+            const active = {};
+            const slotWaiters = [];
+
+            const notify = () => batch.waiters.splice(0).forEach(resolve => resolve());
+            const hasRoom = item => {
+                const limit = typeLimits[item.type];
+                return !limit || (active[item.type] || 0) < limit;
+            };
+
+            const worker = async () => {
+                while (queue.length) {
+                    const index = queue.findIndex(hasRoom);
+                    if (index === -1) {
+                        await new Promise(resolve => slotWaiters.push(resolve));
+                        continue;
+                    }
+
+                    const item = queue.splice(index, 1)[0];
+                    active[item.type] = (active[item.type] || 0) + 1;
+
+                    let result;
+                    try {
+                        result = await window.downloadAssetForBatch(item.url, streamThreshold);
+                    } catch (error) {
+                        result = {success: false, error: error.message, url: item.url};
+                    }
+                    result = result || {success: false, error: 'No result', url: item.url};
+
+                    active[item.type]--;
+                    slotWaiters.splice(0).forEach(resolve => resolve());
+
+                    batch.ready.push(result);
+                    batch.readyBytes += result.data ? result.data.length : 0;
+                    batch.remaining--;
+                    notify();
+                }
+            };
+
+            for (let i = 0; i < Math.min(concurrency, queue.length); i++) {
+                worker();
+            }
+
+            return {id: id, total: items.length};
+        };
+
+        // Return finished results, capped at maxBytes of base64 per call
+        window.takeAssetBatchChunk = async function(id, maxBytes, lingerMs = 500) {
+            const batch = window.__assetBatches[id];
+            if (!batch) {
+                return {results: [], done: true, bytes: 0};
+            }
+
+            const waitForChange = (ms) => new Promise(resolve => {
+                const timer = setTimeout(resolve, ms);
+                batch.waiters.push(() => {
+                    clearTimeout(timer);
+                    resolve();
+                });
+            });
+
+            while (!batch.ready.length && batch.remaining > 0) {
+                await waitForChange(1000);
+            }
+
+            // Linger briefly so one round trip carries several results
+            const deadline = Date.now() + lingerMs;
+            while (batch.remaining > 0 && batch.readyBytes < maxBytes && Date.now() < deadline) {
+                await waitForChange(deadline - Date.now());
+            }
+
+            const results = [];
+            let bytes = 0;
+            while (batch.ready.length) {
+                const next = batch.ready[0];
+                const size = next.data ? next.data.length : 0;
+                if (results.length && bytes + size > maxBytes) {
+                    break;
+                }
+                results.push(batch.ready.shift());
+                batch.readyBytes -= size;
+                bytes += size;
+            }
+
+            const done = batch.remaining === 0 && batch.ready.length === 0;
+            if (done) {
+                delete window.__assetBatches[id];
+            }
+
+            return {
+                results: results,
+                done: done,
+                bytes: bytes,
+                hosts: window.describeHosts()
+            };
+        };
+"""
+
+
+async def fetch_assets_in_page(
+    page,
+    items,
+    concurrency=DEFAULT_BATCH_CONCURRENCY,
+    type_limits=None,
+    max_chunk_bytes=DEFAULT_BATCH_CHUNK_BYTES,
+    linger_ms=DEFAULT_BATCH_LINGER_MS,
+    stats=None,
+    stream_threshold=DEFAULT_STREAM_THRESHOLD,
+):
+    """Fetch many assets inside the page and yield each result as its chunk arrives.
+
+    items is a list of URLs or {"url", "type"} dicts. Results arrive in
+    completion order, not in the order of items. Bodies at or above
+    stream_threshold come back with a streamId instead of data; read
+    them with iter_page_stream.
+
+    If the batch itself fails, e.g. because a navigation reset the
+    page's context or a chunk went over the CDP message limit, the URLs
+    without a result yet are fetched one at a time instead.
+    """
+    if not items:
+        return
+
+    pending = dict.fromkeys(
+        item if isinstance(item, str) else item["url"] for item in items
+    )
+    try:
+        batch = await page.evaluate(
+            "([items, options]) => window.startAssetBatch(items, options)",
+            [
+                items,
+                {
+                    "concurrency": concurrency,
+                    "typeLimits": type_limits or {},
+                    "streamThreshold": stream_threshold,
+                    "hostControl": HOST_CONTROL_OPTIONS,
+                },
+            ],
+        )
+
+        while True:
+            chunk = await page.evaluate(
+                "([id, maxBytes, lingerMs]) => window.takeAssetBatchChunk(id, maxBytes, lingerMs)",
+                [batch["id"], max_chunk_bytes, linger_ms],
+            )
+            if stats is not None:
+                stats["round_trips"] = stats.get("round_trips", 0) + 1
+                stats["hosts"] = chunk.get("hosts", {})
+
+            for result in chunk.get("results", []):
+                pending.pop(result.get("url"), None)
+                yield result
+
+            if chunk.get("done"):
+                return
+    except Exception:
+        if stats is not None:
+            stats["batch_failures"] = stats.get("batch_failures", 0) + 1
+
+    async for result in fetch_assets_singly(
+        page, pending, concurrency, stream_threshold, stats
+    ):
+        yield result
+
+
+async def fetch_assets_singly(
+    page,
+    urls,
+    concurrency=DEFAULT_BATCH_CONCURRENCY,
+    stream_threshold=DEFAULT_STREAM_THRESHOLD,
+    stats=None,
+):
+    """One in-page fetch per URL, yielding results in completion order"""
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch(url):
+        async with slots:
+            if stats is not None:
+                stats["round_trips"] = stats.get("round_trips", 0) + 1
+            try:
+                result = await page.evaluate(
+                    "([url, threshold]) => window.downloadAssetForBatch(url, threshold)",
+                    [url, stream_threshold],
+                )
+            except Exception as e:
+                return {"success": False, "error": str(e), "url": url}
+            return {**result, "url": url}
+
+    for next_result in asyncio.as_completed([fetch(url) for url in urls]):
+        yield await next_result
+
+
+async def iter_page_stream(page, result, chunk_size=STREAM_CHUNK_SIZE):
+    """Read a body kept in the page by downloadAssetStreamed, chunk by chunk"""
+    stream_id = result["streamId"]
+    try:
+        for offset in range(0, result["size"], chunk_size):
+            data = await page.evaluate(
+                "([id, offset, length]) => window.readAssetStreamChunk(id, offset, length)",
+                [stream_id, offset, chunk_size],
+            )
+            if data is None:
+                raise Exception(f"Stream {stream_id} is no longer available")
+            yield base64.b64decode(data)
+    finally:
+        try:
+            await page.evaluate("(id) => window.closeAssetStream(id)", stream_id)
+        except Exception:
+            pass
+
+
+class PageBatchFetcher:
+    """Serve per-URL fetches from in-page batches started ahead of time"""
+
+    def __init__(
+        self,
+        page,
+        concurrency=DEFAULT_BATCH_CONCURRENCY,
+        type_limits=None,
+        max_chunk_bytes=DEFAULT_BATCH_CHUNK_BYTES,
+        stream_threshold=DEFAULT_STREAM_THRESHOLD,
+    ):
+        self.page = page
+        self.concurrency = concurrency
+        self.type_limits = type_limits or {}
+        self.max_chunk_bytes = max_chunk_bytes
+        self.stream_threshold = stream_threshold
+        self.futures = {}
+        self.pumps = []
+        self.stats = {"round_trips": 0}
+
+    def prefetch(self, items):
+        """Start one in-page batch for every (url, asset_type) not already requested"""
+        loop = asyncio.get_running_loop()
+        batch_items = []
+        for url, asset_type in items:
+            if url in self.futures:
+                continue
+            self.futures[url] = loop.create_future()
+            batch_items.append({"url": url, "type": asset_type})
+
+        if batch_items:
+            self.pumps.append(asyncio.create_task(self._pump(batch_items)))
+
+    async def _pump(self, batch_items):
+        error = "Missing from batch result"
+        try:
+            async for result in fetch_assets_in_page(
+                self.page,
+                batch_items,
+                concurrency=self.concurrency,
+                type_limits=self.type_limits,
+                max_chunk_bytes=self.max_chunk_bytes,
+                stats=self.stats,
+                stream_threshold=self.stream_threshold,
+            ):
+                future = self.futures.get(result.get("url"))
+                if future and not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            error = str(e)
+        finally:
+            for item in batch_items:
+                future = self.futures.get(item["url"])
+                if future and not future.done():
+                    future.set_result(
+                        {"success": False, "error": error, "url": item["url"]}
+                    )
+
+    async def fetch(self, url):
+        """Return the download result for url, fetching it alone if it wasn't prefetched"""
+        future = self.futures.get(url)
+        if future is None:
+            self.stats["round_trips"] += 1
+            return await self.page.evaluate(
+                "([url, threshold]) => window.downloadAssetForBatch(url, threshold)",
+                [url, self.stream_threshold],
+            )
+
+        try:
+            return await future
+        finally:
+            # Release the payload once the caller has it
+            self.futures.pop(url, None)
+
+    def iter_stream(self, result):
+        """Chunks of a result that came back as a stream handle"""
+        return iter_page_stream(self.page, result)
+
+    async def close(self):
+        """Stop any batch still running, e.g. after the page navigated away"""
+        for pump in self.pumps:
+            if not pump.done():
+                pump.cancel()
+        await asyncio.gather(*self.pumps, return_exceptions=True)
+        self.pumps = []
+        self.futures = {}
+
+
+class FetchStatusError(Exception):
+    """A non-2xx answer, kept apart from network errors for the host controller"""
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class RequestContextFetcher:
+    """Fetch assets with the browser context's request client, straight to disk.
+
+    Requests share the context's cookies and extra headers but skip CORS
+    and base64, so cross-origin CDN assets work and bytes are never
+    inflated. Each host gets an adaptive concurrency limit; failed URLs
+    are retried through the in-page fallback.
+
+    Streamed downloads leave the browser, so headers and proxy have to
+    repeat the context's extra_http_headers and proxy settings.
+    """
+
+    def __init__(
+        self,
+        page,
+        staging_dir,
+        fallback=None,
+        retries=3,
+        timeout=30000,
+        stream_threshold=DEFAULT_STREAM_THRESHOLD,
+        headers=None,
+        proxy=None,
+    ):
+        self.page = page
+        self.request = page.context.request
+        self.staging_dir = Path(staging_dir)
+        self.fallback = fallback
+        self.retries = retries
+        self.timeout = timeout
+        self.stream_threshold = stream_threshold
+        # requests negotiates and decodes its own content encodings
+        self.headers = {
+            name: value
+            for name, value in (headers or {}).items()
+            if name.lower() != "accept-encoding"
+        }
+        self.proxies = requests_proxies(proxy)
+        self.asset_types = {}
+        self.user_agent = None
+        self.counter = 0
+        self.hosts = HostConcurrency()
+        self.stats = {
+            "round_trips": 0,
+            "requests": 0,
+            "fallbacks": 0,
+            "streamed": 0,
+            "hosts": {},
+        }
+
+    def prefetch(self, items):
+        """Nothing to start ahead of time; remember types to pick streamed downloads"""
+        for url, asset_type in items:
+            self.asset_types[url] = asset_type
+
+    async def fetch(self, url):
+        """Download url into the staging directory and return its result"""
+        error = "Unknown error"
+        for attempt in range(self.retries):
+            # Retries wait in acquire() until the host's backoff has passed
+            started = await self.hosts.acquire(url)
+            outcome = "failed"
+            retry_after = None
+            try:
+                if (
+                    self.asset_types.get(url) in STREAMED_ASSET_TYPES
+                    or await self._is_large(url)
+                ):
+                    result = await self._stream_once(url)
+                else:
+                    result = await self._fetch_once(url)
+                outcome = "ok"
+                return result
+            except FetchStatusError as e:
+                error = str(e)
+                outcome = classify_status(e.status)
+                retry_after = e.retry_after
+                if outcome == "failed":
+                    # A 404 or 403 won't get better by asking again
+                    break
+            except Exception as e:
+                error = str(e)
+                if not is_host_pushback(e):
+                    break
+                # Connection resets and timeouts count as the host pushing back
+                outcome = "throttled"
+            finally:
+                self.hosts.release(url, started, outcome, retry_after)
+                self.stats["hosts"] = self.hosts.describe()
+
+        if self.fallback:
+            self.stats["fallbacks"] += 1
+            self.stats["round_trips"] += 1
+            result = await self.fallback.fetch(url)
+            if result.get("success"):
+                return result
+
+        return {"success": False, "error": error, "url": url}
+
+    def next_staging_path(self):
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self.counter += 1
+        return self.staging_dir / f"{self.counter:06d}.bin"
+
+    async def _is_large(self, url):
+        """Whether a HEAD request says url's body reaches stream_threshold.
+
+        The request client always buffers whole bodies, so anything that
+        large is streamed instead.
+        """
+        self.stats["requests"] += 1
+        try:
+            response = await self.request.head(
+                url, timeout=self.timeout, fail_on_status_code=False
+            )
+        except Exception:
+            # The GET that follows gets its own retries and error
+            return False
+        try:
+            return response.ok and content_length(response) >= self.stream_threshold
+        finally:
+            await response.dispose()
+
+    async def _fetch_once(self, url):
+        """Download url in one piece, or stream it when it turns out large.
+
+        Servers that don't answer HEAD with a length are only caught here,
+        after the request client already holds the body.
+        """
+        self.stats["requests"] += 1
+        response = await self.request.get(
+            url, timeout=self.timeout, fail_on_status_code=False
+        )
+        try:
+            if not response.ok:
+                raise FetchStatusError(
+                    response.status,
+                    parse_retry_after(response.headers.get("retry-after")),
+                )
+
+            if content_length(response) >= self.stream_threshold:
+                return await self._stream_once(url)
+
+            body = await response.body()
+            path = self.next_staging_path()
+            written = await asyncio.to_thread(
+                write_bytes, path, body, self.stream_threshold
+            )
+
+            return {
+                "success": True,
+                "path": str(path),
+                "contentType": response.headers.get("content-type", ""),
+                "size": written["size"],
+                "sha256": written["sha256"],
+                "etag": response.headers.get("etag"),
+                "lastModified": response.headers.get("last-modified"),
+                "url": url,
+            }
+        finally:
+            await response.dispose()
+
+    async def _stream_once(self, url):
+        """Stream a large body to disk with the context's cookies and headers, chunk by chunk"""
+        self.stats["requests"] += 1
+        if self.user_agent is None:
+            self.user_agent = await self.page.evaluate("navigator.userAgent")
+        cookies = {
+            cookie["name"]: cookie["value"]
+            for cookie in await self.page.context.cookies(url)
+        }
+        path = self.next_staging_path()
+        result = await asyncio.to_thread(self._stream_to_file, url, path, cookies)
+        self.stats["streamed"] += 1
+        return result
+
+    def _stream_to_file(self, url, path, cookies):
+        with requests.get(
+            url,
+            headers={**self.headers, "User-Agent": self.user_agent},
+            cookies=cookies,
+            proxies=self.proxies,
+            stream=True,
+            timeout=self.timeout / 1000,
+        ) as response:
+            if not response.ok:
+                raise FetchStatusError(
+                    response.status_code,
+                    parse_retry_after(response.headers.get("retry-after")),
+                )
+            written = write_chunks(
+                path, response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            )
+
+        return {
+            "success": True,
+            "path": str(path),
+            "contentType": response.headers.get("content-type", ""),
+            "size": written["size"],
+            "sha256": written["sha256"],
+            "etag": response.headers.get("etag"),
+            "lastModified": response.headers.get("last-modified"),
+            "url": url,
+        }
+
+    def iter_stream(self, result):
+        """Chunks of a fallback result that came back as a stream handle"""
+        return self.fallback.iter_stream(result)
+
+    async def close(self):
+        if self.fallback:
+            await self.fallback.close()
+
+    def cleanup(self):
+        """Remove staged bodies that were never moved into place"""
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+
+class CachingFetcher:
+    """Serve fetches from an HttpCache first and cache whatever else is fetched.
+
+    Cached URLs are revalidated with a conditional request through the
+    browser context; only misses and failed revalidations reach the inner
+    fetcher. Every result comes back as a file on disk.
+    """
+
+    def __init__(
+        self,
+        inner,
+        cache,
+        page,
+        staging_dir,
+        stream_threshold=DEFAULT_STREAM_THRESHOLD,
+    ):
+        self.inner = inner
+        self.cache = cache
+        self.request = page.context.request
+        self.staging_dir = Path(staging_dir)
+        self.stream_threshold = stream_threshold
+        self.stats = inner.stats
+
+    def prefetch(self, items):
+        """Only batch the URLs the cache can't answer"""
+        self.inner.prefetch([item for item in items if not self.cache.has(item[0])])
+
+    async def fetch(self, url):
+        if self.cache.has(url):
+            result = await self.cache.revalidate(
+                self.request,
+                url,
+                self.cache.next_staging_path(self.staging_dir),
+                self.stream_threshold,
+            )
+            if result:
+                return result
+
+        result = await self.inner.fetch(url)
+        if not result.get("success"):
+            return result
+
+        return await self.cache.materialize(
+            result,
+            self.cache.next_staging_path(self.staging_dir),
+            chunks=self.inner.iter_stream(result) if result.get("streamId") else None,
+            stream_threshold=self.stream_threshold,
+        )
+
+    def iter_stream(self, result):
+        return self.inner.iter_stream(result)
+
+    async def close(self):
+        await self.inner.close()
+
+
+class IncrementalFetcher:
+    """Keep assets a previous clone already saved when the server says they are unchanged"""
+
+    def __init__(self, inner, manifest, page):
+        self.inner = inner
+        self.manifest = manifest
+        self.request = page.context.request
+        self.stats = inner.stats
+
+    def prefetch(self, items):
+        """Only batch URLs the previous clone never saved"""
+        self.inner.prefetch([item for item in items if not self.manifest.has(item[0])])
+
+    async def fetch(self, url):
+        result = await self.manifest.revalidate(self.request, url)
+        if result:
+            return result
+        return await self.inner.fetch(url)
+
+    def iter_stream(self, result):
+        return self.inner.iter_stream(result)
+
+    async def close(self):
+        await self.inner.close()
+
+
+async def fetch_assets_concurrently(fetcher, urls, concurrency=DEFAULT_BATCH_CONCURRENCY):
+    """Yield fetcher.fetch(url) results in completion order with bounded concurrency"""
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch(url):
+        async with slots:
+            try:
+                return await fetcher.fetch(url)
+            except Exception as e:
+                return {"success": False, "error": str(e), "url": url}
+
+    for next_result in asyncio.as_completed([fetch(url) for url in urls]):
+        yield await next_result
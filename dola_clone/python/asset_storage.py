@@ -0,0 +1,183 @@
+import base64
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+
+# Assets at or above this size are written in chunks instead of in one go
+DEFAULT_STREAM_THRESHOLD = 8 * 1024 * 1024
+
+# Decoded bytes written per chunk on the streamed path
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+def base64_payload_offset(base64_data):
+    """Index where the base64 payload starts, skipping any data: URL prefix"""
+    if base64_data.startswith("data:"):
+        return base64_data.index(",") + 1
+    return 0
+
+
+def decoded_base64_size(base64_data):
+    """Decoded size of a base64 payload without decoding it"""
+    offset = base64_payload_offset(base64_data)
+    length = len(base64_data) - offset
+    padding = base64_data[-2:].count("=") if length else 0
+    return length * 3 // 4 - padding
+
+
+def iter_base64_chunks(base64_data, chunk_size=STREAM_CHUNK_SIZE):
+    """Decode a base64 payload chunk by chunk instead of all at once"""
+    offset = base64_payload_offset(base64_data)
+    # Stay on 4-character boundaries so every slice decodes on its own
+    step = max(1, chunk_size // 3) * 4
+    for start in range(offset, len(base64_data), step):
+        yield base64.b64decode(base64_data[start : start + step])
+
+
+def iter_bytes_chunks(data, chunk_size=STREAM_CHUNK_SIZE):
+    """Slice bytes into chunks without copying them"""
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield view[start : start + chunk_size]
+
+
+def write_chunks(path, chunks):
+    """Write chunks to path, hashing and counting them on the way"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+            digest.update(chunk)
+            size += len(chunk)
+    return {"sha256": digest.hexdigest(), "size": size, "streamed": True}
+
+
+async def write_chunks_async(path, chunks):
+    """Same as write_chunks for an async iterator of chunks"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "wb") as f:
+        async for chunk in chunks:
+            f.write(chunk)
+            digest.update(chunk)
+            size += len(chunk)
+    return {"sha256": digest.hexdigest(), "size": size, "streamed": True}
+
+
+def write_base64(path, base64_data, stream_threshold=DEFAULT_STREAM_THRESHOLD):
+    """Decode base64_data into path, streaming it when it is large"""
+    if decoded_base64_size(base64_data) >= stream_threshold:
+        return write_chunks(path, iter_base64_chunks(base64_data))
+
+    data = base64.b64decode(base64_data[base64_payload_offset(base64_data) :])
+    with open(path, "wb") as f:
+        f.write(data)
+    return {
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "size": len(data),
+        "streamed": False,
+    }
+
+
+def write_bytes(path, data, stream_threshold=DEFAULT_STREAM_THRESHOLD):
+    """Write raw bytes to path, in chunks when they are large"""
+    if len(data) >= stream_threshold:
+        return write_chunks(path, iter_bytes_chunks(data))
+
+    with open(path, "wb") as f:
+        f.write(data)
+    return {
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "size": len(data),
+        "streamed": False,
+    }
+
+
+def hash_file(path, chunk_size=STREAM_CHUNK_SIZE):
+    """Hash a file already on disk without reading it into memory"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+    return {"sha256": digest.hexdigest(), "size": size, "streamed": False}
+
+
+class ContentStore:
+    """Keep one file per distinct body, keyed by its SHA-256.
+
+    Bodies are written to a staging path first, then committed under a
+    readable name. A body whose hash is already stored is dropped and the
+    existing file is returned, so every URL serving the same bytes maps to
+    one physical file.
+    """
+
+    def __init__(self, staging_dir):
+        self.staging_dir = Path(staging_dir)
+        self.paths = {}
+        self.taken_names = {}
+        self.counter = 0
+        self.stats = {
+            "files": 0,
+            "bytes_stored": 0,
+            "duplicates": 0,
+            "bytes_saved": 0,
+        }
+
+    def staging_path(self):
+        """A fresh path to write a body to before it is committed"""
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self.counter += 1
+        return self.staging_dir / f"{self.counter:06d}.tmp"
+
+    def lookup(self, sha256):
+        return self.paths.get(sha256)
+
+    def adopt(self, file_path, sha256):
+        """Register a file saved by an earlier run so new bodies dedupe against it"""
+        self.paths.setdefault(sha256, Path(file_path))
+
+    def commit(self, source_path, save_dir, filename, written):
+        """Move a written body into save_dir and return where its bytes live"""
+        sha256 = written["sha256"]
+        existing = self.paths.get(sha256)
+        if existing:
+            Path(source_path).unlink(missing_ok=True)
+            self.stats["duplicates"] += 1
+            self.stats["bytes_saved"] += written["size"]
+            return existing
+
+        file_path = Path(save_dir) / self.pick_name(save_dir, filename, sha256)
+        shutil.move(str(source_path), file_path)
+        self.paths[sha256] = file_path
+        self.stats["files"] += 1
+        self.stats["bytes_stored"] += written["size"]
+        return file_path
+
+    def pick_name(self, save_dir, filename, sha256):
+        """Keep the URL's filename unless another body already has it"""
+        save_dir = Path(save_dir)
+        taken = self.taken_names.get(save_dir)
+        if taken is None:
+            # Files written outside the store (inline styles, reruns) count too
+            taken = {path.name for path in save_dir.iterdir()} if save_dir.exists() else set()
+            self.taken_names[save_dir] = taken
+
+        name, ext = os.path.splitext(filename)
+        for candidate in (filename, f"{name}_{sha256[:12]}{ext}", f"{name}_{sha256}{ext}"):
+            if candidate not in taken:
+                taken.add(candidate)
+                return candidate
+
+        raise FileExistsError(f"No free name for {filename} in {save_dir}")
+
+    def cleanup(self):
+        """Remove staged bodies that were never committed"""
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
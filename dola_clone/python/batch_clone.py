@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
+
+from browser_server import ENDPOINT_ENV, open_browser
+from production_website_cloner import ProductionWebsiteCloner
+
+# Per-entry settings that belong to the shared browser, not a single clone
+BROWSER_OPTIONS = {"headless", "browser_endpoint"}
+
+SUMMARY_FILENAME = "batch_summary.json"
+
+
+def default_parallel():
+    """One clone per two cores; each clone already runs several pages and downloads"""
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def cloner_options():
+    """Keyword arguments an entry may set on ProductionWebsiteCloner"""
+    parameters = inspect.signature(ProductionWebsiteCloner.__init__).parameters
+    return set(parameters) - {"self", "target_url", "output_dir"} - BROWSER_OPTIONS
+
+
+def load_batch(path, output_root):
+    """Read clone entries from a batch file.
+
+    Each line is either JSON, e.g. {"url": "...", "output": "...", "depth": 2},
+    with any ProductionWebsiteCloner option, or plain "URL [OUTPUT]".
+    Blank lines and lines starting with # are skipped.
+    """
+    allowed = cloner_options()
+    entries = []
+    outputs = set()
+    cache_dirs = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            if line.startswith("{"):
+                try:
+                    entry = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"Line {line_number}: invalid JSON ({e})")
+            else:
+                parts = line.split()
+                entry = {"url": parts[0]}
+                if len(parts) > 1:
+                    entry["output"] = parts[1]
+
+            url = entry.pop("url", None)
+            if not url or not url.startswith(("http://", "https://")):
+                raise ValueError(
+                    f"Line {line_number}: URL must start with http:// or https://"
+                )
+
+            output = entry.pop("output", None) or urlparse(url).netloc.replace(":", "_")
+            output_dir = Path(output_root) / output
+            if output_dir in outputs:
+                raise ValueError(
+                    f"Line {line_number}: output directory {output_dir} is used twice"
+                )
+            outputs.add(output_dir)
+
+            unknown = set(entry) - allowed
+            if unknown:
+                raise ValueError(
+                    f"Line {line_number}: unknown option(s) {', '.join(sorted(unknown))}"
+                )
+
+            # An HTTP cache belongs to one clone at a time
+            if entry.get("cache_dir"):
+                cache_dir = Path(entry["cache_dir"]).resolve()
+                if cache_dir in cache_dirs:
+                    raise ValueError(
+                        f"Line {line_number}: cache directory {entry['cache_dir']} is used twice"
+                    )
+                cache_dirs.add(cache_dir)
+
+            entries.append({"url": url, "output_dir": output_dir, "options": entry})
+
+    return entries
+
+
+class BatchCloner:
+    """Run many clones concurrently, each in its own context of one browser"""
+
+    def __init__(
+        self,
+        entries,
+        parallel=None,
+        headless=True,
+        overwrite=False,
+        browser_endpoint=None,
+    ):
+        self.entries = entries
+        self.parallel = parallel or default_parallel()
+        self.headless = headless
+        self.browser_endpoint = browser_endpoint
+        self.overwrite = overwrite
+        self.results = []
+
+    def prepare_output(self, entry):
+        """Clear or keep an existing output directory; an error message if neither"""
+        output_dir = entry["output_dir"]
+        options = entry["options"]
+        if (
+            not output_dir.exists()
+            or options.get("incremental")
+            or options.get("resume")
+        ):
+            return None
+        if not self.overwrite:
+            return f"Output directory {output_dir} already exists (use --overwrite)"
+        shutil.rmtree(output_dir)
+        return None
+
+    async def clone_one(self, browser, slots, entry):
+        async with slots:
+            started = datetime.now()
+            summary = {
+                "url": entry["url"],
+                "output_dir": str(entry["output_dir"]),
+                "success": False,
+                "error": None,
+                "seconds": 0,
+            }
+
+            error = self.prepare_output(entry)
+            if error:
+                summary["error"] = error
+                print(f"❌ {entry['url']}: {error}")
+                return summary
+
+            try:
+                cloner = ProductionWebsiteCloner(
+                    entry["url"], output_dir=entry["output_dir"], **entry["options"]
+                )
+                result = await cloner.clone_website(browser)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+
+            summary["seconds"] = round((datetime.now() - started).total_seconds(), 1)
+            summary["success"] = result["success"]
+            summary["error"] = result.get("error")
+            if result["success"]:
+                stats = result["stats"]
+                summary.update(
+                    {
+                        "zip_path": result["zip_path"],
+                        "pages_crawled": len(stats["pages_crawled"]),
+                        "assets": sum(stats["assets"].values()),
+                        "total_size_mb": stats["total_size_mb"],
+                    }
+                )
+            return summary
+
+    async def run(self):
+        """Clone every entry; returns the per-entry summaries in batch order"""
+        slots = asyncio.Semaphore(self.parallel)
+        async with async_playwright() as p:
+            # Startup is paid once; every clone gets its own isolated context
+            browser = await open_browser(p, self.browser_endpoint, self.headless)
+            try:
+                self.results = await asyncio.gather(
+                    *(self.clone_one(browser, slots, entry) for entry in self.entries)
+                )
+            finally:
+                await browser.close()
+        return self.results
+
+    def write_summary(self, path, total_seconds):
+        summary = {
+            "timestamp": datetime.now().isoformat(),
+            "parallel": self.parallel,
+            "total_seconds": round(total_seconds, 1),
+            "succeeded": sum(1 for result in self.results if result["success"]),
+            "failed": sum(1 for result in self.results if not result["success"]),
+            "clones": self.results,
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+def main():
+    """CLI entry point for cloning a list of sites with one browser"""
+    parser = argparse.ArgumentParser(
+        description="Batch Website Cloner - clone many sites concurrently with one shared browser",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Batch file format (one clone per line):
+  https://example.com
+  https://example.org example_org
+  {"url": "https://example.net", "output": "net", "depth": 2, "concurrency": 16}
+
+JSON entries take ProductionWebsiteCloner's keyword arguments. Entries
+that use an HTTP cache need separate cache_dir values.
+
+Examples:
+  python batch_clone.py mirrors.txt --headless
+  python batch_clone.py mirrors.txt --headless --parallel 6 --output-root clones
+        """,
+    )
+    parser.add_argument("batch_file", help="File listing the sites to clone")
+    parser.add_argument(
+        "--output-root",
+        default=".",
+        help="Directory the per-site output directories are created in (default: .)",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=default_parallel(),
+        help=f"Clones running at once (default: {default_parallel()}, half the CPU cores)",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run the shared browser in headless mode",
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Replace existing output directories instead of failing those entries",
+    )
+    parser.add_argument(
+        "--browser-endpoint",
+        help=f"Connect to a running browser_server.py here instead of launching Chromium (default: ${ENDPOINT_ENV})",
+    )
+    parser.add_argument(
+        "--summary",
+        help=f"Where to write the combined summary (default: OUTPUT_ROOT/{SUMMARY_FILENAME})",
+    )
+
+    args = parser.parse_args()
+
+    if args.parallel < 1:
+        print("❌ Error: --parallel must be at least 1")
+        return 1
+
+    try:
+        entries = load_batch(args.batch_file, args.output_root)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {str(e)}")
+        return 1
+
+    if not entries:
+        print("❌ Error: the batch file lists no sites")
+        return 1
+
+    print(f"🚀 Cloning {len(entries)} sites, {args.parallel} at a time")
+    batch = BatchCloner(
+        entries,
+        parallel=args.parallel,
+        headless=args.headless,
+        overwrite=args.overwrite,
+        browser_endpoint=args.browser_endpoint,
+    )
+
+    started = datetime.now()
+    try:
+        asyncio.run(batch.run())
+    except KeyboardInterrupt:
+        print("\n⚠️  Batch cancelled by user")
+        return 1
+
+    summary_path = args.summary or Path(args.output_root) / SUMMARY_FILENAME
+    summary = batch.write_summary(
+        summary_path, (datetime.now() - started).total_seconds()
+    )
+
+    print(f"\n📊 Batch finished in {summary['total_seconds']}s")
+    for result in batch.results:
+        if result["success"]:
+            print(
+                f"   ✅ {result['url']} → {result['output_dir']} ({result['pages_crawled']} pages, {result['assets']} assets, {result['seconds']}s)"
+            )
+        else:
+            print(f"   ❌ {result['url']}: {result['error']}")
+    print(f"📊 Summary: {summary_path}")
+
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    exit(main())
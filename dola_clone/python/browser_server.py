@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import os
+
+from playwright.async_api import async_playwright
+
+
+DEFAULT_PORT = 9222
+
+# Cloners connect here when no --browser-endpoint is given
+ENDPOINT_ENV = "BROWSER_ENDPOINT"
+
+# A server that doesn't answer this fast is treated as not running
+CONNECT_TIMEOUT_MS = 3000
+
+# Chromium flags for running in containers and on servers
+BROWSER_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-accelerated-2d-canvas",
+    "--no-first-run",
+    "--no-zygote",
+    "--disable-gpu",
+]
+
+
+def browser_endpoint(endpoint=None):
+    """The configured browser server endpoint, if any"""
+    return endpoint or os.getenv(ENDPOINT_ENV) or None
+
+
+async def open_browser(
+    playwright, endpoint=None, headless=True, args=BROWSER_ARGS, log=print
+):
+    """Connect to a running browser server, or launch a browser if there is none.
+
+    Closing the returned browser only disconnects from a server, after
+    closing the contexts this process created; a launched browser exits.
+    """
+    endpoint = browser_endpoint(endpoint)
+    if endpoint:
+        try:
+            browser = await playwright.chromium.connect_over_cdp(
+                endpoint, timeout=CONNECT_TIMEOUT_MS
+            )
+            log(f"🔌 Connected to browser server at {endpoint}")
+            return browser
+        except Exception as e:
+            log(f"⚠️ Browser server at {endpoint} not reachable, launching one: {e}")
+
+    return await playwright.chromium.launch(headless=headless, args=list(args))
+
+
+async def serve(port=DEFAULT_PORT, headless=True):
+    """Keep one Chromium running for cloners to connect to until interrupted"""
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(
+            headless=headless,
+            args=BROWSER_ARGS + [f"--remote-debugging-port={port}"],
+        )
+        closed = asyncio.Event()
+        browser.on("disconnected", lambda _: closed.set())
+
+        endpoint = f"http://127.0.0.1:{port}"
+        print(f"🌐 Browser server running at {endpoint}")
+        print(f"   Connect with --browser-endpoint {endpoint} or {ENDPOINT_ENV}={endpoint}")
+        try:
+            await closed.wait()
+        finally:
+            if browser.is_connected():
+                await browser.close()
+
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(
+        description="Browser Server - keep Chromium running so cloners skip browser startup",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Examples:
+  python browser_server.py --headless
+  {ENDPOINT_ENV}=http://127.0.0.1:{DEFAULT_PORT} python production_website_cloner.py --url https://example.com
+  python modal_tester.py --url https://example.com --browser-endpoint http://127.0.0.1:{DEFAULT_PORT}
+        """,
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Local port the browser listens on (default: {DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "--headless", action="store_true", help="Run the browser in headless mode"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.port, args.headless))
+    except KeyboardInterrupt:
+        print("\n🛑 Browser server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+
+MANIFEST_FILENAME = "clone_manifest.json"
+MANIFEST_VERSION = 1
+
+
+class CloneManifest:
+    """What a previous clone into the same directory saved, for incremental runs.
+
+    The manifest records every saved asset with its hash and HTTP
+    validators so the next run can keep unchanged files where they are,
+    plus a hash of the generated HTML so it is only rewritten on change.
+    """
+
+    def __init__(self, output_dir, timeout=30000):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_FILENAME
+        self.timeout = timeout
+        self.assets = {}
+        self.html_sha256 = None
+        self.previous_report = None
+
+    def load(self):
+        """Read the previous manifest and report; False when there is none"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if manifest.get("version") != MANIFEST_VERSION:
+            return False
+
+        # Entries whose file was deleted by hand are fetched again
+        self.assets = {
+            url: entry
+            for url, entry in manifest.get("assets", {}).items()
+            if (self.output_dir / entry["path"]).exists()
+        }
+        self.html_sha256 = manifest.get("html_sha256")
+
+        try:
+            with open(
+                self.output_dir / "extraction_report.json", "r", encoding="utf-8"
+            ) as f:
+                self.previous_report = json.load(f)
+        except (OSError, ValueError):
+            self.previous_report = None
+
+        return True
+
+    def has(self, url):
+        return url in self.assets
+
+    def file_path(self, url):
+        return self.output_dir / self.assets[url]["path"]
+
+    async def revalidate(self, request_context, url):
+        """Ask the server whether url changed since the previous run.
+
+        Returns an "unchanged" result pointing at the existing file on a
+        304, or None when the asset has to be fetched again.
+        """
+        entry = self.assets.get(url)
+        if not entry:
+            return None
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        if not headers:
+            # Without validators only a full download can tell
+            return None
+
+        try:
+            response = await request_context.get(
+                url,
+                headers=headers,
+                timeout=self.timeout,
+                fail_on_status_code=False,
+            )
+        except Exception:
+            return None
+
+        try:
+            if response.status != 304:
+                return None
+        finally:
+            await response.dispose()
+
+        return {
+            "success": True,
+            "unchanged": True,
+            "path": str(self.file_path(url)),
+            "contentType": entry.get("content_type", ""),
+            "size": entry["size"],
+            "sha256": entry["sha256"],
+            "etag": entry.get("etag"),
+            "lastModified": entry.get("last_modified"),
+            "url": url,
+        }
+
+    def write(self, target_url, assets, html_sha256):
+        """Replace the manifest with this run's assets and HTML hash"""
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "target_url": target_url,
+            "timestamp": datetime.now().isoformat(),
+            "html_sha256": html_sha256,
+            "assets": assets,
+        }
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def html_digest(html_content):
+    return hashlib.sha256(html_content.encode("utf-8")).hexdigest()
+
+
+def collect_garbage(root_dir, referenced_paths):
+    """Delete files under root_dir that no page references any more"""
+    referenced = {Path(path).resolve() for path in referenced_paths}
+    removed = 0
+    removed_bytes = 0
+    for file_path in Path(root_dir).rglob("*"):
+        if not file_path.is_file() or file_path.resolve() in referenced:
+            continue
+
+        removed_bytes += file_path.stat().st_size
+        file_path.unlink()
+        removed += 1
+
+    return removed, removed_bytes
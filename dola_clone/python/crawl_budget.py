@@ -0,0 +1,54 @@
+import time
+
+
+class CrawlBudget:
+    """Limits on what a crawl may spend: pages, downloaded bytes and wall time.
+
+    None leaves a limit off. Once any limit is reached no further page is
+    started; pages already being visited are finished. Time is counted
+    from start(), so a budget can cover the whole clone, not just the crawl.
+    """
+
+    def __init__(self, max_pages=None, max_bytes=None, max_seconds=None):
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.started = None
+        self.pages = 0
+        self.bytes = 0
+        self.exhausted_by = None
+
+    def start(self):
+        if self.started is None:
+            self.started = time.monotonic()
+
+    def elapsed(self):
+        return time.monotonic() - self.started if self.started is not None else 0
+
+    def spend_page(self):
+        self.pages += 1
+
+    def spend_bytes(self, size):
+        self.bytes += size
+
+    def exhausted(self):
+        """The limit that has been reached, or None while there is budget left"""
+        if self.exhausted_by is None:
+            if self.max_pages is not None and self.pages >= self.max_pages:
+                self.exhausted_by = "pages"
+            elif self.max_bytes is not None and self.bytes >= self.max_bytes:
+                self.exhausted_by = "bytes"
+            elif self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+                self.exhausted_by = "time"
+        return self.exhausted_by
+
+    def describe(self):
+        return {
+            "max_pages": self.max_pages,
+            "max_bytes": self.max_bytes,
+            "max_seconds": self.max_seconds,
+            "pages": self.pages,
+            "bytes": self.bytes,
+            "seconds": round(self.elapsed(), 1),
+            "exhausted_by": self.exhausted_by,
+        }
@@ -0,0 +1,207 @@
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from url_frontier import canonicalize_url, default_priority
+
+
+QUEUE_FILENAME = "crawl_queue.sqlite"
+
+# A worker that hasn't renewed its lease for this long is presumed dead
+DEFAULT_LEASE_SECONDS = 300
+
+# Claims of one job before it is given up on
+DEFAULT_MAX_ATTEMPTS = 3
+
+JOB_STATES = ("queued", "leased", "done", "failed")
+
+
+class CrawlQueue:
+    """Crawl jobs shared by worker processes through one SQLite file.
+
+    There is one job per canonical page URL. A worker claims a job under a
+    lease and renews it while it works; when a lease runs out, because its
+    worker died or hung, the job goes back to the queue. A job is tried at
+    most max_attempts times before it is marked failed.
+
+    The file must be on a local disk and every process using it on the
+    same host: WAL mode relies on shared memory, which network filesystems
+    don't provide. Methods may be called from worker threads; they take
+    turns on the one connection.
+    """
+
+    def __init__(
+        self,
+        path=QUEUE_FILENAME,
+        lease_seconds=DEFAULT_LEASE_SECONDS,
+        max_attempts=DEFAULT_MAX_ATTEMPTS,
+        priority=default_priority,
+    ):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.priority = priority
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        # Transactions are explicit so claims can take the write lock up front
+        self.db = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE NOT NULL,
+                url TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                priority REAL NOT NULL,
+                state TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_until REAL,
+                error TEXT
+            )
+            """
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (state, priority, id)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+
+    @contextmanager
+    def transaction(self):
+        """Hold the database's write lock for the duration of the block"""
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+    def set_settings(self, settings):
+        """Store the crawl's settings for workers and the merge step to read"""
+        with self.transaction():
+            for name, value in settings.items():
+                self.db.execute(
+                    "INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)",
+                    (name, json.dumps(value)),
+                )
+
+    def settings(self):
+        with self.lock:
+            return {
+                name: json.loads(value)
+                for name, value in self.db.execute("SELECT name, value FROM settings")
+            }
+
+    def add_many(self, urls, depth):
+        """Queue URLs whose canonical form has no job yet; returns how many were new"""
+        added = 0
+        with self.transaction():
+            for url in urls:
+                key = canonicalize_url(url)
+                priority = self.priority(url, depth)
+                cursor = self.db.execute(
+                    "INSERT OR IGNORE INTO jobs (key, url, depth, priority) VALUES (?, ?, ?, ?)",
+                    (key, url, depth, priority),
+                )
+                added += cursor.rowcount
+                if not cursor.rowcount:
+                    # Found again somewhere that ranks it higher or nearer the start
+                    self.db.execute(
+                        "UPDATE jobs SET priority = MIN(priority, ?), depth = MIN(depth, ?) WHERE key = ? AND state = 'queued' AND (priority > ? OR depth > ?)",
+                        (priority, depth, key, priority, depth),
+                    )
+        return added
+
+    def claim(self, worker):
+        """Lease the next job to worker; {"id", "url", "depth", "attempts"} or None"""
+        now = time.time()
+        with self.transaction():
+            # Jobs of workers that stopped renewing go back to the queue
+            self.db.execute(
+                """
+                UPDATE jobs
+                SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                    worker = NULL,
+                    error = 'lease expired'
+                WHERE state = 'leased' AND lease_until < ?
+                """,
+                (self.max_attempts, now),
+            )
+            row = self.db.execute(
+                "SELECT id, url, depth, attempts FROM jobs WHERE state = 'queued' ORDER BY priority, id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute(
+                "UPDATE jobs SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker, now + self.lease_seconds, row[0]),
+            )
+        return {"id": row[0], "url": row[1], "depth": row[2], "attempts": row[3] + 1}
+
+    def renew(self, job_id, worker):
+        """Extend worker's lease on a job; False when the lease was lost"""
+        with self.transaction():
+            cursor = self.db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                (time.time() + self.lease_seconds, job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker):
+        """Mark a leased job done; False when another worker has it by now"""
+        with self.transaction():
+            cursor = self.db.execute(
+                "UPDATE jobs SET state = 'done', lease_until = NULL, error = NULL WHERE id = ? AND worker = ? AND state = 'leased'",
+                (job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, worker, error):
+        """Give a job back for a retry, or mark it failed once out of attempts"""
+        with self.transaction():
+            self.db.execute(
+                """
+                UPDATE jobs
+                SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                    worker = NULL,
+                    lease_until = NULL,
+                    error = ?
+                WHERE id = ? AND worker = ? AND state = 'leased'
+                """,
+                (self.max_attempts, str(error), job_id, worker),
+            )
+
+    def counts(self):
+        """Number of jobs in each state"""
+        counts = dict.fromkeys(JOB_STATES, 0)
+        with self.lock:
+            for state, count in self.db.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+            ):
+                counts[state] = count
+        return counts
+
+    def unfinished(self):
+        """Jobs queued or being worked on; 0 once the crawl is over"""
+        counts = self.counts()
+        return counts["queued"] + counts["leased"]
+
+    def failures(self):
+        """[(url, error)] of the jobs that ran out of attempts"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT url, error FROM jobs WHERE state = 'failed' ORDER BY id"
+            ).fetchall()
+
+    def close(self):
+        self.db.close()
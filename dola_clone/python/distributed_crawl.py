@@ -0,0 +1,549 @@
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+from datetime import datetime
+from pathlib import Path
+
+from playwright.async_api import async_playwright
+
+from batch_clone import cloner_options
+from browser_server import ENDPOINT_ENV, open_browser
+from crawl_queue import (
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_MAX_ATTEMPTS,
+    QUEUE_FILENAME,
+    CrawlQueue,
+)
+from page_crawler import DEFAULT_POOL_SIZE, PagePool
+from production_website_cloner import ProductionWebsiteCloner
+from static_page import StaticPageClassifier
+from url_frontier import LinkPriority, canonicalize_url
+
+
+# Layout of the shared directory every worker and the merge step use
+ASSETS_DIRNAME = "assets"
+PAGES_DIRNAME = "pages"
+WORKERS_DIRNAME = "workers"
+
+# How often an idle worker checks whether other workers queued more pages
+POLL_SECONDS = 1.0
+
+# Options that only make sense for a single-process clone
+UNSUPPORTED_OPTIONS = {
+    "depth",
+    "parallel_pages",
+    "link_discovery",
+    "incremental",
+    "resume",
+    "browser_endpoint",
+    # Budgets are spent per process; workers can't share them yet
+    "max_pages",
+    "max_bytes",
+    "max_seconds",
+}
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def check_same_host(settings):
+    """Refuse a crawl set up on another host; its SQLite queue isn't network-safe"""
+    host = settings.get("host")
+    if host and host != socket.gethostname():
+        raise ValueError(
+            f"The crawl was set up on {host}; run its workers and merge on that host"
+        )
+
+
+class SharedAssetStore:
+    """Asset bodies from every worker, one file per SHA-256.
+
+    Files are written to a temporary name and renamed into place, so
+    workers never see partial bodies.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, sha256):
+        return self.root / sha256[:2] / sha256
+
+    def put(self, source_path, sha256):
+        """Publish a saved body unless the same bytes are stored already"""
+        target = self.path(sha256)
+        if target.exists():
+            return target
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{sha256}.{default_worker_id()}.tmp")
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, target)
+        return target
+
+
+def write_json(path, data):
+    """Write data so readers never see a partial file"""
+    tmp_path = Path(f"{path}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def init_crawl(shared_dir, url, depth, options=None):
+    """Create the shared queue with url as its first job"""
+    queue = CrawlQueue(Path(shared_dir) / QUEUE_FILENAME)
+    try:
+        queue.set_settings(
+            {
+                "target_url": url,
+                "depth": depth,
+                "options": options or {},
+                "host": socket.gethostname(),
+                "created": datetime.now().isoformat(),
+            }
+        )
+        queue.add_many([url], 1)
+        return queue.counts()
+    finally:
+        queue.close()
+
+
+class CrawlWorker:
+    """Claim page jobs from the shared queue until the crawl runs out of work.
+
+    Each claimed page is extracted as a ProductionWebsiteCloner crawl would,
+    its asset bodies are published to the shared store, its result is
+    written to pages/<job id>.json and its links become new jobs.
+    """
+
+    def __init__(
+        self,
+        shared_dir,
+        worker_id=None,
+        parallel_pages=DEFAULT_POOL_SIZE,
+        headless=True,
+        browser_endpoint=None,
+        lease_seconds=DEFAULT_LEASE_SECONDS,
+        max_attempts=DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.shared_dir = Path(shared_dir)
+        self.worker_id = worker_id or default_worker_id()
+        self.parallel_pages = parallel_pages
+        self.headless = headless
+        self.browser_endpoint = browser_endpoint
+        # Ranks links by this worker's view of the site's navigation
+        self.priority = LinkPriority()
+        self.queue = CrawlQueue(
+            self.shared_dir / QUEUE_FILENAME,
+            lease_seconds,
+            max_attempts,
+            self.priority,
+        )
+        self.store = SharedAssetStore(self.shared_dir / ASSETS_DIRNAME)
+        self.pages_dir = self.shared_dir / PAGES_DIRNAME
+        self.stats = {"pages": 0, "failed": 0, "links_queued": 0}
+
+    def publish(self, cloner, job, assets, patterns):
+        """Copy the page's asset bodies to the shared store and write its result"""
+        files = {}
+        for asset_type, asset_list in assets.items():
+            if asset_type == "inline_styles" or not isinstance(asset_list, list):
+                continue
+            for asset in asset_list:
+                url = asset["url"] if isinstance(asset, dict) else asset
+                if url not in cloner.downloaded_assets or url in files:
+                    continue
+                record = cloner.asset_records[url]
+                self.store.put(cloner.downloaded_assets[url], record["sha256"])
+                files[url] = {
+                    "asset_type": asset_type,
+                    "sha256": record["sha256"],
+                    "size": record["size"],
+                    "content_type": (cloner.asset_headers.get(url) or {}).get(
+                        "content_type", ""
+                    ),
+                }
+
+        self.pages_dir.mkdir(parents=True, exist_ok=True)
+        write_json(
+            self.pages_dir / f"{job['id']}.json",
+            {
+                "url": job["url"],
+                "depth": job["depth"],
+                "worker": self.worker_id,
+                "timestamp": datetime.now().isoformat(),
+                "assets": assets,
+                "patterns": patterns,
+                "files": files,
+            },
+        )
+
+    async def keep_lease(self, job):
+        """Renew a job's lease while it is being worked on"""
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await asyncio.to_thread(self.queue.renew, job["id"], self.worker_id):
+                print(f"⚠️ Lost the lease on {job['url']}")
+                return
+
+    async def process(self, pool, cloner, classifier, job, max_depth):
+        renewing = asyncio.create_task(self.keep_lease(job))
+        try:
+            links, assets, patterns = await pool.run(
+                cloner.visit_page, job["url"], job["depth"], max_depth, classifier
+            )
+            self.publish(cloner, job, assets, patterns)
+            self.priority.note_navigation(patterns)
+            if links and job["depth"] < max_depth:
+                if cloner.links_per_page is not None:
+                    links = sorted(
+                        links, key=lambda link: self.priority(link, job["depth"] + 1)
+                    )[: cloner.links_per_page]
+                self.stats["links_queued"] += await asyncio.to_thread(
+                    self.queue.add_many, links, job["depth"] + 1
+                )
+            if await asyncio.to_thread(self.queue.complete, job["id"], self.worker_id):
+                self.stats["pages"] += 1
+        except Exception as e:
+            print(
+                f"❌ Failed to crawl {job['url']} (attempt {job['attempts']}): {str(e)}"
+            )
+            await asyncio.to_thread(self.queue.fail, job["id"], self.worker_id, e)
+            self.stats["failed"] += 1
+        finally:
+            renewing.cancel()
+
+    async def work(self, pool, cloner, classifier, max_depth):
+        """Process jobs one at a time until no job is queued or leased anywhere.
+
+        Queue calls run in threads, so waiting on the database lock never
+        stalls the pooled pages and downloads.
+        """
+        while True:
+            job = await asyncio.to_thread(self.queue.claim, self.worker_id)
+            if job is None:
+                # Pages other workers are still on may queue more links
+                if not await asyncio.to_thread(self.queue.unfinished):
+                    return
+                await asyncio.sleep(POLL_SECONDS)
+                continue
+            await self.process(pool, cloner, classifier, job, max_depth)
+
+    async def run(self):
+        settings = self.queue.settings()
+        if not settings:
+            raise ValueError(f"No crawl set up in {self.shared_dir} (run init first)")
+        check_same_host(settings)
+
+        # A scratch output directory; results are published to the shared one
+        worker_dir = self.shared_dir / WORKERS_DIRNAME / self.worker_id
+        cloner = ProductionWebsiteCloner(
+            settings["target_url"],
+            output_dir=worker_dir,
+            headless=self.headless,
+            depth=settings["depth"],
+            **settings["options"],
+        )
+        await cloner.setup_directories()
+
+        print(
+            f"👷 Worker {self.worker_id} crawling {settings['target_url']} with {self.parallel_pages} pages"
+        )
+        try:
+            async with async_playwright() as p:
+                browser = await open_browser(p, self.browser_endpoint, self.headless)
+                context = await cloner.new_context(browser)
+                pool = PagePool(context, self.parallel_pages)
+                classifier = None
+                if cloner.render_mode == "auto":
+                    classifier = StaticPageClassifier(context.request)
+                try:
+                    await asyncio.gather(
+                        *(
+                            self.work(pool, cloner, classifier, settings["depth"])
+                            for _ in range(self.parallel_pages)
+                        )
+                    )
+                finally:
+                    await pool.close()
+                    await context.close()
+                    await browser.close()
+        finally:
+            # Workers sharing a cache_dir merge their entries on save
+            if cloner.http_cache:
+                cloner.http_cache.save()
+            cloner.journal.close()
+            cloner.asset_store.cleanup()
+            shutil.rmtree(worker_dir, ignore_errors=True)
+            self.queue.close()
+        return self.stats
+
+
+class MergingCloner(ProductionWebsiteCloner):
+    """Clone the start page and fold in every page the workers crawled.
+
+    The output has the layout a single-process ProductionWebsiteCloner run
+    produces; crawled pages' assets are copied in from the shared store
+    instead of being downloaded again.
+    """
+
+    def __init__(self, shared_dir, output_dir, **options):
+        self.shared_dir = Path(shared_dir)
+        queue = CrawlQueue(self.shared_dir / QUEUE_FILENAME)
+        try:
+            self.settings = queue.settings()
+            self.job_counts = queue.counts()
+            self.failures = queue.failures()
+        finally:
+            queue.close()
+        if not self.settings:
+            raise ValueError(f"No crawl set up in {self.shared_dir} (run init first)")
+        check_same_host(self.settings)
+
+        super().__init__(
+            self.settings["target_url"],
+            output_dir=output_dir,
+            **{**self.settings["options"], **options},
+        )
+        self.store = SharedAssetStore(self.shared_dir / ASSETS_DIRNAME)
+
+    def load_results(self):
+        """Page results in job order"""
+        pages_dir = self.shared_dir / PAGES_DIRNAME
+        paths = sorted(pages_dir.glob("*.json"), key=lambda path: int(path.stem))
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                yield json.load(f)
+
+    async def adopt_files(self, files):
+        """Save a crawled page's assets as if this run had downloaded them"""
+        for url, file in files.items():
+            if url in self.downloaded_assets:
+                continue
+            source_path = self.store.path(file["sha256"])
+            if not source_path.exists():
+                print(f"⚠️ Shared store is missing {url}")
+                continue
+            staging_path = self.asset_store.staging_path()
+            shutil.copyfile(source_path, staging_path)
+            await self.save_asset_file(
+                url,
+                staging_path,
+                file["asset_type"],
+                file["content_type"],
+                {"sha256": file["sha256"], "size": file["size"]},
+            )
+            self.count_asset(file["asset_type"])
+
+    async def crawl_multiple_pages(self, pool, page, start_url, max_depth=1):
+        """The start page, extracted here, plus every page the workers crawled"""
+        extracted = await super().crawl_multiple_pages(pool, page, start_url, 1)
+        if self.settings["depth"] > 1:
+            self.extraction_report["pages_crawled"].append(
+                {"url": start_url, "depth": 1, "timestamp": datetime.now().isoformat()}
+            )
+
+        start_key = canonicalize_url(start_url)
+        merged = 0
+        for result in self.load_results():
+            # The start page's final state is the one rendered here
+            if canonicalize_url(result["url"]) == start_key:
+                continue
+            await self.adopt_files(result["files"])
+            extracted[result["url"]] = (result["assets"], result["patterns"])
+            self.extraction_report["pages_crawled"].append(
+                {
+                    "url": result["url"],
+                    "depth": result["depth"],
+                    "timestamp": result["timestamp"],
+                }
+            )
+            merged += 1
+
+        self.extraction_report["crawl"] = {
+            "distributed": True,
+            "jobs": self.job_counts,
+            "pages_merged": merged,
+            "failed_pages": [
+                {"url": url, "error": error} for url, error in self.failures
+            ],
+        }
+        print(f"🧩 Merged {merged} pages crawled by workers")
+        return extracted
+
+
+def parse_options(value):
+    """Cloner options for init, as a JSON object"""
+    options = json.loads(value) if value else {}
+    if not isinstance(options, dict):
+        raise ValueError("--options must be a JSON object")
+    unknown = set(options) - (cloner_options() - UNSUPPORTED_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unsupported option(s) {', '.join(sorted(unknown))}")
+    return options
+
+
+def main():
+    """CLI entry point for distributed crawls"""
+    parser = argparse.ArgumentParser(
+        description="Distributed Crawl - split a large clone across worker processes sharing a job queue",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+The shared directory holds the job queue, the asset store and per-page
+results. It must be on a local disk: every worker and the merge step run
+on the host that ran init.
+
+Examples:
+  python distributed_crawl.py init --shared crawl --url https://example.com --depth 4
+  python distributed_crawl.py work --shared crawl --headless    (once per worker process)
+  python distributed_crawl.py status --shared crawl
+  python distributed_crawl.py merge --shared crawl --output my_project --headless
+        """,
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = subparsers.add_parser("init", help="Create the queue for a crawl")
+    init_parser.add_argument("--url", required=True, help="Target website URL")
+    init_parser.add_argument(
+        "--depth", type=int, default=3, help="Crawl depth (default: 3)"
+    )
+    init_parser.add_argument(
+        "--options",
+        help="ProductionWebsiteCloner options as JSON, e.g. '{\"extract_depth\": 2}'",
+    )
+
+    work_parser = subparsers.add_parser("work", help="Crawl pages until none are left")
+    work_parser.add_argument(
+        "--parallel-pages",
+        type=int,
+        default=DEFAULT_POOL_SIZE,
+        help=f"Pages this worker crawls at once (default: {DEFAULT_POOL_SIZE})",
+    )
+    work_parser.add_argument(
+        "--worker-id", help="Name of this worker (default: host-pid)"
+    )
+
+    merge_parser = subparsers.add_parser(
+        "merge", help="Build the project from the crawled pages"
+    )
+    merge_parser.add_argument(
+        "--output", "-o", default="cloned_website", help="Output directory"
+    )
+    merge_parser.add_argument(
+        "--no-apis", action="store_true", help="Skip API integration"
+    )
+
+    status_parser = subparsers.add_parser("status", help="Show how far the crawl is")
+
+    for subparser in (init_parser, work_parser, merge_parser, status_parser):
+        subparser.add_argument(
+            "--shared", required=True, help="Directory shared by all workers"
+        )
+    work_parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=DEFAULT_LEASE_SECONDS,
+        help=f"How long a silent worker keeps its job (default: {DEFAULT_LEASE_SECONDS})",
+    )
+    work_parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help=f"Tries per page before it is given up on (default: {DEFAULT_MAX_ATTEMPTS})",
+    )
+    for subparser in (work_parser, merge_parser):
+        subparser.add_argument(
+            "--headless", action="store_true", help="Run browser in headless mode"
+        )
+        subparser.add_argument(
+            "--browser-endpoint",
+            help=f"Connect to a running browser_server.py here instead of launching Chromium (default: ${ENDPOINT_ENV})",
+        )
+
+    args = parser.parse_args()
+
+    if args.command == "init":
+        if not args.url.startswith(("http://", "https://")):
+            print("❌ Error: URL must start with http:// or https://")
+            return 1
+        if args.depth < 1:
+            print("❌ Error: --depth must be at least 1")
+            return 1
+        try:
+            options = parse_options(args.options)
+        except ValueError as e:
+            print(f"❌ Error: {str(e)}")
+            return 1
+        counts = init_crawl(args.shared, args.url, args.depth, options)
+        print(f"✅ Crawl queue ready in {args.shared} ({counts['queued']} job queued)")
+        return 0
+
+    if args.command == "status":
+        queue_path = Path(args.shared) / QUEUE_FILENAME
+        if not queue_path.exists():
+            print(f"❌ Error: no crawl queue in {args.shared}")
+            return 1
+        queue = CrawlQueue(queue_path)
+        try:
+            check_same_host(queue.settings())
+            counts = queue.counts()
+            failures = queue.failures()
+        except ValueError as e:
+            print(f"❌ Error: {str(e)}")
+            return 1
+        finally:
+            queue.close()
+        print(
+            f"📊 {counts['done']} done, {counts['leased']} in progress, {counts['queued']} queued, {counts['failed']} failed"
+        )
+        for url, error in failures:
+            print(f"   ❌ {url}: {error}")
+        return 0
+
+    try:
+        if args.command == "work":
+            if args.parallel_pages < 1:
+                print("❌ Error: --parallel-pages must be at least 1")
+                return 1
+            worker = CrawlWorker(
+                args.shared,
+                worker_id=args.worker_id,
+                parallel_pages=args.parallel_pages,
+                headless=args.headless,
+                browser_endpoint=args.browser_endpoint,
+                lease_seconds=args.lease_seconds,
+                max_attempts=args.max_attempts,
+            )
+            stats = asyncio.run(worker.run())
+            print(
+                f"✅ Worker finished: {stats['pages']} pages, {stats['failed']} failures, {stats['links_queued']} new pages queued"
+            )
+            return 0
+
+        cloner = MergingCloner(
+            args.shared,
+            args.output,
+            headless=args.headless,
+            inject_apis=not args.no_apis,
+            browser_endpoint=args.browser_endpoint,
+        )
+        result = asyncio.run(cloner.clone_website())
+        if not result["success"]:
+            print(f"\n❌ Merge failed: {result['error']}")
+            return 1
+        return 0
+
+    except KeyboardInterrupt:
+        print("\n⚠️  Operation cancelled by user")
+        print("   Unfinished jobs go back to the queue once their lease runs out")
+        return 1
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return 1
+
+
+if __name__ == "__main__":
+    exit(main())
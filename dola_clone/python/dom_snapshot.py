@@ -0,0 +1,208 @@
+import html
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+
+from static_page import extract_assets, style_property
+
+
+# "snapshot" reads rendered pages from one DOM snapshot; "scripts" runs the
+# injected extraction functions on them
+EXTRACTION_MODES = ("snapshot", "scripts")
+
+# Computed styles taken with the snapshot, in the order the layout lists them
+SNAPSHOT_STYLES = ("display", "visibility", "z-index", "position", "background-image")
+
+ELEMENT_NODE = 1
+TEXT_NODE = 3
+DOCUMENT_FRAGMENT_NODE = 11
+
+VOID_ELEMENTS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "source",
+    "track",
+    "wbr",
+}
+RAW_TEXT_ELEMENTS = {"script", "style"}
+
+FONT_EXTENSIONS = (".woff", ".woff2", ".ttf", ".otf", ".eot")
+
+# Resources stylesheets loaded, and the @font-face URLs of the CSSOM; the
+# snapshot has neither, so fonts and backgrounds of external stylesheets
+# are only seen here
+CSS_RESOURCES_SCRIPT = """
+(() => {
+    const fonts = [];
+    const readRules = (sheet) => {
+        let rules;
+        try {
+            rules = sheet.cssRules;
+        } catch (e) {
+            // Cross-origin rules are hidden; resource timing still has their loads
+            return;
+        }
+        for (const rule of rules) {
+            if (rule.styleSheet) {
+                readRules(rule.styleSheet);
+            } else if (rule instanceof CSSFontFaceRule) {
+                const base = rule.parentStyleSheet.href || document.baseURI;
+                const src = rule.style.getPropertyValue('src');
+                for (const match of src.matchAll(/url\\(\\s*['"]?([^'")]+)['"]?\\s*\\)/g)) {
+                    if (!match[1].startsWith('data:')) {
+                        fonts.push(new URL(match[1], base).href);
+                    }
+                }
+            } else if (rule.cssRules) {
+                readRules(rule);
+            }
+        }
+    };
+    for (const sheet of document.styleSheets) {
+        readRules(sheet);
+    }
+    return {
+        resources: performance.getEntriesByType('resource')
+            .filter(entry => entry.initiatorType === 'css')
+            .map(entry => entry.name),
+        fonts,
+    };
+})()
+"""
+
+
+async def capture_snapshot(page):
+    """The raw DOMSnapshot.captureSnapshot result for the page's documents"""
+    session = await page.context.new_cdp_session(page)
+    try:
+        return await session.send(
+            "DOMSnapshot.captureSnapshot", {"computedStyles": list(SNAPSHOT_STYLES)}
+        )
+    finally:
+        await session.detach()
+
+
+def computed_style(values):
+    """A style attribute holding the snapshot's computed values"""
+    declarations = []
+    for name, value in zip(SNAPSHOT_STYLES, values):
+        if value and not (name == "background-image" and value == "none"):
+            declarations.append(f"{name}: {value}")
+    return "; ".join(declarations)
+
+
+def snapshot_html(snapshot):
+    """(url, html) of the top document, rebuilt from a snapshot.
+
+    Each element's style attribute is replaced by its computed
+    SNAPSHOT_STYLES; elements without a layout box get display: none.
+    Shadow roots are inlined into their hosts, pseudo-elements, comments
+    and frames' documents are left out.
+    """
+    strings = snapshot["strings"]
+    document = snapshot["documents"][0]
+    nodes = document["nodes"]
+    layout = document["layout"]
+
+    def string(index):
+        return strings[index] if index >= 0 else ""
+
+    styles = {}
+    for node, values in zip(layout["nodeIndex"], layout["styles"]):
+        styles.setdefault(node, [string(value) for value in values])
+    pseudo_elements = set(nodes.get("pseudoType", {}).get("index", []))
+
+    parts = []
+    open_elements = []
+    # Node -> element its children are written into; -1 is the document
+    containers = {}
+    for index, parent in enumerate(nodes["parentIndex"]):
+        if parent < 0:
+            containers[index] = -1
+            continue
+        if parent not in containers or index in pseudo_elements:
+            continue
+
+        container = containers[parent]
+        while open_elements and open_elements[-1][0] != container:
+            parts.append(f"</{open_elements.pop()[1]}>")
+
+        node_type = nodes["nodeType"][index]
+        if node_type == DOCUMENT_FRAGMENT_NODE:
+            containers[index] = container
+        elif node_type == TEXT_NODE:
+            text = string(nodes["nodeValue"][index])
+            raw = open_elements and open_elements[-1][1] in RAW_TEXT_ELEMENTS
+            parts.append(text if raw else html.escape(text, quote=False))
+        elif node_type == ELEMENT_NODE:
+            tag = string(nodes["nodeName"][index]).lower()
+            names_and_values = nodes["attributes"][index]
+            attributes = {
+                string(names_and_values[i]): string(names_and_values[i + 1])
+                for i in range(0, len(names_and_values), 2)
+            }
+            attributes["style"] = (
+                computed_style(styles[index]) if index in styles else "display: none"
+            )
+            attribute_text = "".join(
+                f' {name}="{html.escape(value)}"' for name, value in attributes.items()
+            )
+            parts.append(f"<{tag}{attribute_text}>")
+            if tag not in VOID_ELEMENTS:
+                open_elements.append((index, tag))
+                containers[index] = index
+
+    while open_elements:
+        parts.append(f"</{open_elements.pop()[1]}>")
+
+    return string(document["documentURL"]), "".join(parts)
+
+
+def snapshot_document(snapshot):
+    """{"url", "html", "soup"}, shaped like StaticPageClassifier.classify() results"""
+    url, markup = snapshot_html(snapshot)
+    return {"url": url, "html": markup, "soup": BeautifulSoup(markup, "html.parser")}
+
+
+async def capture_document(page):
+    """The page's document, read in one DevTools round trip"""
+    return snapshot_document(await capture_snapshot(page))
+
+
+def is_rendered(element):
+    """Whether a snapshot element had a layout box and wasn't hidden"""
+    return (
+        style_property(element, "display", "") != "none"
+        and style_property(element, "visibility", "") != "hidden"
+    )
+
+
+def document_assets(document, css_resources=(), css_fonts=()):
+    """extract_assets() of a document, plus what its stylesheets loaded or declare"""
+    assets = extract_assets(document["soup"], document["url"])
+    for url in css_fonts:
+        path = urlsplit(url).path.lower()
+        extension = path.rsplit(".", 1)[-1] if path.endswith(FONT_EXTENSIONS) else ""
+        assets["fonts"].append({"url": url, "format": extension})
+    for url in css_resources:
+        path = urlsplit(url).path.lower()
+        if path.endswith(FONT_EXTENSIONS):
+            assets["fonts"].append({"url": url, "format": path.rsplit(".", 1)[-1]})
+        else:
+            assets["background_images"].append(
+                {"url": url, "element": "", "classes": "", "id": ""}
+            )
+    for asset_type in ("fonts", "background_images"):
+        unique = {}
+        for asset in assets[asset_type]:
+            unique.setdefault(asset["url"], asset)
+        assets[asset_type] = list(unique.values())
+    return assets
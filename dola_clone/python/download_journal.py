@@ -0,0 +1,76 @@
+import json
+import os
+from pathlib import Path
+
+
+JOURNAL_FILENAME = ".download_journal.jsonl"
+
+# Records written between fsyncs; every record is flushed immediately
+FSYNC_EVERY = 20
+
+
+class DownloadJournal:
+    """Append-only log of saved assets, so an interrupted clone can resume.
+
+    One JSON line is appended per finished asset and flushed right away.
+    A crash can at worst leave a truncated last line, which load() skips.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / JOURNAL_FILENAME
+        self.file = None
+        self.unsynced = 0
+
+    def load(self):
+        """Completed assets from an earlier run whose files are still intact"""
+        entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn write from the crash; everything before it is good
+                        continue
+
+                    file_path = self.output_dir / entry["path"]
+                    if file_path.exists() and file_path.stat().st_size == entry["size"]:
+                        entries[entry["url"]] = entry
+        except OSError:
+            pass
+        return entries
+
+    def record(self, url, file_path, asset_type, record, headers=None):
+        """Append one finished asset"""
+        if self.file is None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self.file = open(self.path, "a", encoding="utf-8")
+
+        entry = {
+            "url": url,
+            "path": Path(file_path).relative_to(self.output_dir).as_posix(),
+            "asset_type": asset_type,
+            **record,
+            **(headers or {}),
+        }
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+
+        self.unsynced += 1
+        if self.unsynced >= FSYNC_EVERY:
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def close(self):
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            self.file = None
+            self.unsynced = 0
+
+    def remove(self):
+        """Drop the journal once the clone has completed"""
+        self.close()
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,125 @@
+import asyncio
+from contextlib import nullcontext
+
+
+# Default number of assets in flight at once
+DEFAULT_CONCURRENCY = 8
+
+# Heavy asset types get a tighter limit so they don't starve the small ones
+DEFAULT_TYPE_LIMITS = {
+    "videos": 2,
+    "fonts": 4,
+}
+
+
+def parse_type_limits(values):
+    """Parse CLI values like ["videos=2", "fonts=4"] into a limits dict"""
+    limits = {}
+    for value in values or []:
+        asset_type, sep, limit = value.partition("=")
+        if not sep or not asset_type.strip():
+            raise ValueError(f"Invalid type limit '{value}' (expected TYPE=N)")
+        limit = int(limit)
+        if limit < 1:
+            raise ValueError(f"Type limit for '{asset_type}' must be at least 1")
+        limits[asset_type.strip()] = limit
+    return limits
+
+
+class OrderedProgress:
+    """Report download results in submission order while jobs finish in any order"""
+
+    def __init__(self, total, every=10, indent="  ", status=None):
+        self.total = total
+        self.every = every
+        self.indent = indent
+        # Optional callable returning extra text for progress lines
+        self.status = status
+        self.next_index = 0
+        self.finished = {}
+        self.downloaded = 0
+        self.failed = 0
+
+    def complete(self, index, result):
+        """Record a finished job and flush every result that is now in order"""
+        self.finished[index] = result
+        while self.next_index in self.finished:
+            self.report(self.finished.pop(self.next_index))
+            self.next_index += 1
+
+    def report(self, result):
+        if isinstance(result, Exception):
+            self.failed += 1
+            print(f"{self.indent}❌ Error downloading asset: {str(result)}")
+            return
+
+        if not result or result.get("skipped"):
+            return
+
+        if result.get("success"):
+            self.downloaded += 1
+            if self.downloaded % self.every == 0:
+                status = self.status() if self.status else ""
+                print(
+                    f"{self.indent}📈 Progress: {self.downloaded}/{self.total} assets downloaded"
+                    + (f" | {status}" if status else "")
+                )
+        else:
+            self.failed += 1
+            print(
+                f"{self.indent}⚠️ Failed to download: {result.get('url')} - {result.get('error', 'Unknown error')}"
+            )
+
+
+class DownloadScheduler:
+    """Run asset downloads concurrently under a global and per-asset-type limit"""
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, type_limits=None):
+        self.concurrency = max(1, int(concurrency))
+        self.type_limits = dict(DEFAULT_TYPE_LIMITS)
+        self.type_limits.update(type_limits or {})
+        self.global_slots = None
+        self.type_slots = None
+
+    def describe(self):
+        """Scheduler settings for the extraction report"""
+        return {
+            "concurrency": self.concurrency,
+            "type_limits": dict(self.type_limits),
+        }
+
+    async def run(self, jobs, worker, progress=None):
+        """Run worker(asset_type, asset) for every (asset_type, asset) job.
+
+        Results are returned in job order. A worker exception is returned in
+        place of its result instead of cancelling the remaining jobs. Runs
+        for several pages at once share the same limits.
+        """
+        if self.global_slots is None:
+            self.global_slots = asyncio.Semaphore(self.concurrency)
+            self.type_slots = {
+                asset_type: asyncio.Semaphore(min(limit, self.concurrency))
+                for asset_type, limit in self.type_limits.items()
+            }
+        global_slots = self.global_slots
+        type_slots = self.type_slots
+
+        async def run_job(index, asset_type, asset):
+            # Take the type slot first so a throttled type never holds a global slot
+            async with type_slots.get(asset_type) or nullcontext():
+                async with global_slots:
+                    try:
+                        result = await worker(asset_type, asset)
+                    except Exception as e:
+                        result = e
+
+            if progress:
+                progress.complete(index, result)
+            return result
+
+        return await asyncio.gather(
+            *(
+                run_job(index, asset_type, asset)
+                for index, (asset_type, asset) in enumerate(jobs)
+            )
+        )
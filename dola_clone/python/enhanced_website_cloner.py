@@ -16,12 +16,20 @@ import requests
 from PIL import Image
 import io
 
+from page_settle import SettleDetector
+from scroll_driver import ScrollDriver
+from browser_server import ENDPOINT_ENV, open_browser
+from extraction_scripts import BACKGROUND_IMAGES_SCRIPT, register_extraction_scripts
+
 class EnhancedWebsiteCloner:
-    def __init__(self, target_url, output_dir="cloned_website", headless=True, delay=3000):
+    def __init__(self, target_url, output_dir="cloned_website", headless=True, delay=3000, browser_endpoint=None):
         self.target_url = target_url
         self.output_dir = Path(output_dir)
         self.headless = headless
+        self.browser_endpoint = browser_endpoint
         self.delay = delay
+        self.settle = SettleDetector()
+        self.scroll_driver = ScrollDriver(self.settle)
         self.assets_dir = self.output_dir / "assets"
         self.components_dir = self.output_dir / "components"
         self.api_dir = self.output_dir / "api"
@@ -83,8 +91,8 @@ class EnhancedWebsiteCloner:
         
         print(f"✅ Created project structure in {self.output_dir}")
 
-    async def inject_asset_extraction_script(self, page):
-        """Inject comprehensive asset extraction script into browser context"""
+    async def register_asset_extraction_script(self, context):
+        """Register the asset extraction script for every page of the browser context"""
         extraction_script = """
         window.extractAllAssets = function() {
             const assets = {
@@ -141,20 +149,11 @@ class EnhancedWebsiteCloner:
             });
             
             // Extract background images
-            document.querySelectorAll('*').forEach(el => {
-                const style = window.getComputedStyle(el);
-                if (style.backgroundImage && style.backgroundImage !== 'none') {
-                    const matches = style.backgroundImage.match(/url\(['"]?([^'"\)]+)['"]?\)/g);
-                    if (matches) {
-                        matches.forEach(match => {
-                            const url = match.match(/url\(['"]?([^'"\)]+)['"]?\)/)[1];
-                            assets.background_images.push({
-                                url: new URL(url, window.location.href).href,
-                                element: el.tagName.toLowerCase()
-                            });
-                        });
-                    }
-                }
+            window.findBackgroundImages().forEach(background => {
+                assets.background_images.push({
+                    url: background.url,
+                    element: background.element
+                });
             });
             
             // Extract videos
@@ -231,16 +230,16 @@ class EnhancedWebsiteCloner:
         };
         """
         
-        await page.evaluate(extraction_script)
-        print("✅ Asset extraction script injected")
+        await register_extraction_scripts(
+            context, (BACKGROUND_IMAGES_SCRIPT, extraction_script)
+        )
 
     async def wait_for_dynamic_content(self, page):
         """Wait for dynamic content to load including modals and lazy-loaded elements"""
         print("⏳ Waiting for dynamic content...")
         
         # Wait for initial load
-        await page.wait_for_load_state('networkidle')
-        await asyncio.sleep(self.delay / 1000)
+        await self.settle.wait(page, self.delay)
         
         # Try to trigger modals and dynamic content
         modal_triggers = [
@@ -261,7 +260,7 @@ class EnhancedWebsiteCloner:
                 for element in elements[:3]:  # Limit to first 3 to avoid spam
                     try:
                         await element.click(timeout=1000)
-                        await asyncio.sleep(0.5)
+                        await self.settle.wait(page, 500)
                         # Try to close modal
                         close_selectors = ['.modal .close', '.modal-close', '[data-dismiss="modal"]', '.close-btn']
                         for close_sel in close_selectors:
@@ -272,30 +271,15 @@ class EnhancedWebsiteCloner:
                                     break
                             except:
                                 continue
-                        await asyncio.sleep(0.5)
+                        await self.settle.wait(page, 500)
                     except:
                         continue
             except:
                 continue
         
-        # Scroll to trigger lazy loading
-        await page.evaluate("""
-            window.scrollTo(0, document.body.scrollHeight / 4);
-        """)
-        await asyncio.sleep(1)
-        
-        await page.evaluate("""
-            window.scrollTo(0, document.body.scrollHeight / 2);
-        """)
-        await asyncio.sleep(1)
-        
-        await page.evaluate("""
-            window.scrollTo(0, document.body.scrollHeight);
-        """)
-        await asyncio.sleep(1)
-        
-        await page.evaluate("window.scrollTo(0, 0);")
-        await asyncio.sleep(1)
+        # Scroll one viewport at a time until lazy loading stops
+        scroll = await self.scroll_driver.scroll(page)
+        print(f"  📜 Scrolled {scroll['steps']} steps, {scroll['requests']} lazy requests")
         
         print("✅ Dynamic content loading completed")
 
@@ -819,12 +803,15 @@ npm start
         await self.setup_directories()
         
         async with async_playwright() as p:
-            # Launch browser
-            browser = await p.chromium.launch(headless=self.headless)
+            # Connect to the browser server, or launch a browser
+            browser = await open_browser(p, self.browser_endpoint, self.headless, args=())
             context = await browser.new_context(
                 viewport={'width': 1920, 'height': 1080},
                 user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             )
+            
+            # Defined in each document before the site's own scripts run
+            await self.register_asset_extraction_script(context)
             page = await context.new_page()
             
             try:
@@ -832,9 +819,6 @@ npm start
                 print(f"🌐 Loading {self.target_url}...")
                 await page.goto(self.target_url, wait_until='networkidle')
                 
-                # Inject asset extraction scripts
-                await self.inject_asset_extraction_script(page)
-                
                 # Wait for dynamic content
                 await self.wait_for_dynamic_content(page)
                 
@@ -885,6 +869,7 @@ def main():
     parser.add_argument('--headless', action='store_true', help='Run in headless mode')
     parser.add_argument('--delay', type=int, default=3000, help='Delay for dynamic content (ms)')
     parser.add_argument('--inject-apis', action='store_true', default=True, help='Inject API integrations')
+    parser.add_argument('--browser-endpoint', help=f'Connect to a running browser_server.py instead of launching Chromium (default: ${ENDPOINT_ENV})')
     
     args = parser.parse_args()
     
@@ -893,7 +878,8 @@ def main():
         target_url=args.url,
         output_dir=args.output,
         headless=args.headless,
-        delay=args.delay
+        delay=args.delay,
+        browser_endpoint=args.browser_endpoint
     )
     
     # Run the cloning process
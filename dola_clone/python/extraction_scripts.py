@@ -0,0 +1,388 @@
+import hashlib
+import weakref
+
+from asset_fetcher import BATCH_FETCH_SCRIPT
+
+
+# Defines window.findBackgroundImages(): [{url, element, classes, id}], read
+# from CSSOM rules rather than the computed style of every element
+BACKGROUND_IMAGES_SCRIPT = r"""
+        window.findBackgroundImages = function() {
+            const found = [];
+            const urlRegex = /url\s*\(\s*['"]?([^'"\)]+)['"]?\s*\)/g;
+            const fontRegex = /\.(woff2?|ttf|otf|eot)(\?|#|$)/i;
+            // Backgrounds of pseudo-elements and hover/focus states belong
+            // to the element itself, which querySelector can find
+            const statePseudos = /::?(before|after|first-line|first-letter|marker|hover|focus-visible|focus-within|focus|active|visited)(?![\w-])/g;
+
+            const add = (el, value, baseUrl) => {
+                for (const match of value.matchAll(urlRegex)) {
+                    try {
+                        found.push({
+                            url: new URL(match[1], baseUrl).href,
+                            element: el.tagName.toLowerCase(),
+                            classes: el.className,
+                            id: el.id
+                        });
+                    } catch (e) {}
+                }
+            };
+
+            // selector -> [{value, baseUrl}] of rules that set a background url().
+            // Every @media block counts and the cascade isn't applied, so a
+            // background no element shows right now can be reported too.
+            const bySelector = new Map();
+            const collect = (rules, baseUrl) => {
+                Array.from(rules).forEach(rule => {
+                    if (rule.styleSheet) {
+                        readSheet(rule.styleSheet);
+                    } else if (rule.selectorText && rule.style) {
+                        const value = rule.style.getPropertyValue('background-image') ||
+                            rule.style.getPropertyValue('background');
+                        if (value && value.includes('url')) {
+                            const selector = rule.selectorText.replace(statePseudos, '');
+                            if (!bySelector.has(selector)) bySelector.set(selector, []);
+                            bySelector.get(selector).push({value: value, baseUrl: baseUrl});
+                        }
+                    } else if (rule.cssRules) {
+                        // @media, @supports, @layer and @container blocks
+                        collect(rule.cssRules, baseUrl);
+                    }
+                });
+            };
+            const readSheet = sheet => {
+                let rules;
+                try {
+                    rules = sheet.cssRules;
+                } catch (e) {
+                    return;
+                }
+                collect(rules, sheet.href || document.baseURI);
+            };
+            Array.from(document.styleSheets).forEach(readSheet);
+            Array.from(document.adoptedStyleSheets || []).forEach(readSheet);
+
+            bySelector.forEach((entries, selector) => {
+                let el = null;
+                try {
+                    el = document.querySelector(selector || '*');
+                } catch (e) {}
+                if (el) entries.forEach(entry => add(el, entry.value, entry.baseUrl));
+            });
+
+            // Inline styles are the only place computed style is still needed
+            document.querySelectorAll('[style*="url"]').forEach(el => {
+                const value = window.getComputedStyle(el).backgroundImage;
+                if (value && value !== 'none') add(el, value, document.baseURI);
+            });
+
+            // Cross-origin sheets can't be read; take what they loaded from
+            // resource timing, without element context
+            performance.getEntriesByType('resource').forEach(entry => {
+                if (entry.initiatorType === 'css' && !fontRegex.test(entry.name)) {
+                    found.push({url: entry.name, element: '', classes: '', id: ''});
+                }
+            });
+
+            return found;
+        };
+"""
+
+# Defines window.extractAllAssets(), grouped by asset type
+ASSETS_SCRIPT = r"""
+        window.extractAllAssets = function() {
+            const assets = {
+                images: [],
+                stylesheets: [],
+                scripts: [],
+                fonts: [],
+                videos: [],
+                other: [],
+                inline_styles: [],
+                background_images: []
+            };
+
+            // Extract images with better metadata
+            document.querySelectorAll('img').forEach(img => {
+                if (img.src && !img.src.startsWith('data:')) {
+                    assets.images.push({
+                        url: img.src,
+                        alt: img.alt || '',
+                        width: img.naturalWidth || img.width,
+                        height: img.naturalHeight || img.height,
+                        element: 'img',
+                        classes: img.className,
+                        loading: img.loading || 'eager'
+                    });
+                }
+            });
+
+            // Extract stylesheets
+            document.querySelectorAll('link[rel="stylesheet"]').forEach(link => {
+                assets.stylesheets.push({
+                    url: link.href,
+                    media: link.media || 'all',
+                    integrity: link.integrity || '',
+                    crossorigin: link.crossOrigin || ''
+                });
+            });
+
+            // Extract scripts
+            document.querySelectorAll('script[src]').forEach(script => {
+                assets.scripts.push({
+                    url: script.src,
+                    type: script.type || 'text/javascript',
+                    async: script.async,
+                    defer: script.defer,
+                    integrity: script.integrity || ''
+                });
+            });
+
+            // Extract inline styles
+            document.querySelectorAll('style').forEach(style => {
+                if (style.textContent.trim()) {
+                    assets.inline_styles.push({
+                        content: style.textContent,
+                        media: style.media || 'all'
+                    });
+                }
+            });
+
+            // Extract fonts from CSS with better detection
+            const extractFontsFromCSS = (cssText, baseUrl) => {
+                const fontRegex = /url\s*\(\s*['"]*([^'"\)]+\.(woff2?|ttf|otf|eot))['"]*\s*\)/gi;
+                let match;
+                while ((match = fontRegex.exec(cssText)) !== null) {
+                    try {
+                        const fontUrl = new URL(match[1], baseUrl).href;
+                        assets.fonts.push({url: fontUrl, format: match[2]});
+                    } catch (e) {}
+                }
+            };
+
+            // Process stylesheets for fonts
+            Array.from(document.styleSheets).forEach(sheet => {
+                try {
+                    Array.from(sheet.cssRules || sheet.rules).forEach(rule => {
+                        if (rule.cssText) {
+                            extractFontsFromCSS(rule.cssText, sheet.href || window.location.href);
+                        }
+                    });
+                } catch (e) {}
+            });
+
+            // Process inline styles for fonts
+            assets.inline_styles.forEach(style => {
+                extractFontsFromCSS(style.content, window.location.href);
+            });
+
+            // Extract background images with element context
+            assets.background_images = window.findBackgroundImages();
+
+            // Extract videos and audio
+            document.querySelectorAll('video, audio, source').forEach(media => {
+                if (media.src) {
+                    assets.videos.push({
+                        url: media.src,
+                        type: media.type || '',
+                        element: media.tagName.toLowerCase()
+                    });
+                }
+            });
+
+            // Remove duplicates
+            Object.keys(assets).forEach(key => {
+                if (Array.isArray(assets[key])) {
+                    const seen = new Set();
+                    assets[key] = assets[key].filter(item => {
+                        const url = item.url || item.content;
+                        if (seen.has(url)) return false;
+                        seen.add(url);
+                        return true;
+                    });
+                }
+            });
+
+            return assets;
+        };
+"""
+
+# Defines window.detectUIPatterns(): modals, forms, banners and navigation
+UI_PATTERNS_SCRIPT = r"""
+        window.detectUIPatterns = function() {
+            let patterns = {
+                modals: [],
+                forms: [],
+                banners: [],
+                navigation: [],
+                buttons: [], // Ensure this is always present
+                inputs: []
+            };
+
+            try {
+                // Detect modals with better selectors
+                const modalSelectors = [
+                    '[class*="modal"]', '[id*="modal"]', '.popup', '.dialog',
+                    '[role="dialog"]', '[aria-modal="true"]', '.overlay',
+                    '[class*="popup"]', '[class*="dialog"]'
+                ];
+
+                modalSelectors.forEach(selector => {
+                    document.querySelectorAll(selector).forEach(modal => {
+                        const style = window.getComputedStyle(modal);
+                        patterns.modals.push({
+                            element: modal.tagName,
+                            classes: modal.className,
+                            id: modal.id,
+                            visible: style.display !== 'none' && style.visibility !== 'hidden',
+                            zIndex: style.zIndex,
+                            position: style.position
+                        });
+                    });
+                });
+
+                // Enhanced form detection
+                document.querySelectorAll('form').forEach(form => {
+                    const inputs = form.querySelectorAll('input, textarea, select');
+                    const buttons = form.querySelectorAll('button, input[type="submit"]');
+
+                    const formData = {
+                        action: form.action,
+                        method: form.method || 'GET',
+                        id: form.id,
+                        classes: form.className,
+                        inputs: Array.from(inputs).map(input => input ? {
+                            type: input.type,
+                            name: input.name,
+                            placeholder: input.placeholder,
+                            required: input.required,
+                            id: input.id,
+                            classes: input.className
+                        } : {}),
+                        buttons: Array.from(buttons).map(btn => btn ? {
+                            type: btn.type,
+                            text: btn.textContent?.trim() || btn.value,
+                            classes: btn.className
+                        } : {})
+                    };
+
+                    patterns.forms.push(formData);
+                });
+
+                // Detect banners and sliders
+                const bannerSelectors = [
+                    '[class*="banner"]', '[class*="slider"]', '[class*="carousel"]',
+                    '[class*="hero"]', '[class*="swiper"]', '[id*="banner"]',
+                    '[id*="slider"]', '[id*="carousel"]'
+                ];
+
+                bannerSelectors.forEach(selector => {
+                    document.querySelectorAll(selector).forEach(banner => {
+                        patterns.banners.push({
+                            element: banner.tagName,
+                            classes: banner.className,
+                            id: banner.id,
+                            images: Array.from(banner.querySelectorAll('img')).map(img => img.src)
+                        });
+                    });
+                });
+
+                // Detect navigation
+                document.querySelectorAll('nav, [role="navigation"], .navbar, .menu').forEach(nav => {
+                    const links = nav.querySelectorAll('a');
+                    patterns.navigation.push({
+                        element: nav.tagName,
+                        classes: nav.className,
+                        id: nav.id,
+                        links: Array.from(links).map(link => ({
+                            href: link.href,
+                            text: link.textContent?.trim(),
+                            classes: link.className
+                        }))
+                    });
+                });
+
+            } catch (e) {
+                console.error("Error in detectUIPatterns: ", e);
+            }
+
+            return patterns;
+        };
+"""
+
+# Defines window.getInternalLinks() for crawling
+INTERNAL_LINKS_SCRIPT = r"""
+        window.getInternalLinks = function() {
+            const currentDomain = window.location.hostname;
+            const links = new Set();
+
+            document.querySelectorAll('a[href]').forEach(link => {
+                try {
+                    const url = new URL(link.href, window.location.href);
+                    // Fragment variants are folded together by the crawl frontier
+                    if (url.hostname === currentDomain && 
+                        !link.href.includes('mailto:') && 
+                        !link.href.includes('tel:')) {
+                        links.add(url.href);
+                    }
+                } catch (e) {}
+            });
+
+            return Array.from(links);
+        };
+"""
+
+EXTRACTION_SCRIPTS = (
+    BACKGROUND_IMAGES_SCRIPT,
+    ASSETS_SCRIPT,
+    UI_PATTERNS_SCRIPT,
+    INTERNAL_LINKS_SCRIPT,
+    BATCH_FETCH_SCRIPT,
+)
+
+# Contexts the scripts were already added to
+_registered = weakref.WeakSet()
+
+
+def minify_script(source):
+    """Drop indentation, blank lines and whole-line comments.
+
+    Line breaks stay, so automatic semicolon insertion and strings are
+    unaffected.
+    """
+    lines = (line.strip() for line in source.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+
+def build_init_script(scripts=EXTRACTION_SCRIPTS):
+    """(version, script) defining scripts once in each top-level document.
+
+    The version is a hash of the sources, left in window.__extractionScripts
+    so a document shows which scripts it got and never runs them twice.
+    """
+    source = "\n".join(minify_script(script) for script in scripts)
+    version = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+    script = (
+        "(() => {\n"
+        "if (window !== window.top) return;\n"
+        f"if (window.__extractionScripts === '{version}') return;\n"
+        f"{source}\n"
+        f"window.__extractionScripts = '{version}';\n"
+        "})();"
+    )
+    return version, script
+
+
+async def register_extraction_scripts(context, scripts=EXTRACTION_SCRIPTS):
+    """Define the extraction functions in every document context loads.
+
+    Call before the context's first navigation; pages already showing a
+    document only get them once they navigate again.
+    """
+    if context in _registered:
+        return False
+    version, script = build_init_script(scripts)
+    await context.add_init_script(script=script)
+    _registered.add(context)
+    print(f"✅ Extraction scripts registered (v{version}, {len(script) // 1024} KB)")
+    return True
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from urllib.parse import urlparse
+
+
+# Starting and maximum parallel requests per host
+DEFAULT_HOST_INITIAL = 2
+DEFAULT_HOST_MAX = 16
+
+# Latency above this multiple of the host's best latency counts as congestion
+LATENCY_TOLERANCE = 2.0
+
+# Pause after a throttling signal, doubled per consecutive signal
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 10.0
+
+# Statuses that mean "slow down" rather than "this URL is broken"
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def host_of(url):
+    return urlparse(url).netloc or url
+
+
+def classify_status(status):
+    """"ok", "throttled" or "failed" for an HTTP status"""
+    if 200 <= status < 400:
+        return "ok"
+    if status in THROTTLE_STATUSES or status >= 500:
+        return "throttled"
+    return "failed"
+
+
+class HostState:
+    def __init__(self, initial):
+        self.limit = float(initial)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.consecutive_throttles = 0
+        self.best_latency = None
+        self.latency = None
+        self.ok = 0
+        self.throttled = 0
+        self.failed = 0
+        self.peak_limit = float(initial)
+        self.changed = asyncio.Event()
+
+    def describe(self):
+        return {
+            "limit": round(self.limit, 2),
+            "peak_limit": round(self.peak_limit, 2),
+            "in_flight": self.in_flight,
+            "latency_ms": round(self.latency * 1000) if self.latency else None,
+            "ok": self.ok,
+            "throttled": self.throttled,
+            "failed": self.failed,
+        }
+
+
+class HostConcurrency:
+    """Per-host request limits adjusted by additive increase, multiplicative decrease.
+
+    Each successful request with healthy latency grows the host's limit by
+    about one per round of requests; a 429, 5xx or timeout halves it and
+    pauses the host with an exponential backoff before anyone retries.
+    """
+
+    def __init__(self, initial=DEFAULT_HOST_INITIAL, maximum=DEFAULT_HOST_MAX):
+        self.initial = initial
+        self.maximum = maximum
+        self.hosts = {}
+
+    def state(self, url):
+        host = host_of(url)
+        if host not in self.hosts:
+            self.hosts[host] = HostState(self.initial)
+        return self.hosts[host]
+
+    async def acquire(self, url):
+        """Wait for a free slot on url's host; returns the start time to pass to release"""
+        state = self.state(url)
+        while True:
+            pause = state.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            if state.in_flight < max(1, int(state.limit)):
+                break
+            state.changed.clear()
+            await state.changed.wait()
+
+        state.in_flight += 1
+        return time.monotonic()
+
+    def release(self, url, started, outcome, retry_after=None):
+        """Record how a request went and adjust the host's limit"""
+        state = self.state(url)
+        state.in_flight -= 1
+        latency = time.monotonic() - started
+
+        if outcome == "ok":
+            state.ok += 1
+            state.consecutive_throttles = 0
+            state.latency = (
+                latency if state.latency is None else state.latency * 0.8 + latency * 0.2
+            )
+            if state.best_latency is None or latency < state.best_latency:
+                state.best_latency = latency
+
+            # Additive increase while the host keeps answering quickly
+            if state.latency <= state.best_latency * LATENCY_TOLERANCE + 0.05:
+                state.limit = min(self.maximum, state.limit + 1 / state.limit)
+                state.peak_limit = max(state.peak_limit, state.limit)
+        elif outcome == "throttled":
+            state.throttled += 1
+            state.consecutive_throttles += 1
+            state.limit = max(1.0, state.limit / 2)
+            backoff = min(
+                BACKOFF_MAX_SECONDS,
+                BACKOFF_BASE_SECONDS * 2 ** (state.consecutive_throttles - 1),
+            )
+            if retry_after is not None:
+                backoff = min(BACKOFF_MAX_SECONDS, max(backoff, retry_after))
+            state.paused_until = max(state.paused_until, time.monotonic() + backoff)
+        else:
+            state.failed += 1
+
+        state.changed.set()
+
+    def describe(self):
+        """Per-host state for progress output and the extraction report"""
+        return {host: state.describe() for host, state in self.hosts.items()}
+
+
+def summarize_hosts(hosts, top=3):
+    """One-line summary of the busiest hosts, e.g. "cdn.example.com×6 (2 throttled)" """
+    busiest = sorted(
+        hosts.items(), key=lambda item: item[1]["ok"] + item[1]["throttled"], reverse=True
+    )[:top]
+    parts = []
+    for host, state in busiest:
+        part = f"{host}×{int(state['limit'])}"
+        if state["throttled"]:
+            part += f" ({state['throttled']} throttled)"
+        parts.append(part)
+    return ", ".join(parts)
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header, ignoring the HTTP-date form"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
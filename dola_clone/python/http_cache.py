@@ -0,0 +1,357 @@
+import asyncio
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from asset_storage import (
+    DEFAULT_STREAM_THRESHOLD,
+    write_base64,
+    write_bytes,
+    write_chunks_async,
+)
+
+
+# Bodies kept across runs before the least recently used ones are evicted
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Revalidation requests in flight at once
+DEFAULT_REVALIDATE_CONCURRENCY = 8
+
+
+@contextmanager
+def locked(path):
+    """Hold an exclusive lock on the file at path, across processes"""
+    with open(path, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class HttpCache:
+    """On-disk cache of asset bodies, revalidated with ETag/Last-Modified.
+
+    Entries are keyed by URL and point at a body stored under its SHA-256,
+    so URLs serving the same bytes share one cached copy. A 304 answer to a
+    conditional request reuses the cached body without moving it again.
+    Several processes may use one cache directory: save() merges with the
+    index on disk under a lock, and a body is only deleted once the merged
+    index no longer refers to it.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_MAX_BYTES, timeout=30000):
+        self.cache_dir = Path(cache_dir)
+        self.bodies_dir = self.cache_dir / "bodies"
+        self.index_path = self.cache_dir / "index.json"
+        self.lock_path = self.cache_dir / "index.lock"
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.entries = {}
+        # Bodies this process stopped referring to, deleted on save if unused
+        self.orphans = set()
+        # URL -> last_used of the entries this process evicted
+        self.evicted = {}
+        self.counter = 0
+        self.stats = {
+            "entries": 0,
+            "cached_bytes": 0,
+            "revalidated": 0,
+            "changed": 0,
+            "stored": 0,
+            "evicted": 0,
+            "bytes_reused": 0,
+            "bytes_downloaded": 0,
+        }
+        self.load()
+
+    def read_index(self):
+        """Entries of the index on disk whose body still exists"""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+
+        # Drop entries whose body was removed behind our back
+        return {
+            url: entry
+            for url, entry in entries.items()
+            if self.body_path(entry["sha256"]).exists()
+        }
+
+    def load(self):
+        """Read the index left by the previous run"""
+        self.bodies_dir.mkdir(parents=True, exist_ok=True)
+        self.entries = self.read_index()
+        self.update_totals()
+
+    def merge(self, entries):
+        """Take entries saved by other processes that were used more recently"""
+        for url, entry in entries.items():
+            if entry["last_used"] <= self.evicted.get(url, float("-inf")):
+                continue
+            mine = self.entries.get(url)
+            if mine is None or entry["last_used"] > mine["last_used"]:
+                if mine:
+                    self.orphans.add(mine["sha256"])
+                self.entries[url] = entry
+            else:
+                self.orphans.add(entry["sha256"])
+        self.update_totals()
+
+    def save(self):
+        """Merge with the index on disk, evict down to the size limit and write it"""
+        with locked(self.lock_path):
+            self.merge(self.read_index())
+            self.evict()
+            tmp_path = self.index_path.with_name(f"index.{os.getpid()}.{id(self)}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.index_path)
+            self.remove_orphans()
+
+    def remove_orphans(self):
+        """Delete bodies this process dropped that no saved entry refers to"""
+        referenced = {entry["sha256"] for entry in self.entries.values()}
+        for sha256 in self.orphans - referenced:
+            self.body_path(sha256).unlink(missing_ok=True)
+        self.orphans.clear()
+
+    def body_path(self, sha256):
+        return self.bodies_dir / sha256[:2] / sha256
+
+    def has(self, url):
+        return url in self.entries
+
+    def validators(self, url):
+        """Conditional request headers for a cached URL"""
+        entry = self.entries.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def next_staging_path(self, staging_dir):
+        staging_dir = Path(staging_dir)
+        staging_dir.mkdir(parents=True, exist_ok=True)
+        self.counter += 1
+        return staging_dir / f"cached_{self.counter:06d}.bin"
+
+    async def revalidate(
+        self, request_context, url, dest_path, stream_threshold=DEFAULT_STREAM_THRESHOLD
+    ):
+        """Copy url's body to dest_path if the server confirms it is unchanged.
+
+        A changed body is downloaded, cached and written to dest_path
+        instead. Returns None when the URL isn't cached or the request
+        failed, so the caller can fetch it the usual way.
+        """
+        entry = self.entries.get(url)
+        if not entry:
+            return None
+
+        try:
+            response = await request_context.get(
+                url,
+                headers=self.validators(url),
+                timeout=self.timeout,
+                fail_on_status_code=False,
+            )
+        except Exception:
+            return None
+
+        try:
+            if response.status == 304:
+                shutil.copyfile(self.body_path(entry["sha256"]), dest_path)
+                entry["last_used"] = time.time()
+                self.stats["revalidated"] += 1
+                self.stats["bytes_reused"] += entry["size"]
+                return {
+                    "success": True,
+                    "path": str(dest_path),
+                    "contentType": entry["content_type"],
+                    "size": entry["size"],
+                    "sha256": entry["sha256"],
+                    "etag": entry.get("etag"),
+                    "lastModified": entry.get("last_modified"),
+                    "url": url,
+                    "cached": True,
+                }
+
+            if not response.ok:
+                return None
+
+            body = await response.body()
+            written = await asyncio.to_thread(
+                write_bytes, dest_path, body, stream_threshold
+            )
+            result = {
+                "success": True,
+                "path": str(dest_path),
+                "contentType": response.headers.get("content-type", ""),
+                "size": written["size"],
+                "sha256": written["sha256"],
+                "etag": response.headers.get("etag"),
+                "lastModified": response.headers.get("last-modified"),
+                "url": url,
+            }
+            self.stats["changed"] += 1
+            self.store(result)
+            return result
+        except Exception:
+            return None
+        finally:
+            await response.dispose()
+
+    async def revalidate_all(
+        self,
+        request_context,
+        urls,
+        staging_dir,
+        concurrency=DEFAULT_REVALIDATE_CONCURRENCY,
+        stream_threshold=DEFAULT_STREAM_THRESHOLD,
+    ):
+        """Revalidate every cached URL in urls; returns {url: result} for the hits"""
+        slots = asyncio.Semaphore(concurrency)
+
+        async def revalidate_one(url):
+            async with slots:
+                return await self.revalidate(
+                    request_context,
+                    url,
+                    self.next_staging_path(staging_dir),
+                    stream_threshold,
+                )
+
+        cached_urls = [url for url in urls if self.has(url)]
+        results = await asyncio.gather(*(revalidate_one(url) for url in cached_urls))
+        return {url: result for url, result in zip(cached_urls, results) if result}
+
+    async def materialize(
+        self, result, dest_path, chunks=None, stream_threshold=DEFAULT_STREAM_THRESHOLD
+    ):
+        """Write a data or stream fetch result to dest_path and cache it.
+
+        Returns an equivalent result that points at the file, like the ones
+        the request backend produces.
+        """
+        if result.get("path"):
+            written = {"sha256": result["sha256"], "size": result["size"]}
+            dest_path = result["path"]
+        elif result.get("streamId"):
+            try:
+                written = await write_chunks_async(dest_path, chunks)
+            except Exception:
+                Path(dest_path).unlink(missing_ok=True)
+                raise
+        else:
+            written = write_base64(dest_path, result["data"], stream_threshold)
+
+        materialized = {
+            "success": True,
+            "path": str(dest_path),
+            "contentType": result.get("contentType", ""),
+            "size": written["size"],
+            "sha256": written["sha256"],
+            "etag": result.get("etag"),
+            "lastModified": result.get("lastModified"),
+            "url": result["url"],
+        }
+        self.store(materialized)
+        return materialized
+
+    def store(self, result):
+        """Cache a body already on disk; bodies without validators are skipped"""
+        if not (result.get("etag") or result.get("lastModified")):
+            return
+
+        body_path = self.body_path(result["sha256"])
+        if not body_path.exists():
+            body_path.parent.mkdir(parents=True, exist_ok=True)
+            # A copy, never a link: cloners rewrite some assets in place later
+            tmp_path = body_path.with_name(f"{body_path.name}.{os.getpid()}.tmp")
+            shutil.copyfile(result["path"], tmp_path)
+            os.replace(tmp_path, body_path)
+            self.stats["bytes_downloaded"] += result["size"]
+
+        previous = self.entries.get(result["url"])
+        self.entries[result["url"]] = {
+            "sha256": result["sha256"],
+            "size": result["size"],
+            "content_type": result.get("contentType", ""),
+            "etag": result.get("etag"),
+            "last_modified": result.get("lastModified"),
+            "last_used": time.time(),
+        }
+        self.stats["stored"] += 1
+
+        # A changed body is deleted on save unless some URL still uses it
+        if previous and previous["sha256"] != result["sha256"]:
+            self.orphans.add(previous["sha256"])
+        self.update_totals()
+
+    def store_capture(self, url, captured):
+        """Cache a body recorded by NetworkCapture before it is moved away"""
+        self.store(
+            {
+                "path": captured["path"],
+                "contentType": captured["content_type"],
+                "size": captured["size"],
+                "sha256": captured["sha256"],
+                "etag": captured["etag"],
+                "lastModified": captured["last_modified"],
+                "url": url,
+            }
+        )
+
+    def update_totals(self):
+        sizes = {entry["sha256"]: entry["size"] for entry in self.entries.values()}
+        self.stats["entries"] = len(self.entries)
+        self.stats["cached_bytes"] = sum(sizes.values())
+
+    def evict(self):
+        """Drop least recently used entries until the bodies fit in max_bytes"""
+        if self.stats["cached_bytes"] <= self.max_bytes:
+            return
+
+        refs = {}
+        for url, entry in self.entries.items():
+            refs.setdefault(entry["sha256"], set()).add(url)
+
+        total = self.stats["cached_bytes"]
+        for url, entry in sorted(
+            self.entries.items(), key=lambda item: item[1]["last_used"]
+        ):
+            if total <= self.max_bytes:
+                break
+
+            del self.entries[url]
+            self.evicted[url] = entry["last_used"]
+            self.stats["evicted"] += 1
+            urls = refs[entry["sha256"]]
+            urls.discard(url)
+            if not urls:
+                self.orphans.add(entry["sha256"])
+                total -= entry["size"]
+
+        self.update_totals()
@@ -0,0 +1,255 @@
+import asyncio
+import gzip
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from host_concurrency import HostConcurrency, classify_status
+
+
+LINK_DISCOVERY_MODES = ("browser", "static", "both")
+
+# URLs taken from sitemaps and static pages before discovery stops
+DEFAULT_MAX_DISCOVERED = 50000
+
+# Nested sitemap indexes followed at most this deep
+MAX_SITEMAP_NESTING = 3
+
+# Links to files the crawler has no reason to render
+NON_PAGE_EXTENSIONS = (
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".gif",
+    ".webp",
+    ".svg",
+    ".ico",
+    ".css",
+    ".js",
+    ".woff",
+    ".woff2",
+    ".ttf",
+    ".otf",
+    ".mp4",
+    ".webm",
+    ".mp3",
+    ".pdf",
+    ".zip",
+    ".xml",
+    ".json",
+)
+
+
+class LinkParser(HTMLParser):
+    """Collect <a>/<area> hrefs and the <base> href from raw HTML"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.base = None
+        self.hrefs = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("a", "area"):
+            href = dict(attrs).get("href")
+            if href:
+                self.hrefs.append(href.strip())
+        elif tag == "base" and self.base is None:
+            self.base = dict(attrs).get("href")
+
+
+def extract_links(html, page_url, host):
+    """Same-host page links in html, resolved against page_url"""
+    parser = LinkParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        # Whatever was parsed before the broken markup is still usable
+        pass
+
+    base = urljoin(page_url, parser.base) if parser.base else page_url
+    links = []
+    for href in parser.hrefs:
+        parts = urlsplit(urljoin(base, href))
+        if parts.scheme not in ("http", "https") or parts.hostname != host:
+            continue
+        if parts.path.lower().endswith(NON_PAGE_EXTENSIONS):
+            continue
+        # Plain fragments point into the same page; hash routes are pages
+        fragment = parts.fragment if parts.fragment.startswith(("/", "!/")) else ""
+        links.append(urlunsplit(parts._replace(fragment=fragment)))
+    return links
+
+
+class LinkDiscovery:
+    """Seed a UrlFrontier from sitemaps and plain HTTP fetches, without rendering.
+
+    Sitemaps listed in robots.txt (or /sitemap.xml) are read first, then
+    the site is walked breadth-first by fetching raw HTML through the
+    browser context's request client, so cookies are shared but no page
+    is rendered. Each host gets an adaptive concurrency limit. Seeding
+    stops once budget, a CrawlBudget, is exhausted.
+    """
+
+    def __init__(
+        self,
+        request_context,
+        start_url,
+        timeout=15000,
+        max_urls=DEFAULT_MAX_DISCOVERED,
+        budget=None,
+    ):
+        self.request = request_context
+        self.start_url = start_url
+        self.host = urlsplit(start_url).hostname
+        self.timeout = timeout
+        self.max_urls = max_urls
+        self.budget = budget
+        self.hosts = HostConcurrency()
+        self.stats = {
+            "sitemaps": 0,
+            "sitemap_urls": 0,
+            "pages_fetched": 0,
+            "links_found": 0,
+            "urls_added": 0,
+            "failed": 0,
+        }
+
+    async def get(self, url):
+        """(final url, content type, body bytes), or None when the request failed"""
+        started = await self.hosts.acquire(url)
+        outcome = "throttled"
+        try:
+            response = await self.request.get(
+                url, timeout=self.timeout, fail_on_status_code=False
+            )
+            try:
+                outcome = classify_status(response.status)
+                if not response.ok:
+                    return None
+                return (
+                    response.url,
+                    response.headers.get("content-type", ""),
+                    await response.body(),
+                )
+            finally:
+                await response.dispose()
+        except Exception:
+            return None
+        finally:
+            self.hosts.release(url, started, outcome)
+            if outcome != "ok":
+                self.stats["failed"] += 1
+
+    async def sitemap_locations(self):
+        """Sitemaps named in robots.txt, or the conventional /sitemap.xml"""
+        parts = urlsplit(self.start_url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        locations = []
+        fetched = await self.get(origin + "/robots.txt")
+        if fetched:
+            for line in fetched[2].decode("utf-8", errors="replace").splitlines():
+                key, _, value = line.partition(":")
+                if key.strip().lower() == "sitemap" and value.strip():
+                    locations.append(urljoin(origin, value.strip()))
+        return locations or [origin + "/sitemap.xml"]
+
+    async def read_sitemap(self, url, nesting=0):
+        """Page URLs listed in a sitemap, following sitemap indexes"""
+        fetched = await self.get(url)
+        if not fetched:
+            return []
+
+        body = fetched[2]
+        if body[:2] == b"\x1f\x8b":
+            try:
+                body = gzip.decompress(body)
+            except OSError:
+                return []
+        try:
+            root = ET.fromstring(body)
+        except ET.ParseError:
+            return []
+        self.stats["sitemaps"] += 1
+
+        locations = [
+            element.text.strip()
+            for element in root.iter()
+            if element.tag.endswith("loc") and element.text
+        ]
+        if not root.tag.endswith("sitemapindex"):
+            return locations
+        if nesting >= MAX_SITEMAP_NESTING:
+            return []
+
+        nested = await asyncio.gather(
+            *(self.read_sitemap(location, nesting + 1) for location in locations)
+        )
+        return [page_url for urls in nested for page_url in urls]
+
+    async def sitemap_urls(self):
+        """Same-host page URLs from all of the site's sitemaps"""
+        locations = await self.sitemap_locations()
+        sitemaps = await asyncio.gather(
+            *(self.read_sitemap(location) for location in locations)
+        )
+        urls = [
+            url
+            for listed in sitemaps
+            for url in listed
+            if urlsplit(url).hostname == self.host
+        ]
+        self.stats["sitemap_urls"] = len(urls)
+        return urls
+
+    async def page_links(self, url):
+        fetched = await self.get(url)
+        if not fetched or "html" not in fetched[1].lower():
+            return []
+
+        final_url, content_type, body = fetched
+        self.stats["pages_fetched"] += 1
+        html = body.decode("utf-8", errors="replace")
+        links = extract_links(html, final_url, self.host)
+        self.stats["links_found"] += len(links)
+        return links
+
+    def exhausted(self):
+        """Whether discovery should stop adding URLs"""
+        return self.stats["urls_added"] >= self.max_urls or bool(
+            self.budget and self.budget.exhausted()
+        )
+
+    def add(self, frontier, urls, depth):
+        """Queue urls not seen yet; returns the new ones"""
+        added = []
+        for url in urls:
+            if self.exhausted():
+                break
+            if frontier.add(url, depth):
+                added.append(url)
+                self.stats["urls_added"] += 1
+        return added
+
+    async def seed(self, frontier, max_depth):
+        """Fill frontier with every page found up to max_depth"""
+        if max_depth <= 1 or self.exhausted():
+            return self.stats
+
+        frontier.add(self.start_url, 1)
+
+        # Sitemap pages sit one level below the start page
+        from_sitemap = self.add(frontier, await self.sitemap_urls(), 2)
+
+        # Walk the site level by level, each level fetched concurrently
+        level = [self.start_url]
+        for depth in range(2, max_depth + 1):
+            if not level or self.exhausted():
+                break
+            found = await asyncio.gather(*(self.page_links(url) for url in level))
+            links = [link for page_links in found for link in page_links]
+            level = self.add(frontier, links, depth)
+            if depth == 2:
+                level = from_sitemap + level
+
+        return self.stats
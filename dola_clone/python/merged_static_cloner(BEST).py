@@ -17,6 +17,20 @@ import requests
 from PIL import Image
 import io
 
+from asset_fetcher import fetch_assets_in_page, iter_page_stream
+from asset_storage import (
+    DEFAULT_STREAM_THRESHOLD,
+    ContentStore,
+    write_base64,
+    write_chunks_async,
+)
+from http_cache import DEFAULT_CACHE_MAX_BYTES, HttpCache
+from host_concurrency import summarize_hosts
+from page_settle import DEFAULT_QUIET_MS, SettleDetector
+from browser_server import ENDPOINT_ENV, open_browser
+from extraction_scripts import register_extraction_scripts
+from scroll_driver import DEFAULT_MAX_SCROLL_STEPS, ScrollDriver
+
 # Load environment variables
 load_dotenv()
 
@@ -28,6 +42,12 @@ class MergedStaticCloner:
         headless=True,
         delay=3000,
         depth=1,
+        stream_threshold=DEFAULT_STREAM_THRESHOLD,
+        cache_dir=None,
+        cache_max_bytes=DEFAULT_CACHE_MAX_BYTES,
+        settle_quiet_ms=DEFAULT_QUIET_MS,
+        max_scroll_steps=DEFAULT_MAX_SCROLL_STEPS,
+        browser_endpoint=None,
     ):
         self.target_url = target_url
         self.output_dir = Path(output_dir)
@@ -35,6 +55,19 @@ class MergedStaticCloner:
         self.delay = delay
         self.depth = depth
         self.crawled_urls = set()
+        
+        # A running browser server to use instead of launching Chromium
+        self.browser_endpoint = browser_endpoint
+        
+        # Waits for dynamic content end once the page has been quiet this long
+        self.settle = SettleDetector(settle_quiet_ms)
+        self.scroll_driver = ScrollDriver(self.settle, max_scroll_steps)
+        
+        # Assets at or above this size are written in chunks, never held whole
+        self.stream_threshold = stream_threshold
+        
+        # Asset bodies kept across runs and revalidated instead of re-downloaded
+        self.http_cache = HttpCache(cache_dir, cache_max_bytes) if cache_dir else None
 
         # Directory structure for static website
         self.css_dir = self.output_dir / "css"
@@ -47,6 +80,9 @@ class MergedStaticCloner:
         self.downloaded_assets = {}
         self.asset_mappings = {}
         
+        # One file per distinct body; URLs serving the same bytes share it
+        self.asset_store = ContentStore(self.output_dir / ".asset_staging")
+        
         # Content collectors for merging
         self.merged_css_content = []
         self.merged_js_content = []
@@ -64,6 +100,11 @@ class MergedStaticCloner:
                 "other": 0,
             },
             "total_size_mb": 0,
+            "asset_store": self.asset_store.stats,
+            "http_cache": self.http_cache.stats if self.http_cache else None,
+            "hosts": {},
+            "settle": self.settle.stats,
+            "scroll": self.scroll_driver.stats,
         }
 
     async def setup_directories(self):
@@ -82,196 +123,16 @@ class MergedStaticCloner:
 
         print(f"✅ Created static website structure in {self.output_dir}")
 
-    async def inject_enhanced_extraction_script(self, page):
-        """Inject comprehensive asset extraction script"""
-        extraction_script = r"""
-        window.extractAllAssets = function() {
-            const assets = {
-                images: [],
-                stylesheets: [],
-                scripts: [],
-                fonts: [],
-                videos: [],
-                other: [],
-                inline_styles: [],
-                background_images: []
-            };
-            
-            // Extract images
-            document.querySelectorAll('img').forEach(img => {
-                if (img.src && !img.src.startsWith('data:')) {
-                    assets.images.push({
-                        url: img.src,
-                        alt: img.alt || '',
-                        width: img.naturalWidth || img.width,
-                        height: img.naturalHeight || img.height,
-                        element: 'img',
-                        classes: img.className,
-                        loading: img.loading || 'eager'
-                    });
-                }
-            });
-            
-            // Extract stylesheets
-            document.querySelectorAll('link[rel="stylesheet"]').forEach(link => {
-                assets.stylesheets.push({
-                    url: link.href,
-                    media: link.media || 'all'
-                });
-            });
-            
-            // Extract scripts
-            document.querySelectorAll('script[src]').forEach(script => {
-                assets.scripts.push({
-                    url: script.src,
-                    type: script.type || 'text/javascript',
-                    async: script.async,
-                    defer: script.defer
-                });
-            });
-            
-            // Extract inline styles
-            document.querySelectorAll('style').forEach(style => {
-                if (style.textContent.trim()) {
-                    assets.inline_styles.push({
-                        content: style.textContent,
-                        media: style.media || 'all'
-                    });
-                }
-            });
-            
-            // Extract fonts from CSS
-            const extractFontsFromCSS = (cssText, baseUrl) => {
-                const fontRegex = /url\s*\(\s*['"]?([^'"\)]+\.(woff2?|ttf|otf|eot))['"]?\s*\)/gi;
-                let match;
-                while ((match = fontRegex.exec(cssText)) !== null) {
-                    try {
-                        const fontUrl = new URL(match[1], baseUrl).href;
-                        assets.fonts.push({url: fontUrl, format: match[2]});
-                    } catch (e) {}
-                }
-            };
-            
-            // Process stylesheets for fonts
-            Array.from(document.styleSheets).forEach(sheet => {
-                try {
-                    Array.from(sheet.cssRules || sheet.rules).forEach(rule => {
-                        if (rule.cssText) {
-                            extractFontsFromCSS(rule.cssText, sheet.href || window.location.href);
-                        }
-                    });
-                } catch (e) {}
-            });
-            
-            // Extract background images
-            document.querySelectorAll('*').forEach(el => {
-                const style = window.getComputedStyle(el);
-                if (style.backgroundImage && style.backgroundImage !== 'none') {
-                    const matches = style.backgroundImage.match(/url\s*\(\s*['"]?([^'"\)]+)['"]?\s*\)/g);
-                    if (matches) {
-                        matches.forEach(match => {
-                            const urlMatch = match.match(/url\s*\(\s*['"]?([^'"\)]+)['"]?\s*\)/);
-                            if (urlMatch) {
-                                try {
-                                    const url = new URL(urlMatch[1], window.location.href).href;
-                                    assets.background_images.push({
-                                        url: url,
-                                        element: el.tagName.toLowerCase(),
-                                        classes: el.className,
-                                        id: el.id
-                                    });
-                                } catch (e) {}
-                            }
-                        });
-                    }
-                }
-            });
-            
-            // Extract videos and audio
-            document.querySelectorAll('video, audio, source').forEach(media => {
-                if (media.src) {
-                    assets.videos.push({
-                        url: media.src,
-                        type: media.type || '',
-                        element: media.tagName.toLowerCase()
-                    });
-                }
-            });
-            
-            // Remove duplicates
-            Object.keys(assets).forEach(key => {
-                if (Array.isArray(assets[key])) {
-                    const seen = new Set();
-                    assets[key] = assets[key].filter(item => {
-                        const url = item.url || item.content;
-                        if (seen.has(url)) return false;
-                        seen.add(url);
-                        return true;
-                    });
-                }
-            });
-            
-            return assets;
-        };
-        
-        window.downloadAssetAsBase64 = async function(url, retries = 3) {
-            for (let i = 0; i < retries; i++) {
-                try {
-                    const response = await fetch(url, {
-                        mode: 'cors',
-                        credentials: 'omit'
-                    });
-                    
-                    if (!response.ok) {
-                        throw new Error(`HTTP ${response.status}`);
-                    }
-                    
-                    const blob = await response.blob();
-                    return new Promise((resolve) => {
-                        const reader = new FileReader();
-                        reader.onloadend = () => resolve({
-                            success: true,
-                            data: reader.result,
-                            contentType: blob.type,
-                            size: blob.size,
-                            url: url
-                        });
-                        reader.onerror = () => resolve({
-                            success: false,
-                            error: 'FileReader error',
-                            url: url
-                        });
-                        reader.readAsDataURL(blob);
-                    });
-                } catch (error) {
-                    if (i === retries - 1) {
-                        return {success: false, error: error.message, url: url};
-                    }
-                    await new Promise(resolve => setTimeout(resolve, 1000 * (i + 1)));
-                }
-            }
-        };
-        """
-
-        await page.evaluate(extraction_script)
-        print("✅ Enhanced extraction script injected")
-
     async def wait_for_dynamic_content(self, page):
         """Wait for dynamic content to load"""
         print("⏳ Waiting for dynamic content...")
-        await page.wait_for_load_state("networkidle", timeout=30000)
-        await asyncio.sleep(self.delay / 1000)
-        
-        # Scroll to trigger lazy loading
-        scroll_positions = [0.25, 0.5, 0.75, 1.0]
-        for position in scroll_positions:
-            await page.evaluate(f"window.scrollTo(0, document.body.scrollHeight * {position});")
-            await asyncio.sleep(1)
-        
-        await page.evaluate("window.scrollTo(0, 0);")
-        await asyncio.sleep(1)
-        await page.wait_for_load_state("networkidle", timeout=10000)
-        print("✅ Dynamic content loading completed")
+        await self.settle.wait(page, self.delay)
+        
+        # Scroll one viewport at a time until lazy loading stops
+        scroll = await self.scroll_driver.scroll(page)
+        print(f"  📜 Scrolled {scroll['steps']} steps, {scroll['requests']} lazy requests")
+        await self.settle.wait(page, 10000)
+        print(f"✅ Dynamic content loading completed ({self.settle.stats['waited_ms'] / 1000:.1f}s spent waiting for the page to settle)")
 
     async def extract_and_download_assets(self, page):
         """Extract and download assets, merging CSS and JS"""
@@ -290,7 +151,9 @@ class MergedStaticCloner:
         
         print(f"📊 Found {total_assets} assets to download")
         
-        # Process each asset type
+        # Collect inline styles and queue each URL once, keeping page order
+        jobs = []
+        queued_urls = set()
         for asset_type, asset_list in assets.items():
             if not asset_list or not isinstance(asset_list, list):
                 continue
@@ -298,37 +161,99 @@ class MergedStaticCloner:
             print(f"📥 Processing {len(asset_list)} {asset_type}...")
             
             for asset in asset_list:
-                try:
-                    if asset_type == "inline_styles":
-                        # Add inline styles to merged CSS
-                        self.merged_css_content.append(f"/* Inline Style */\n{asset['content']}\n")
-                        self.extraction_report["assets"]["css"] += 1
-                        continue
-                    
-                    if not asset.get('url'):
-                        continue
+                if asset_type == "inline_styles":
+                    # Add inline styles to merged CSS
+                    self.merged_css_content.append(f"/* Inline Style */\n{asset['content']}\n")
+                    self.extraction_report["assets"]["css"] += 1
+                    continue
+                
+                if not asset.get('url') or asset['url'] in queued_urls:
+                    continue
+                
+                queued_urls.add(asset['url'])
+                jobs.append((asset_type, asset))
+        
+        # Fetch everything in one in-page batch. Results arrive out of order,
+        # so they are applied in page order to keep the merged CSS/JS stable.
+        finished = {}
+        next_job = 0
+        stats = {"round_trips": 0}
+        staging_dir = self.output_dir / ".fetch_staging"
+        
+        # Bodies cached by earlier runs only need a conditional request
+        revalidated = {}
+        if self.http_cache:
+            revalidated = await self.http_cache.revalidate_all(
+                page.context.request,
+                [asset['url'] for _, asset in jobs],
+                staging_dir,
+                stream_threshold=self.stream_threshold,
+            )
+            print(f"   ♻️  {len(revalidated)} assets served from the cache")
+        
+        batch_items = [
+            {"url": asset['url'], "type": asset_type}
+            for asset_type, asset in jobs
+            if asset['url'] not in revalidated
+        ]
+        
+        async def cached_then_fetched():
+            for result in revalidated.values():
+                yield result
+            async for result in fetch_assets_in_page(
+                page, batch_items, stats=stats, stream_threshold=self.stream_threshold
+            ):
+                yield result
+        
+        async def apply(asset_type, asset, result):
+            nonlocal downloaded_count
+            try:
+                if result['success']:
+                    await self.save_asset_merged(result, asset_type, asset, page)
+                    downloaded_count += 1
                     
-                    # Download asset - FIXED: Use proper function call syntax
-                    result = await page.evaluate("""
-                        (url) => window.downloadAssetAsBase64(url)
-                    """, asset['url'])
+                    if downloaded_count % 10 == 0:
+                        print(f"   📥 Downloaded {downloaded_count}/{total_assets} assets | {summarize_hosts(stats.get('hosts', {}))}")
+                else:
+                    # --- Start of edit ---
+                    print(f"   ❌ Failed to download {asset['url']}: {result.get('error', 'Unknown error')}")
+                    if asset_type == 'scripts':
+                        print(f"   └── Script download failed. This may cause issues with website functionality.")
+                    # --- End of edit ---
                     
-                    if result['success']:
-                        await self.save_asset_merged(result, asset_type, asset)
-                        downloaded_count += 1
-                        
-                        if downloaded_count % 10 == 0:
-                            print(f"   📥 Downloaded {downloaded_count}/{total_assets} assets")
-                    else:
-                        # --- Start of edit ---
-                        print(f"   ❌ Failed to download {asset['url']}: {result.get('error', 'Unknown error')}")
-                        if asset_type == 'scripts':
-                            print(f"   └── Script download failed. This may cause issues with website functionality.")
-                        # --- End of edit ---
-                        
+            except Exception as e:
+                print(f"   ❌ Error processing {asset.get('url', 'unknown')}: {str(e)}")
+        
+        async for result in cached_then_fetched():
+            if self.http_cache and result['success'] and not result.get('path'):
+                # Keep a copy for the next run; the result now points at a file
+                try:
+                    result = await self.http_cache.materialize(
+                        result,
+                        self.http_cache.next_staging_path(staging_dir),
+                        chunks=iter_page_stream(page, result) if result.get('streamId') else None,
+                        stream_threshold=self.stream_threshold,
+                    )
                 except Exception as e:
-                    print(f"   ❌ Error processing {asset.get('url', 'unknown')}: {str(e)}")
-                    continue
+                    result = {"success": False, "error": str(e), "url": result.get('url')}
+            finished[result.get('url')] = result
+            
+            while next_job < len(jobs) and jobs[next_job][1]['url'] in finished:
+                asset_type, asset = jobs[next_job]
+                next_job += 1
+                await apply(asset_type, asset, finished.pop(asset['url']))
+        
+        # Jobs whose result never came back would hold back every later one
+        for asset_type, asset in jobs[next_job:]:
+            result = finished.pop(asset['url'], None) or {
+                "success": False,
+                "error": "Missing from batch result",
+                "url": asset['url'],
+            }
+            await apply(asset_type, asset, result)
+        
+        print(f"   🔁 {stats['round_trips']} browser round trips for {len(jobs)} assets")
+        self.extraction_report["hosts"].update(stats.get("hosts", {}))
         
         # Save merged files
         await self.save_merged_files()
@@ -336,34 +261,46 @@ class MergedStaticCloner:
         print(f"✅ Asset extraction completed: {downloaded_count}/{total_assets} downloaded")
         return assets
 
-    async def save_asset_merged(self, result, asset_type, asset_metadata):
+    async def save_asset_merged(self, result, asset_type, asset_metadata, page=None):
         """Save asset with merging logic for CSS and JS"""
         try:
-            # Decode base64 data
-            base64_data = result['data'].split(',')[1]
-            file_data = base64.b64decode(base64_data)
+            content_type = result.get('contentType', '').lower()
+            is_css = asset_type in ['stylesheets'] or 'css' in content_type
+            is_js = asset_type in ['scripts'] or 'javascript' in content_type
+            if not (is_css or is_js):
+                # Save other assets normally, without decoding them up front
+                await self.save_individual_asset(result, asset_type, page)
+                return
+            
+            # CSS and JS are merged in memory anyway, so read them whole
+            if result.get('path'):
+                with open(result['path'], 'rb') as f:
+                    file_data = f.read()
+                os.remove(result['path'])
+            elif result.get('streamId'):
+                chunks = [chunk async for chunk in iter_page_stream(page, result)]
+                file_data = b''.join(chunks)
+            else:
+                base64_data = result['data'].split(',')[1]
+                file_data = base64.b64decode(base64_data)
             
             # Determine file type and handle merging
-            if asset_type in ['stylesheets'] or 'css' in result.get('contentType', '').lower():
+            if is_css:
                 # Add CSS content to merged collection
                 css_content = file_data.decode('utf-8', errors='ignore')
                 self.merged_css_content.append(f"/* {result['url']} */\n{css_content}\n")
                 self.extraction_report["assets"]["css"] += 1
                 
-            elif asset_type in ['scripts'] or 'javascript' in result.get('contentType', '').lower():
+            else:
                 # Add JS content to merged collection
                 js_content = file_data.decode('utf-8', errors='ignore')
                 self.merged_js_content.append(f"/* {result['url']} */\n{js_content}\n")
                 self.extraction_report["assets"]["js"] += 1
                 
-            else:
-                # Save other assets normally
-                await self.save_individual_asset(result, asset_type, file_data)
-                
         except Exception as e:
             print(f"   ❌ Error saving asset {result['url']}: {str(e)}")
 
-    async def save_individual_asset(self, result, asset_type, file_data):
+    async def save_individual_asset(self, result, asset_type, page=None):
         """Save individual non-CSS/JS assets"""
         try:
             # Determine file extension and directory
@@ -387,18 +324,23 @@ class MergedStaticCloner:
                 save_dir = self.output_dir
                 self.extraction_report["assets"]["other"] += 1
             
-            # Handle duplicates
-            counter = 1
-            original_filename = filename
-            while (save_dir / filename).exists():
-                name, ext = os.path.splitext(original_filename)
-                filename = f"{name}_{counter}{ext}"
-                counter += 1
+            # Save file; large assets are written chunk by chunk
+            staging_path = self.asset_store.staging_path()
+            if result.get('path'):
+                # Already on disk, revalidated or kept by the cache
+                staging_path = result['path']
+                written = {"sha256": result['sha256'], "size": result['size']}
+            elif result.get('streamId'):
+                try:
+                    written = await write_chunks_async(staging_path, iter_page_stream(page, result))
+                except Exception:
+                    staging_path.unlink(missing_ok=True)
+                    raise
+            else:
+                written = write_base64(staging_path, result['data'], self.stream_threshold)
             
-            # Save file
-            file_path = save_dir / filename
-            with open(file_path, 'wb') as f:
-                f.write(file_data)
+            # Same bytes already stored under another URL share that file
+            file_path = self.asset_store.commit(staging_path, save_dir, filename, written)
             
             # Track asset mapping
             self.asset_mappings[result['url']] = str(file_path.relative_to(self.output_dir))
@@ -521,21 +463,22 @@ class MergedStaticCloner:
         print(f"🚀 Starting website cloning: {self.target_url}")
         
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=self.headless)
+            browser = await open_browser(p, self.browser_endpoint, self.headless, args=())
             
             try:
                 await self.setup_directories()
                 
                 page = await browser.new_page()
                 await page.set_viewport_size({"width": 1920, "height": 1080})
+                self.settle.watch(page)
+                
+                # The page's own context gets the extraction functions on load
+                await register_extraction_scripts(page.context)
                 
                 # Navigate to target URL
                 print(f"🌐 Loading page: {self.target_url}")
                 await page.goto(self.target_url, wait_until="networkidle", timeout=60000)
                 
-                # Inject extraction scripts
-                await self.inject_enhanced_extraction_script(page)
-                
                 # Wait for dynamic content
                 await self.wait_for_dynamic_content(page)
                 
@@ -557,6 +500,10 @@ class MergedStaticCloner:
                     f.write(updated_html)
                 
                 print(f"💾 Main HTML saved: {html_path}")
+                self.asset_store.cleanup()
+                shutil.rmtree(self.output_dir / ".fetch_staging", ignore_errors=True)
+                if self.http_cache:
+                    self.http_cache.save()
                 
                 # Create reports and archive
                 report_path = self.create_extraction_report()
@@ -566,6 +513,9 @@ class MergedStaticCloner:
                 print(f"   • Output directory: {self.output_dir}")
                 print(f"   • Pages crawled: {len(self.extraction_report['pages_crawled'])}")
                 print(f"   • Total assets: {sum(self.extraction_report['assets'].values())}")
+                if self.http_cache:
+                    print(f"   • Cache: {self.http_cache.stats['revalidated']} assets reused ({self.http_cache.stats['bytes_reused'] / (1024 * 1024):.2f} MB not downloaded)")
+                print(f"   • Duplicate assets: {self.asset_store.stats['duplicates']} ({self.asset_store.stats['bytes_saved'] / (1024 * 1024):.2f} MB saved)")
                 print(f"   • Project size: {self.extraction_report['total_size_mb']} MB")
                 print(f"   • Merged CSS: {'✅' if self.merged_css_content else '❌'}")
                 print(f"   • Merged JS: {'✅' if self.merged_js_content else '❌'}")
@@ -588,6 +538,10 @@ class MergedStaticCloner:
                 
             finally:
                 await browser.close()
+                self.asset_store.cleanup()
+                if self.http_cache:
+                    # Keep what this run learned even if it failed part way
+                    self.http_cache.save()
 
 def main():
     """CLI entry point"""
@@ -598,7 +552,39 @@ def main():
     parser.add_argument("--url", required=True, help="Target website URL to clone")
     parser.add_argument("--output", default="merged_website", help="Output directory name")
     parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
-    parser.add_argument("--delay", type=int, default=3000, help="Delay for dynamic content loading")
+    parser.add_argument("--delay", type=int, default=3000, help="Longest wait for dynamic content to settle after load (ms)")
+    parser.add_argument(
+        "--settle-quiet-ms",
+        type=int,
+        default=DEFAULT_QUIET_MS,
+        help=f"Treat the page as settled once DOM and network are quiet this long (default: {DEFAULT_QUIET_MS})",
+    )
+    parser.add_argument(
+        "--max-scroll-steps",
+        type=int,
+        default=DEFAULT_MAX_SCROLL_STEPS,
+        help=f"Viewport-height scroll steps taken at most to trigger lazy loading (default: {DEFAULT_MAX_SCROLL_STEPS})",
+    )
+    parser.add_argument(
+        "--browser-endpoint",
+        help=f"Connect to a running browser_server.py here instead of launching Chromium (default: ${ENDPOINT_ENV})",
+    )
+    parser.add_argument(
+        "--stream-threshold-mb",
+        type=float,
+        default=DEFAULT_STREAM_THRESHOLD / (1024 * 1024),
+        help="Write assets of at least this size in chunks instead of in one go (default: 8)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Keep asset bodies here across runs and revalidate them instead of re-downloading",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_CACHE_MAX_BYTES / (1024 * 1024),
+        help="Evict least recently used cache entries beyond this size (default: 512)",
+    )
     
     args = parser.parse_args()
     
@@ -621,6 +607,12 @@ def main():
         output_dir=args.output,
         headless=args.headless,
         delay=args.delay,
+        stream_threshold=int(args.stream_threshold_mb * 1024 * 1024),
+        cache_dir=args.cache_dir,
+        cache_max_bytes=int(args.cache_max_mb * 1024 * 1024),
+        settle_quiet_ms=args.settle_quiet_ms,
+        max_scroll_steps=args.max_scroll_steps,
+        browser_endpoint=args.browser_endpoint,
     )
     
     # Run the cloning process
@@ -6,10 +6,14 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 import argparse
 import logging
+import re
 
 from playwright.async_api import async_playwright, Page, Browser, ElementHandle
 from dataclasses import dataclass, asdict
 
+from browser_server import ENDPOINT_ENV, open_browser
+from dom_snapshot import capture_document, is_rendered
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -21,6 +25,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Playwright's text pseudo-class, which plain CSS has no equivalent for
+HAS_TEXT = re.compile(r'^(.*):has-text\("(.*)"\)$')
+
 @dataclass
 class ModalTestResult:
     """Data class to store modal test results"""
@@ -52,10 +59,13 @@ class TestReport:
 class ModalTester:
     """Comprehensive modal testing automation class"""
     
-    def __init__(self, base_url: str, output_dir: str = "modal_test_results", headless: bool = True):
+    def __init__(self, base_url: str, output_dir: str = "modal_test_results", headless: bool = True,
+                 browser_endpoint: Optional[str] = None):
         self.base_url = base_url
         self.output_dir = Path(output_dir)
         self.headless = headless
+        # A running browser server to use instead of launching Chromium
+        self.browser_endpoint = browser_endpoint
         self.output_dir.mkdir(exist_ok=True)
         
         # Modal detection selectors
@@ -232,47 +242,72 @@ class ModalTester:
             modals = await page.evaluate("window.modalTester.detectModals()")
             triggers = await page.evaluate("window.modalTester.detectTriggers()")
             
-            # Also detect using Playwright selectors as backup
-            playwright_modals = []
-            for selector in self.modal_selectors:
-                try:
-                    elements = await page.query_selector_all(selector)
-                    for element in elements:
-                        modal_info = {
-                            'selector': selector,
-                            'id': await element.get_attribute('id') or f'modal_{len(playwright_modals)}',
-                            'classes': await element.get_attribute('class') or '',
-                            'visible': await element.is_visible()
-                        }
-                        playwright_modals.append(modal_info)
-                except Exception as e:
-                    logger.warning(f"Error detecting modals with selector {selector}: {e}")
-            
-            playwright_triggers = []
-            for selector in self.trigger_selectors:
-                try:
-                    elements = await page.query_selector_all(selector)
-                    for element in elements:
-                        if await element.is_visible():
-                            trigger_info = {
-                                'selector': selector,
-                                'text': (await element.text_content() or '').strip(),
-                                'target': await element.get_attribute('data-target') or await element.get_attribute('href'),
-                                'tagName': await element.evaluate('el => el.tagName.toLowerCase()')
-                            }
-                            playwright_triggers.append(trigger_info)
-                except Exception as e:
-                    logger.warning(f"Error detecting triggers with selector {selector}: {e}")
+            # Also match the selectors against one DOM snapshot as backup,
+            # instead of querying the page element by element
+            snapshot_modals, snapshot_triggers = await self.detect_from_snapshot(page)
             
-            logger.info(f"Detected {len(modals)} modals via script, {len(playwright_modals)} via Playwright")
-            logger.info(f"Detected {len(triggers)} triggers via script, {len(playwright_triggers)} via Playwright")
+            logger.info(f"Detected {len(modals)} modals via script, {len(snapshot_modals)} via snapshot")
+            logger.info(f"Detected {len(triggers)} triggers via script, {len(snapshot_triggers)} via snapshot")
             
-            return modals + playwright_modals, triggers + playwright_triggers
+            return modals + snapshot_modals, triggers + snapshot_triggers
             
         except Exception as e:
             logger.error(f"Error in modal detection: {e}")
             return [], []
     
+    def snapshot_select(self, soup, selector: str) -> list:
+        """Elements of a snapshot matching a Playwright selector.
+
+        :has-text() is matched like Playwright does: case-insensitive,
+        with whitespace collapsed.
+        """
+        match = HAS_TEXT.match(selector)
+        if not match:
+            return soup.select(selector)
+        base, text = match.groups()
+        text = ' '.join(text.split()).lower()
+        return [
+            element for element in soup.select(base)
+            if text in ' '.join(element.get_text(' ').split()).lower()
+        ]
+    
+    async def detect_from_snapshot(self, page: Page) -> tuple:
+        """Modals and visible triggers matched in one DOM snapshot of the page"""
+        try:
+            soup = (await capture_document(page))['soup']
+        except Exception as e:
+            logger.warning(f"Error capturing DOM snapshot: {e}")
+            return [], []
+        
+        modals = []
+        for selector in self.modal_selectors:
+            try:
+                for element in self.snapshot_select(soup, selector):
+                    modals.append({
+                        'selector': selector,
+                        'id': element.get('id') or f'modal_{len(modals)}',
+                        'classes': ' '.join(element.get('class', [])),
+                        'visible': is_rendered(element)
+                    })
+            except Exception as e:
+                logger.warning(f"Error detecting modals with selector {selector}: {e}")
+        
+        triggers = []
+        for selector in self.trigger_selectors:
+            try:
+                for element in self.snapshot_select(soup, selector):
+                    if is_rendered(element):
+                        triggers.append({
+                            'selector': selector,
+                            'text': element.get_text().strip(),
+                            'target': element.get('data-target') or element.get('href'),
+                            'tagName': element.name
+                        })
+            except Exception as e:
+                logger.warning(f"Error detecting triggers with selector {selector}: {e}")
+        
+        return modals, triggers
+    
     async def test_modal_opening(self, page: Page, trigger_info: dict) -> dict:
         """Test if a modal opens when its trigger is clicked"""
         test_result = {
@@ -825,7 +860,7 @@ class ModalTester:
         logger.info(f"Starting modal tests for {self.base_url}")
         
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=self.headless)
+            browser = await open_browser(p, self.browser_endpoint, self.headless, args=(), log=logger.info)
             
             try:
                 page = await browser.new_page()
@@ -889,6 +924,8 @@ def main():
     parser.add_argument("--headless", action="store_true", help="Run in headless mode")
     parser.add_argument("--no-responsive", action="store_true", help="Skip responsive testing")
     parser.add_argument("--viewport-sizes", nargs="*", help="Custom viewport sizes (format: WIDTHxHEIGHT)")
+    parser.add_argument("--browser-endpoint",
+                        help=f"Connect to a running browser_server.py instead of launching Chromium (default: ${ENDPOINT_ENV})")
     
     args = parser.parse_args()
     
@@ -909,7 +946,8 @@ def main():
     tester = ModalTester(
         base_url=args.url,
         output_dir=args.output,
-        headless=args.headless
+        headless=args.headless,
+        browser_endpoint=args.browser_endpoint
     )
     
     # Run tests
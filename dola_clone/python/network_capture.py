@@ -0,0 +1,109 @@
+import asyncio
+import shutil
+from pathlib import Path
+
+from asset_storage import DEFAULT_STREAM_THRESHOLD, write_bytes
+
+
+# Resource types worth keeping; documents, XHR and beacons are left alone
+CAPTURED_RESOURCE_TYPES = {"image", "stylesheet", "script", "font", "media"}
+
+
+class NetworkCapture:
+    """Record asset response bodies to disk while the browser loads the page.
+
+    Playwright only hands over whole bodies; ones at or above
+    stream_threshold are written in chunks, off the event loop.
+    """
+
+    def __init__(
+        self,
+        capture_dir,
+        resource_types=None,
+        stream_threshold=DEFAULT_STREAM_THRESHOLD,
+    ):
+        self.capture_dir = Path(capture_dir)
+        self.resource_types = set(resource_types or CAPTURED_RESOURCE_TYPES)
+        self.stream_threshold = stream_threshold
+        self.captured = {}
+        self.recording = set()
+        self.pending = set()
+        self.counter = 0
+        self.stats = {
+            "responses_seen": 0,
+            "captured": 0,
+            "captured_bytes": 0,
+            "failed": 0,
+        }
+
+    def attach(self, target):
+        """Listen to a page or browser context; call before the first navigation"""
+        self.capture_dir.mkdir(parents=True, exist_ok=True)
+        target.on("response", self.on_response)
+
+    def on_response(self, response):
+        if response.request.resource_type not in self.resource_types:
+            return
+
+        # 206 partial media responses and redirects don't carry the full body
+        if response.status != 200:
+            return
+
+        url = response.url
+        if url.startswith(("data:", "blob:")):
+            return
+        if url in self.captured or url in self.recording:
+            return
+
+        self.stats["responses_seen"] += 1
+        self.recording.add(url)
+        task = asyncio.create_task(self._record(url, response))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    async def _record(self, url, response):
+        try:
+            body = await response.body()
+        except Exception:
+            # The page navigated away or the body was evicted
+            self.stats["failed"] += 1
+            self.recording.discard(url)
+            return
+
+        self.counter += 1
+        path = self.capture_dir / f"{self.counter:06d}.bin"
+        try:
+            written = await asyncio.to_thread(
+                write_bytes, path, body, self.stream_threshold
+            )
+        finally:
+            # Still recording while the write runs, so a repeat isn't captured twice
+            self.recording.discard(url)
+
+        self.captured[url] = {
+            "path": str(path),
+            "content_type": response.headers.get("content-type", ""),
+            "size": written["size"],
+            "sha256": written["sha256"],
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+        }
+        self.stats["captured"] += 1
+        self.stats["captured_bytes"] += written["size"]
+
+    async def drain(self):
+        """Wait for bodies that are still being written"""
+        while self.pending:
+            await asyncio.gather(*list(self.pending), return_exceptions=True)
+
+    def has(self, url):
+        return url in self.captured
+
+    def take(self, url):
+        """Hand over a captured body; the caller owns the file afterwards"""
+        return self.captured.pop(url, None)
+
+    def cleanup(self):
+        """Remove captured bodies nobody claimed"""
+        self.captured = {}
+        shutil.rmtree(self.capture_dir, ignore_errors=True)
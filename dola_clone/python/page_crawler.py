@@ -0,0 +1,135 @@
+import asyncio
+
+
+# Pages open at once in the crawl pool
+DEFAULT_POOL_SIZE = 4
+
+
+class PagePool:
+    """A fixed number of Playwright pages shared by concurrent page visits"""
+
+    def __init__(self, context, size=DEFAULT_POOL_SIZE, prepare=None):
+        self.context = context
+        self.size = max(1, int(size))
+        # Optional coroutine run on every new page, e.g. to add init scripts
+        self.prepare = prepare
+        self.pages = []
+        self.idle = asyncio.Queue()
+        self.opening = 0
+
+    async def acquire(self):
+        """Take an idle page, opening a new one while the pool isn't full"""
+        if self.idle.empty() and len(self.pages) + self.opening < self.size:
+            self.opening += 1
+            try:
+                page = await self.context.new_page()
+                if self.prepare:
+                    await self.prepare(page)
+                self.pages.append(page)
+            finally:
+                self.opening -= 1
+            return page
+        return await self.idle.get()
+
+    def release(self, page):
+        self.idle.put_nowait(page)
+
+    async def run(self, visit, *args):
+        """Run visit(page, *args) on a pooled page"""
+        page = await self.acquire()
+        try:
+            return await visit(page, *args)
+        finally:
+            self.release(page)
+
+    async def close(self):
+        for page in self.pages:
+            try:
+                await page.close()
+            except Exception:
+                pass
+        self.pages = []
+
+
+class PageCrawler:
+    """Crawl that visits many pages at once through a PagePool.
+
+    visit(page, url, depth) loads url in the pooled page, does whatever
+    per-page work the caller needs and returns the links found there.
+    Which URL is visited next, and whether a link was already seen, is up
+    to the UrlFrontier. With a CrawlBudget, no page is started once it is
+    spent.
+    """
+
+    def __init__(self, pool, frontier, links_per_page=None, budget=None):
+        self.pool = pool
+        self.frontier = frontier
+        # None follows every link a page has
+        self.links_per_page = links_per_page
+        self.budget = budget
+
+    async def crawl(self, start_url, max_depth, visit, start_links=None):
+        """Crawl from start_url; returns the URLs visited, in visit order.
+
+        When the caller has already visited start_url itself, passing the
+        links it found as start_links continues from there without loading
+        start_url again.
+        """
+        visited = []
+        active = set()
+        changed = asyncio.Event()
+
+        def enqueue(links, depth):
+            if depth > max_depth or not links:
+                return
+            if self.links_per_page is not None:
+                # Keep the page's best-ranked links, not just its first ones
+                links = sorted(
+                    links, key=lambda link: self.frontier.priority(link, depth)
+                )[: self.links_per_page]
+            self.frontier.add_many(links, depth)
+
+        async def visit_one(url, depth):
+            try:
+                links = await self.pool.run(visit, url, depth)
+            except Exception as e:
+                print(f"❌ Failed to crawl {url}: {str(e)}")
+                self.frontier.mark(url, "failed")
+                return
+
+            self.frontier.mark(url, "visited")
+            visited.append(url)
+            enqueue(links, depth + 1)
+
+        def finished(task):
+            active.discard(task)
+            changed.set()
+
+        self.frontier.add(start_url, 1)
+        if start_links is not None:
+            self.frontier.mark(start_url, "visited")
+            visited.append(start_url)
+            if self.budget:
+                self.budget.spend_page()
+            enqueue(start_links, 2)
+
+        while True:
+            # Keep one visit per pooled page in flight
+            while len(active) < self.pool.size:
+                if self.budget and self.budget.exhausted():
+                    break
+                entry = self.frontier.pop()
+                if entry is None:
+                    break
+                if self.budget:
+                    self.budget.spend_page()
+                task = asyncio.create_task(visit_one(*entry))
+                active.add(task)
+                task.add_done_callback(finished)
+
+            if not active:
+                break
+            changed.clear()
+            await changed.wait()
+
+        return visited
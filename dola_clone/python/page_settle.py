@@ -0,0 +1,163 @@
+import asyncio
+import time
+import weakref
+
+
+# How long DOM and network must stay quiet before a page counts as settled
+DEFAULT_QUIET_MS = 500
+
+# Requests open longer than this (long polling, beacons) no longer hold a page up
+STALLED_REQUEST_MS = 5000
+
+# Long-lived connections that never "finish" the way page loads do
+IGNORED_RESOURCE_TYPES = {"websocket", "eventsource", "media"}
+
+POLL_SECONDS = 0.1
+
+# Installs a tracker for DOM mutations and image decodes on first use and
+# returns the page's current state; safe to evaluate repeatedly
+SETTLE_SCRIPT = """
+(() => {
+    if (window.__settleState) return window.__settleState();
+
+    const settle = { lastMutation: performance.now(), decoding: 0, decoded: new WeakSet() };
+
+    // Attribute churn from carousels and animations isn't content arriving
+    new MutationObserver(() => { settle.lastMutation = performance.now(); }).observe(
+        document,
+        {
+            subtree: true,
+            childList: true,
+            characterData: true,
+            attributes: true,
+            attributeFilter: ['src', 'srcset', 'href'],
+        }
+    );
+
+    window.__settleState = () => {
+        let pendingImages = 0;
+        for (const img of document.images) {
+            if (!img.currentSrc && !img.getAttribute('src')) continue;
+
+            if (!img.complete) {
+                // Lazy images below the fold won't load until something scrolls to them
+                const rect = img.getBoundingClientRect();
+                const inView = rect.bottom >= 0 && rect.top <= window.innerHeight;
+                if (img.loading !== 'lazy' || inView) pendingImages++;
+                continue;
+            }
+
+            if (img.naturalWidth && !settle.decoded.has(img)) {
+                settle.decoded.add(img);
+                settle.decoding++;
+                img.decode().catch(() => {}).finally(() => { settle.decoding--; });
+            }
+        }
+
+        return {
+            quietMs: performance.now() - settle.lastMutation,
+            pendingImages,
+            pendingDecodes: settle.decoding,
+        };
+    };
+    return window.__settleState();
+})()
+"""
+
+
+class NetworkActivity:
+    """In-flight requests of one page, from Playwright's request events"""
+
+    def __init__(self, page):
+        self.in_flight = {}
+        self.last_event = time.monotonic()
+        # Requests started since the page was first watched
+        self.requests = 0
+        page.on("request", self.on_request)
+        page.on("requestfinished", self.on_done)
+        page.on("requestfailed", self.on_done)
+
+    def on_request(self, request):
+        if request.resource_type in IGNORED_RESOURCE_TYPES:
+            return
+        self.in_flight[request] = time.monotonic()
+        self.last_event = time.monotonic()
+        self.requests += 1
+
+    def on_done(self, request):
+        if self.in_flight.pop(request, None) is not None:
+            self.last_event = time.monotonic()
+
+    def quiet_ms(self, now):
+        """Milliseconds since the network went quiet, 0 while requests are open"""
+        stalled_before = now - STALLED_REQUEST_MS / 1000
+        if any(started > stalled_before for started in self.in_flight.values()):
+            return 0
+        return (now - self.last_event) * 1000
+
+
+class SettleDetector:
+    """Wait until a page stops changing instead of sleeping a fixed time.
+
+    A page has settled once no DOM content has been added, no request has
+    started or finished and no image is loading or decoding for quiet_ms.
+    Every wait has a cap, so a page that never goes quiet costs no more
+    than the fixed sleep it replaces.
+    """
+
+    def __init__(self, quiet_ms=DEFAULT_QUIET_MS):
+        self.quiet_ms = quiet_ms
+        self.activity = weakref.WeakKeyDictionary()
+        self.stats = {
+            "waits": 0,
+            "settled": 0,
+            "capped": 0,
+            "waited_ms": 0,
+        }
+
+    def watch(self, page):
+        """Start counting page's requests; call before navigating for best results"""
+        if page not in self.activity:
+            self.activity[page] = NetworkActivity(page)
+        return self.activity[page]
+
+    async def wait(self, page, max_ms, since=None):
+        """Wait up to max_ms for page to settle; True when it did before the cap
+
+        since is a time.monotonic() timestamp quiet time may not start
+        before, e.g. the moment of a scroll whose requests may not have
+        been issued yet.
+        """
+        activity = self.watch(page)
+        quiet_ms = min(self.quiet_ms, max_ms)
+        started = time.monotonic()
+        deadline = started + max_ms / 1000
+        settled = False
+
+        while True:
+            try:
+                state = await page.evaluate(SETTLE_SCRIPT)
+            except Exception:
+                # Mid-navigation; the new document gets the tracker on the next poll
+                state = None
+
+            now = time.monotonic()
+            if (
+                state
+                and not state["pendingImages"]
+                and not state["pendingDecodes"]
+                and state["quietMs"] >= quiet_ms
+                and activity.quiet_ms(now) >= quiet_ms
+                and (since is None or (now - since) * 1000 >= quiet_ms)
+            ):
+                settled = True
+                break
+            if now >= deadline:
+                break
+            await asyncio.sleep(POLL_SECONDS)
+
+        waited_ms = round((time.monotonic() - started) * 1000)
+        self.stats["waits"] += 1
+        self.stats["settled" if settled else "capped"] += 1
+        self.stats["waited_ms"] += waited_ms
+        return settled
@@ -2,7 +2,6 @@ import asyncio
 import os
 import json
 import re
-import base64
 import argparse
 import shutil
 from datetime import datetime
@@ -17,10 +16,62 @@ import requests
 from PIL import Image
 import io
 
+from asset_fetcher import (
+    FETCH_BACKENDS,
+    CachingFetcher,
+    IncrementalFetcher,
+    PageBatchFetcher,
+    RequestContextFetcher,
+)
+from network_capture import NetworkCapture
+from http_cache import DEFAULT_CACHE_MAX_BYTES, HttpCache
+from clone_manifest import CloneManifest, collect_garbage, html_digest
+from download_journal import DownloadJournal
+from asset_storage import (
+    DEFAULT_STREAM_THRESHOLD,
+    ContentStore,
+    write_base64,
+    write_chunks_async,
+)
+from host_concurrency import summarize_hosts
+from page_crawler import DEFAULT_POOL_SIZE, PageCrawler, PagePool
+from url_frontier import FRONTIER_FILENAME, LinkPriority, UrlFrontier
+from crawl_budget import CrawlBudget
+from link_discovery import LINK_DISCOVERY_MODES, LinkDiscovery, extract_links
+from resource_policy import DEFAULT_BLOCKED_TYPES, ResourcePolicy, parse_blocked_types
+from page_settle import DEFAULT_QUIET_MS, SettleDetector
+from scroll_driver import DEFAULT_MAX_SCROLL_STEPS, ScrollDriver
+from browser_server import ENDPOINT_ENV, open_browser
+from extraction_scripts import register_extraction_scripts
+from static_page import (
+    RENDER_MODES,
+    StaticPageClassifier,
+    detect_ui_patterns,
+)
+from dom_snapshot import (
+    CSS_RESOURCES_SCRIPT,
+    EXTRACTION_MODES,
+    capture_document,
+    document_assets,
+)
+from download_scheduler import (
+    DEFAULT_CONCURRENCY,
+    DownloadScheduler,
+    OrderedProgress,
+    parse_type_limits,
+)
+
 
 # Load environment variables
 load_dotenv()
 
+# Sent with every request of the cloning context, streamed downloads included
+EXTRA_HTTP_HEADERS = {
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+}
+
 
 class ProductionWebsiteCloner:
     def __init__(
@@ -31,14 +82,107 @@ class ProductionWebsiteCloner:
         delay=3000,
         depth=1,
         inject_apis=True,
+        concurrency=DEFAULT_CONCURRENCY,
+        type_limits=None,
+        network_capture=False,
+        fetch_backend="page",
+        stream_threshold=DEFAULT_STREAM_THRESHOLD,
+        cache_dir=None,
+        cache_max_bytes=DEFAULT_CACHE_MAX_BYTES,
+        incremental=False,
+        resume=False,
+        parallel_pages=DEFAULT_POOL_SIZE,
+        links_per_page=None,
+        link_discovery="browser",
+        extract_depth=None,
+        discovery_blocked_types=DEFAULT_BLOCKED_TYPES,
+        settle_quiet_ms=DEFAULT_QUIET_MS,
+        max_scroll_steps=DEFAULT_MAX_SCROLL_STEPS,
+        browser_endpoint=None,
+        render_mode="auto",
+        max_pages=None,
+        max_bytes=None,
+        max_seconds=None,
+        dom_extraction="snapshot",
     ):
         self.target_url = target_url
         self.output_dir = Path(output_dir)
         self.headless = headless
         self.delay = delay
         self.depth = depth
+
+        # Waits for dynamic content end once the page has been quiet this long
+        self.settle = SettleDetector(settle_quiet_ms)
+        self.scroll_driver = ScrollDriver(self.settle, max_scroll_steps)
         self.inject_apis = inject_apis
-        self.crawled_urls = set()
+
+        # A running browser server to use instead of launching Chromium
+        self.browser_endpoint = browser_endpoint
+
+        # Pages crawled and extracted at once when depth > 1
+        self.parallel_pages = parallel_pages
+
+        # Links followed from each page; None follows all of them
+        self.links_per_page = links_per_page
+
+        # "browser" reads links from rendered pages, "static" from sitemaps and
+        # raw HTML before rendering anything, "both" does both
+        if link_discovery not in LINK_DISCOVERY_MODES:
+            raise ValueError(f"Unknown link discovery mode: {link_discovery}")
+        self.link_discovery = link_discovery
+
+        # Pages deeper than this are only visited for links and UI patterns,
+        # with heavy resources and trackers blocked; None extracts every page
+        self.extract_depth = extract_depth
+        self.discovery_policy = ResourcePolicy(discovery_blocked_types)
+
+        # "auto" fetches crawled pages over plain HTTP first and renders only
+        # those that need JavaScript; "always" renders every page
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode: {render_mode}")
+        self.render_mode = render_mode
+
+        # "snapshot" reads rendered pages from one DevTools DOM snapshot,
+        # "scripts" from the injected extraction functions
+        if dom_extraction not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown DOM extraction mode: {dom_extraction}")
+        self.dom_extraction = dom_extraction
+
+        # No new page is crawled once any of these is spent; time counts
+        # from the start of the clone
+        self.budget = CrawlBudget(max_pages, max_bytes, max_seconds)
+
+        # Concurrent download scheduling
+        self.scheduler = DownloadScheduler(concurrency, type_limits)
+
+        # "page" fetches inside the page, "request" uses the context's request client
+        if fetch_backend not in FETCH_BACKENDS:
+            raise ValueError(f"Unknown fetch backend: {fetch_backend}")
+        self.fetch_backend = fetch_backend
+
+        # Assets at or above this size are written in chunks, never held whole
+        self.stream_threshold = stream_threshold
+
+        # Asset bodies kept across runs and revalidated instead of re-downloaded
+        self.http_cache = HttpCache(cache_dir, cache_max_bytes) if cache_dir else None
+
+        # Incremental re-clones keep what the previous run saved when it is unchanged
+        self.incremental = incremental
+        self.manifest = CloneManifest(self.output_dir)
+
+        # Finished assets are journaled so an interrupted run can resume
+        self.resume = resume
+        self.journal = DownloadJournal(self.output_dir)
+
+        # Passive capture of response bodies seen during navigation
+        self.network_capture = (
+            NetworkCapture(
+                self.output_dir / ".network_capture",
+                stream_threshold=stream_threshold,
+            )
+            if network_capture
+            else None
+        )
 
         # Directory structure
         self.assets_dir = self.output_dir / "src" / "assets"
@@ -53,10 +197,24 @@ class ProductionWebsiteCloner:
         # Asset tracking
         self.downloaded_assets = {}
         self.asset_mappings = {}
+        self.asset_records = {}
+        self.asset_headers = {}
+
+        # URLs some page has already queued; pages extracted at once share it
+        self.claimed_assets = set()
+
+        # Every asset URL some page of this run referenced, saved or not
+        self.referenced_assets = set()
+
+        # One file per distinct body; URLs serving the same bytes share it
+        self.asset_store = ContentStore(self.output_dir / ".asset_staging")
+
         self.extraction_report = {
             "url": target_url,
             "timestamp": datetime.now().isoformat(),
             "pages_crawled": [],
+            "crawl": None,
+            "rendering": None,
             "assets": {
                 "images": 0,
                 "css": 0,
@@ -70,6 +228,33 @@ class ProductionWebsiteCloner:
             "modals_found": 0,
             "forms_found": 0,
             "total_size_mb": 0,
+            "downloads": {
+                **self.scheduler.describe(),
+                "backend": fetch_backend,
+                "download_seconds": 0,
+                "round_trips": 0,
+                "from_capture": 0,
+                "from_cache": 0,
+                "fetched": 0,
+                "fallbacks": 0,
+                "streamed": 0,
+                "largest_asset_bytes": 0,
+                "resumed": 0,
+                "hosts": {},
+            },
+            "asset_store": self.asset_store.stats,
+            "settle": self.settle.stats,
+            "scroll": self.scroll_driver.stats,
+            "http_cache": self.http_cache.stats if self.http_cache else None,
+            "incremental": {
+                "enabled": incremental,
+                "previous_run": None,
+                "unchanged": 0,
+                "html_rewritten": True,
+                "removed": 0,
+                "removed_bytes": 0,
+                "kept_after_failure": 0,
+            },
         }
 
         # API integration mappings from your existing projects
@@ -120,312 +305,6 @@ class ProductionWebsiteCloner:
 
         print(f"✅ Created React project structure in {self.output_dir}")
 
-    async def inject_enhanced_extraction_script(self, page):
-        """Inject comprehensive asset extraction and UI detection script"""
-        extraction_script = r"""
-        window.extractAllAssets = function() {
-            const assets = {
-                images: [],
-                stylesheets: [],
-                scripts: [],
-                fonts: [],
-                videos: [],
-                other: [],
-                inline_styles: [],
-                background_images: []
-            };
-            
-            // Extract images with better metadata
-            document.querySelectorAll('img').forEach(img => {
-                if (img.src && !img.src.startsWith('data:')) {
-                    assets.images.push({
-                        url: img.src,
-                        alt: img.alt || '',
-                        width: img.naturalWidth || img.width,
-                        height: img.naturalHeight || img.height,
-                        element: 'img',
-                        classes: img.className,
-                        loading: img.loading || 'eager'
-                    });
-                }
-            });
-            
-            // Extract stylesheets
-            document.querySelectorAll('link[rel="stylesheet"]').forEach(link => {
-                assets.stylesheets.push({
-                    url: link.href,
-                    media: link.media || 'all',
-                    integrity: link.integrity || '',
-                    crossorigin: link.crossOrigin || ''
-                });
-            });
-            
-            // Extract scripts
-            document.querySelectorAll('script[src]').forEach(script => {
-                assets.scripts.push({
-                    url: script.src,
-                    type: script.type || 'text/javascript',
-                    async: script.async,
-                    defer: script.defer,
-                    integrity: script.integrity || ''
-                });
-            });
-            
-            // Extract inline styles
-            document.querySelectorAll('style').forEach(style => {
-                if (style.textContent.trim()) {
-                    assets.inline_styles.push({
-                        content: style.textContent,
-                        media: style.media || 'all'
-                    });
-                }
-            });
-            
-            // Extract fonts from CSS with better detection
-            const extractFontsFromCSS = (cssText, baseUrl) => {
-                const fontRegex = /url\s*\(\s*['"]*([^'"\)]+\.(woff2?|ttf|otf|eot))['"]*\s*\)/gi;
-                let match;
-                while ((match = fontRegex.exec(cssText)) !== null) {
-                    try {
-                        const fontUrl = new URL(match[1], baseUrl).href;
-                        assets.fonts.push({url: fontUrl, format: match[2]});
-                    } catch (e) {}
-                }
-            };
-
-
-            
-            // Process stylesheets for fonts
-            Array.from(document.styleSheets).forEach(sheet => {
-                try {
-                    Array.from(sheet.cssRules || sheet.rules).forEach(rule => {
-                        if (rule.cssText) {
-                            extractFontsFromCSS(rule.cssText, sheet.href || window.location.href);
-                        }
-                    });
-                } catch (e) {}
-            });
-            
-            // Process inline styles for fonts
-            assets.inline_styles.forEach(style => {
-                extractFontsFromCSS(style.content, window.location.href);
-            });
-            
-            // Extract background images with element context
-            document.querySelectorAll('*').forEach(el => {
-                const style = window.getComputedStyle(el);
-                if (style.backgroundImage && style.backgroundImage !== 'none') {
-                    const matches = style.backgroundImage.match(/url\s*\(\s*['"]?([^'"\)]+)['"]?\s*\)/g);
-                    if (matches) {
-                        matches.forEach(match => {
-                            const urlMatch = match.match(/url\s*\(\s*['"]?([^'"\)]+)['"]?\s*\)/);
-                            if (urlMatch) {
-                                try {
-                                    const url = new URL(urlMatch[1], window.location.href).href;
-                                    assets.background_images.push({
-                                        url: url,
-                                        element: el.tagName.toLowerCase(),
-                                        classes: el.className,
-                                        id: el.id
-                                    });
-                                } catch (e) {}
-                            }
-                        });
-                    }
-                }
-            });
-            
-            // Extract videos and audio
-            document.querySelectorAll('video, audio, source').forEach(media => {
-                if (media.src) {
-                    assets.videos.push({
-                        url: media.src,
-                        type: media.type || '',
-                        element: media.tagName.toLowerCase()
-                    });
-                }
-            });
-            
-            // Remove duplicates
-            Object.keys(assets).forEach(key => {
-                if (Array.isArray(assets[key])) {
-                    const seen = new Set();
-                    assets[key] = assets[key].filter(item => {
-                        const url = item.url || item.content;
-                        if (seen.has(url)) return false;
-                        seen.add(url);
-                        return true;
-                    });
-                }
-            });
-            
-            return assets;
-        };
-        
-        // Enhanced asset download with retry logic
-        window.downloadAssetAsBase64 = async function(url, retries = 3) {
-            for (let i = 0; i < retries; i++) {
-                try {
-                    const response = await fetch(url, {
-                        mode: 'cors',
-                        credentials: 'omit'
-                    });
-                    
-                    if (!response.ok) {
-                        throw new Error(`HTTP ${response.status}`);
-                    }
-                    
-                    const blob = await response.blob();
-                    return new Promise((resolve) => {
-                        const reader = new FileReader();
-                        reader.onloadend = () => resolve({
-                            success: true,
-                            data: reader.result,
-                            contentType: blob.type,
-                            size: blob.size,
-                            url: url
-                        });
-                        reader.onerror = () => resolve({
-                            success: false,
-                            error: 'FileReader error',
-                            url: url
-                        });
-                        reader.readAsDataURL(blob);
-                    });
-                } catch (error) {
-                    if (i === retries - 1) {
-                        return {success: false, error: error.message, url: url};
-                    }
-                    await new Promise(resolve => setTimeout(resolve, 1000 * (i + 1)));
-                }
-            }
-        };
-        
-        window.detectUIPatterns = function() {
-    let patterns = {
-        modals: [],
-        forms: [],
-        banners: [],
-        navigation: [],
-        buttons: [], // Ensure this is always present
-        inputs: []
-    };
-    
-    try {
-        // Detect modals with better selectors
-        const modalSelectors = [
-            '[class*="modal"]', '[id*="modal"]', '.popup', '.dialog',
-            '[role="dialog"]', '[aria-modal="true"]', '.overlay',
-            '[class*="popup"]', '[class*="dialog"]'
-        ];
-
-        modalSelectors.forEach(selector => {
-            document.querySelectorAll(selector).forEach(modal => {
-                const style = window.getComputedStyle(modal);
-                patterns.modals.push({
-                    element: modal.tagName,
-                    classes: modal.className,
-                    id: modal.id,
-                    visible: style.display !== 'none' && style.visibility !== 'hidden',
-                    zIndex: style.zIndex,
-                    position: style.position
-                });
-            });
-        });
-
-        // Enhanced form detection
-        document.querySelectorAll('form').forEach(form => {
-            const inputs = form.querySelectorAll('input, textarea, select');
-            const buttons = form.querySelectorAll('button, input[type="submit"]');
-            
-            const formData = {
-                action: form.action,
-                method: form.method || 'GET',
-                id: form.id,
-                classes: form.className,
-                inputs: Array.from(inputs).map(input => input ? {
-                    type: input.type,
-                    name: input.name,
-                    placeholder: input.placeholder,
-                    required: input.required,
-                    id: input.id,
-                    classes: input.className
-                } : {}),
-                buttons: Array.from(buttons).map(btn => btn ? {
-                    type: btn.type,
-                    text: btn.textContent?.trim() || btn.value,
-                    classes: btn.className
-                } : {})
-            };
-
-            patterns.forms.push(formData);
-        });
-
-        // Detect banners and sliders
-        const bannerSelectors = [
-            '[class*="banner"]', '[class*="slider"]', '[class*="carousel"]',
-            '[class*="hero"]', '[class*="swiper"]', '[id*="banner"]',
-            '[id*="slider"]', '[id*="carousel"]'
-        ];
-
-        bannerSelectors.forEach(selector => {
-            document.querySelectorAll(selector).forEach(banner => {
-                patterns.banners.push({
-                    element: banner.tagName,
-                    classes: banner.className,
-                    id: banner.id,
-                    images: Array.from(banner.querySelectorAll('img')).map(img => img.src)
-                });
-            });
-        });
-
-        // Detect navigation
-        document.querySelectorAll('nav, [role="navigation"], .navbar, .menu').forEach(nav => {
-            const links = nav.querySelectorAll('a');
-            patterns.navigation.push({
-                element: nav.tagName,
-                classes: nav.className,
-                id: nav.id,
-                links: Array.from(links).map(link => ({
-                    href: link.href,
-                    text: link.textContent?.trim(),
-                    classes: link.className
-                }))
-            });
-        });
-
-    } catch (e) {
-        console.error("Error in detectUIPatterns: ", e);
-    }
-    
-    return patterns;
-};
-
-        
-        // Get internal links for crawling
-        window.getInternalLinks = function() {
-            const currentDomain = window.location.hostname;
-            const links = new Set();
-            
-            document.querySelectorAll('a[href]').forEach(link => {
-                try {
-                    const url = new URL(link.href, window.location.href);
-                    if (url.hostname === currentDomain && 
-                        !url.hash && 
-                        !link.href.includes('mailto:') && 
-                        !link.href.includes('tel:')) {
-                        links.add(url.href);
-                    }
-                } catch (e) {}
-            });
-            
-            return Array.from(links);
-        };
-        """
-
-        await page.evaluate(extraction_script)
-        print("✅ Enhanced extraction script injected")
-
     async def capture_screenshot(self, page, filename="preview.png"):
         """Capture screenshot of the page"""
         try:
@@ -441,9 +320,8 @@ class ProductionWebsiteCloner:
         """Enhanced dynamic content loading with better modal handling"""
         print("⏳ Waiting for dynamic content...")
 
-        # Wait for initial load
-        await page.wait_for_load_state("networkidle", timeout=30000)
-        await asyncio.sleep(self.delay / 1000)
+        # Wait for initial load, at most self.delay
+        await self.settle.wait(page, self.delay)
 
         # Try to trigger modals and dynamic content
         modal_triggers = [
@@ -472,7 +350,7 @@ class ProductionWebsiteCloner:
                             continue
 
                         await element.click(timeout=2000)
-                        await asyncio.sleep(1)
+                        await self.settle.wait(page, 1000)
 
                         # Try to close modal with multiple strategies
                         close_selectors = [
@@ -501,113 +379,309 @@ class ProductionWebsiteCloner:
                         if not modal_closed:
                             await page.keyboard.press("Escape")
 
-                        await asyncio.sleep(0.5)
+                        await self.settle.wait(page, 500)
                     except Exception as e:
                         continue
             except:
                 continue
 
-        # Enhanced scrolling for lazy loading
-        scroll_positions = [0.25, 0.5, 0.75, 1.0]
-        for position in scroll_positions:
-            await page.evaluate(
-                f"""
-                window.scrollTo(0, document.body.scrollHeight * {position});
-            """
-            )
-            await asyncio.sleep(1)
-
-        # Scroll back to top
-        await page.evaluate("window.scrollTo(0, 0);")
-        await asyncio.sleep(1)
+        # Scroll one viewport at a time until lazy loading stops
+        scroll = await self.scroll_driver.scroll(page)
+        print(
+            f"  📜 Scrolled {scroll['steps']} steps, {scroll['requests']} lazy requests"
+        )
 
         # Wait for any final network requests
-        await page.wait_for_load_state("networkidle", timeout=10000)
+        await self.settle.wait(page, 10000)
+
+        print(
+            f"✅ Dynamic content loading completed ({self.settle.stats['waited_ms'] / 1000:.1f}s spent waiting for the page to settle)"
+        )
 
-        print("✅ Dynamic content loading completed")
+    async def extract_and_download_assets(self, page, assets=None, rendered=True):
+        """Enhanced asset extraction with concurrent downloads and progress tracking.
 
-    async def extract_and_download_assets(self, page):
-        """Enhanced asset extraction with progress tracking"""
+        assets, when given, were already read from the page's markup.
+        rendered is False for a page that was only fetched statically.
+        """
         print("🔍 Extracting assets...")
 
         # Get all assets
-        assets = await page.evaluate("window.extractAllAssets()")
+        if assets is None:
+            assets = await page.evaluate("window.extractAllAssets()")
 
         total_assets = sum(
             len(asset_list)
             for asset_list in assets.values()
             if isinstance(asset_list, list)
         )
-        downloaded_count = 0
-        total_size = 0
 
         print(f"📊 Found {total_assets} assets to download")
 
-        # Download each asset type
+        # Queue each asset once; the same URL often shows up under several types
+        # and on several pages
+        jobs = []
         for asset_type, asset_list in assets.items():
             if not asset_list or not isinstance(asset_list, list):
                 continue
 
-            print(f"📥 Downloading {len(asset_list)} {asset_type}...")
-
             for i, asset in enumerate(asset_list):
-                try:
-                    if asset_type == "inline_styles":
-                        # Handle inline styles separately
-                        await self.save_inline_style(asset, i)
-                        continue
-
-                    url = asset["url"] if isinstance(asset, dict) else asset
-                    if not url or url.startswith("data:") or url.startswith("blob:"):
-                        continue
+                if asset_type == "inline_styles":
+                    # Handle inline styles separately
+                    await self.save_inline_style(asset, i)
+                    continue
 
-                    # Skip if already downloaded
-                    if url in self.downloaded_assets:
-                        continue
+                url = asset["url"] if isinstance(asset, dict) else asset
+                if not url or url.startswith("data:") or url.startswith("blob:"):
+                    continue
+                self.referenced_assets.add(url)
 
-                    # Download using browser context
-                    result = await page.evaluate(
-                        f"window.downloadAssetAsBase64('{url}')"
-                    )
-
-                    if result.get("success"):
-                        # Save the asset
-                        await self.save_asset(
-                            url,
-                            result["data"],
-                            asset_type,
-                            result.get("contentType", ""),
-                            asset,
-                        )
-                        self.extraction_report["assets"][
-                            (
-                                asset_type
-                                if asset_type in self.extraction_report["assets"]
-                                else "other"
-                            )
-                        ] += 1
-                        total_size += result.get("size", 0)
-                        downloaded_count += 1
-
-                        # Progress indicator
-                        if downloaded_count % 10 == 0:
-                            print(
-                                f"  📈 Progress: {downloaded_count}/{total_assets} assets downloaded"
-                            )
-                    else:
-                        print(
-                            f"  ⚠️ Failed to download: {url} - {result.get('error', 'Unknown error')}"
-                        )
-
-                except Exception as e:
-                    print(f"❌ Error downloading {url}: {str(e)}")
+                # Skip if already downloaded
+                if url in self.downloaded_assets or url in self.claimed_assets:
                     continue
 
+                self.claimed_assets.add(url)
+                jobs.append((asset_type, asset))
+
+        # Bodies already recorded on the wire don't need a second fetch
+        if self.network_capture:
+            await self.network_capture.drain()
+        to_fetch = [
+            (asset["url"] if isinstance(asset, dict) else asset, asset_type)
+            for asset_type, asset in jobs
+        ]
+        if self.network_capture:
+            to_fetch = [
+                (url, asset_type)
+                for url, asset_type in to_fetch
+                if not self.network_capture.has(url)
+            ]
+            print(
+                f"📡 {len(jobs) - len(to_fetch)} assets captured during navigation, {len(to_fetch)} left to fetch"
+            )
+
+        print(
+            f"📥 Downloading {len(jobs)} assets (concurrency {self.scheduler.concurrency})..."
+        )
+
+        fetcher = self.create_fetcher(page, rendered)
+
+        async def download(asset_type, asset):
+            url = asset["url"] if isinstance(asset, dict) else asset
+            try:
+                result = await self.download_single_asset(fetcher, asset_type, asset)
+            except Exception as e:
+                result = {"success": False, "error": str(e), "url": url}
+
+            if url not in self.downloaded_assets:
+                # Let another page that references it try again
+                self.claimed_assets.discard(url)
+            else:
+                self.journal.record(
+                    url,
+                    self.downloaded_assets[url],
+                    asset_type,
+                    self.asset_records[url],
+                    self.asset_headers.get(url),
+                )
+            return result
+
+        started = datetime.now()
+        progress = OrderedProgress(
+            total_assets,
+            status=lambda: summarize_hosts(fetcher.stats.get("hosts", {})),
+        )
+        try:
+            fetcher.prefetch(to_fetch)
+            results = await self.scheduler.run(jobs, download, progress)
+        finally:
+            await fetcher.close()
+        elapsed = (datetime.now() - started).total_seconds()
+        self.extraction_report["downloads"]["round_trips"] += fetcher.stats[
+            "round_trips"
+        ]
+        self.extraction_report["downloads"]["fallbacks"] += fetcher.stats.get(
+            "fallbacks", 0
+        )
+        self.extraction_report["downloads"]["hosts"].update(
+            fetcher.stats.get("hosts", {})
+        )
+        self.extraction_report["downloads"]["download_seconds"] = round(
+            self.extraction_report["downloads"]["download_seconds"] + elapsed, 2
+        )
+
+        downloaded_count = progress.downloaded
+        total_size = sum(
+            result.get("size", 0)
+            for result in results
+            if isinstance(result, dict) and result.get("success")
+        )
+
         self.extraction_report["total_size_mb"] = round(total_size / (1024 * 1024), 2)
         print(
-            f"✅ Asset extraction completed: {downloaded_count}/{total_assets} assets, {self.extraction_report['total_size_mb']} MB"
+            f"✅ Asset extraction completed: {downloaded_count}/{total_assets} assets, {self.extraction_report['total_size_mb']} MB in {elapsed:.1f}s ({fetcher.stats['round_trips']} round trips)"
         )
 
+        return assets
+
+    def create_fetcher(self, page, rendered=True):
+        """Build the asset fetcher for the configured backend.
+
+        A page that was never rendered holds no document of the site, so
+        its assets go through the request client with no in-page fallback.
+        """
+        # One in-page batch fetches everything; the scheduler only consumes
+        # results, so each page's batch gets its share of the global limits.
+        # While crawling, the start page is extracted next to the pool's pages.
+        pages = self.parallel_pages + 1 if self.depth > 1 else 1
+        page_fetcher = (
+            PageBatchFetcher(
+                page,
+                concurrency=max(1, self.scheduler.concurrency // pages),
+                type_limits={
+                    asset_type: max(1, limit // pages)
+                    for asset_type, limit in self.scheduler.type_limits.items()
+                },
+                stream_threshold=self.stream_threshold,
+            )
+            if rendered
+            else None
+        )
+        if rendered and self.fetch_backend == "page":
+            fetcher = page_fetcher
+        else:
+            # The in-page path stays available for URLs the request client can't get
+            fetcher = RequestContextFetcher(
+                page,
+                self.output_dir / ".fetch_staging",
+                fallback=page_fetcher,
+                stream_threshold=self.stream_threshold,
+                headers=EXTRA_HTTP_HEADERS,
+            )
+
+        if self.http_cache:
+            fetcher = CachingFetcher(
+                fetcher,
+                self.http_cache,
+                page,
+                self.output_dir / ".fetch_staging",
+                stream_threshold=self.stream_threshold,
+            )
+
+        # Ask about the previous run's files before anything is downloaded
+        if self.incremental and self.manifest.assets:
+            fetcher = IncrementalFetcher(fetcher, self.manifest, page)
+        return fetcher
+
+    async def download_single_asset(self, fetcher, asset_type, asset):
+        """Download one asset through the browser context and save it"""
+        url = asset["url"] if isinstance(asset, dict) else asset
+
+        captured = self.network_capture.take(url) if self.network_capture else None
+        if captured:
+            if self.http_cache:
+                self.http_cache.store_capture(url, captured)
+            await self.save_asset_file(
+                url,
+                captured["path"],
+                asset_type,
+                captured["content_type"],
+                {"sha256": captured["sha256"], "size": captured["size"]},
+            )
+            self.count_asset(asset_type)
+            self.remember_headers(
+                url,
+                captured["content_type"],
+                captured["etag"],
+                captured["last_modified"],
+            )
+            self.extraction_report["downloads"]["from_capture"] += 1
+            self.budget.spend_bytes(captured["size"])
+            return {"success": True, "size": captured["size"], "url": url}
+
+        # Download using browser context
+        result = await fetcher.fetch(url)
+        if result.get("success"):
+            self.remember_headers(
+                url,
+                result.get("contentType", ""),
+                result.get("etag"),
+                result.get("lastModified"),
+            )
+
+        if result.get("unchanged"):
+            # Saved by the previous run and confirmed unchanged; leave it in place
+            self.record_saved_asset(
+                url,
+                Path(result["path"]),
+                {"sha256": result["sha256"], "size": result["size"]},
+            )
+            self.count_asset(asset_type)
+            self.extraction_report["incremental"]["unchanged"] += 1
+            return result
+
+        if result.get("cached"):
+            self.extraction_report["downloads"]["from_cache"] += 1
+        else:
+            self.extraction_report["downloads"]["fetched"] += 1
+
+        if result.get("success") and result.get("path"):
+            # Already on disk, written by the request backend
+            await self.save_asset_file(
+                url,
+                result["path"],
+                asset_type,
+                result.get("contentType", ""),
+                {"sha256": result["sha256"], "size": result["size"]},
+            )
+            self.count_asset(asset_type)
+        elif result.get("success") and result.get("streamId"):
+            # Too large to hand over in one piece; read it out of the page in chunks
+            await self.save_asset_stream(
+                url,
+                fetcher.iter_stream(result),
+                asset_type,
+                result.get("contentType", ""),
+            )
+            self.count_asset(asset_type)
+        elif result.get("success"):
+            # Save the asset
+            await self.save_asset(
+                url,
+                result["data"],
+                asset_type,
+                result.get("contentType", ""),
+                asset,
+            )
+            self.count_asset(asset_type)
+
+        # Only bodies transferred this run count against the byte budget
+        transferred = result.get("success") and not result.get("cached")
+        if transferred and url in self.asset_records:
+            self.budget.spend_bytes(self.asset_records[url]["size"])
+
+        # Drop the base64 payload so finished results don't pin it in memory
+        result.pop("data", None)
+        return result
+
+    def remember_headers(self, url, content_type, etag, last_modified):
+        """Keep the validators the next incremental run revalidates with"""
+        self.asset_headers[url] = {
+            "content_type": content_type,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+
+    def count_asset(self, asset_type):
+        """Bump the report counter for a saved asset"""
+        self.extraction_report["assets"][
+            (
+                asset_type
+                if asset_type in self.extraction_report["assets"]
+                else "other"
+            )
+        ] += 1
+
     async def save_inline_style(self, style_data, index):
         """Save inline styles as separate CSS files"""
         try:
@@ -628,176 +702,121 @@ class ProductionWebsiteCloner:
     ):
         """Enhanced asset saving with better file naming"""
         try:
-            # Parse URL to get filename
-            parsed_url = urlparse(url)
-            filename = (
-                os.path.basename(parsed_url.path)
-                or f"asset_{len(self.downloaded_assets)}"
-            )
-
-            # Clean filename
-            filename = re.sub(r"[^\w\-_\.]", "_", filename)
-
-            # Determine file extension from content type if missing
-            if not os.path.splitext(filename)[1]:
-                if "image" in content_type:
-                    if "png" in content_type:
-                        ext = ".png"
-                    elif "jpeg" in content_type or "jpg" in content_type:
-                        ext = ".jpg"
-                    elif "gif" in content_type:
-                        ext = ".gif"
-                    elif "svg" in content_type:
-                        ext = ".svg"
-                    elif "webp" in content_type:
-                        ext = ".webp"
-                    else:
-                        ext = ".png"
-                elif "css" in content_type:
-                    ext = ".css"
-                elif "javascript" in content_type:
-                    ext = ".js"
-                elif "font" in content_type:
-                    if "woff2" in content_type:
-                        ext = ".woff2"
-                    elif "woff" in content_type:
-                        ext = ".woff"
-                    elif "ttf" in content_type:
-                        ext = ".ttf"
-                    elif "otf" in content_type:
-                        ext = ".otf"
-                    else:
-                        ext = ".woff2"
-                elif "video" in content_type:
-                    ext = ".mp4"
-                elif "audio" in content_type:
-                    ext = ".mp3"
-                else:
-                    ext = ".bin"
-                filename += ext
-
-            # Determine save directory
-            if asset_type in ["images", "background_images"]:
-                save_dir = self.assets_dir / "images"
-            elif asset_type == "stylesheets":
-                save_dir = self.assets_dir / "css"
-            elif asset_type == "scripts":
-                save_dir = self.assets_dir / "js"
-            elif asset_type == "fonts":
-                save_dir = self.assets_dir / "fonts"
-            elif asset_type in ["videos", "audio"]:
-                save_dir = self.assets_dir / "videos"
-            else:
-                save_dir = self.assets_dir / "other"
-
-            save_dir.mkdir(parents=True, exist_ok=True)
-
-            # Handle duplicate filenames
-            original_filename = filename
-            counter = 1
-            while (save_dir / filename).exists():
-                name, ext = os.path.splitext(original_filename)
-                filename = f"{name}_{counter}{ext}"
-                counter += 1
+            # Save file; large payloads are decoded and written chunk by chunk
+            staging_path = self.asset_store.staging_path()
+            written = write_base64(staging_path, base64_data, self.stream_threshold)
 
-            # Remove data URL prefix
-            if base64_data.startswith("data:"):
-                base64_data = base64_data.split(",")[1]
-
-            # Save file
-            file_path = save_dir / filename
-            with open(file_path, "wb") as f:
-                f.write(base64.b64decode(base64_data))
-
-            # Track the mapping
-            relative_path = f"./assets/{save_dir.name}/{filename}"
-            self.asset_mappings[url] = relative_path
-            self.downloaded_assets[url] = str(file_path)
+            await self.save_asset_file(
+                url, staging_path, asset_type, content_type, written
+            )
 
         except Exception as e:
             print(f"❌ Failed to save asset {url}: {str(e)}")
 
-    async def crawl_internal_pages(self, page, base_url, current_depth=0):
-        """Crawl internal pages up to specified depth"""
-        if current_depth >= self.depth:
-            return
-
-        print(f"🕷️ Crawling internal pages (depth {current_depth + 1}/{self.depth})...")
-
-        # Get internal links
-        internal_links = await page.evaluate("window.getInternalLinks()")
-
-        for link in internal_links[:5]:  # Limit to 5 pages per depth level
-            if link in self.crawled_urls:
-                continue
-
-            try:
-                print(f"  📄 Crawling: {link}")
-                await page.goto(link, wait_until="networkidle", timeout=30000)
-                self.crawled_urls.add(link)
-                self.extraction_report["pages_crawled"].append(link)
-
-                # Wait for dynamic content
-                await self.wait_for_dynamic_content(page)
-
-                # Extract assets from this page
-                await self.extract_and_download_assets(page)
-
-                # Recursively crawl if depth allows
-                if current_depth + 1 < self.depth:
-                    await self.crawl_internal_pages(page, base_url, current_depth + 1)
-
-            except Exception as e:
-                print(f"  ❌ Failed to crawl {link}: {str(e)}")
-                continue
-
-        async def extract_html_and_detect_patterns(self, page):
-            """Extract final HTML and detect UI patterns"""
-            print("📄 Extracting HTML and detecting patterns...")
+    async def save_asset_stream(self, url, chunks, asset_type, content_type):
+        """Write an asset from an async iterator of chunks"""
+        staging_path = self.asset_store.staging_path()
+        try:
+            written = await write_chunks_async(staging_path, chunks)
+        except Exception:
+            # Don't leave a truncated file behind
+            staging_path.unlink(missing_ok=True)
+            raise
+        return await self.save_asset_file(
+            url, staging_path, asset_type, content_type, written
+        )
 
-            # Get the final HTML
-            html_content = await page.content()
+    async def save_asset_file(
+        self, url, source_path, asset_type, content_type, written
+    ):
+        """Move a body already written to disk into the content store"""
+        save_dir, filename = self.get_asset_target(url, asset_type, content_type)
+        file_path = self.asset_store.commit(source_path, save_dir, filename, written)
+        self.record_saved_asset(url, file_path, written)
+        return file_path
+
+    def record_saved_asset(self, url, file_path, written):
+        """Track the mapping used to rewrite HTML to the local copy"""
+        relative_path = f"./assets/{file_path.parent.name}/{file_path.name}"
+        self.asset_mappings[url] = relative_path
+        self.downloaded_assets[url] = str(file_path)
+        self.asset_records[url] = {"sha256": written["sha256"], "size": written["size"]}
+
+        downloads = self.extraction_report["downloads"]
+        if written.get("streamed"):
+            downloads["streamed"] += 1
+        downloads["largest_asset_bytes"] = max(
+            downloads["largest_asset_bytes"], written["size"]
+        )
 
-            # Initialize default patterns structure
-            default_patterns = {
-                "modals": [],
-                "forms": [],
-                "banners": [],
-                "navigation": [],
-                "buttons": [],
-                "inputs": [],
-            }
+    def get_asset_target(self, url, asset_type, content_type):
+        """Pick the directory and preferred filename for an asset"""
+        # Parse URL to get filename
+        parsed_url = urlparse(url)
+        filename = (
+            os.path.basename(parsed_url.path)
+            or f"asset_{len(self.downloaded_assets)}"
+        )
 
-            # Detect UI patterns with error handling
-            try:
-                patterns = await page.evaluate("window.detectUIPatterns()")
-                if not patterns or not isinstance(patterns, dict):
-                    patterns = default_patterns
+        # Clean filename
+        filename = re.sub(r"[^\w\-_\.]", "_", filename)
+
+        # Determine file extension from content type if missing
+        if not os.path.splitext(filename)[1]:
+            if "image" in content_type:
+                if "png" in content_type:
+                    ext = ".png"
+                elif "jpeg" in content_type or "jpg" in content_type:
+                    ext = ".jpg"
+                elif "gif" in content_type:
+                    ext = ".gif"
+                elif "svg" in content_type:
+                    ext = ".svg"
+                elif "webp" in content_type:
+                    ext = ".webp"
                 else:
-                    # Ensure all expected keys exist
-                    for key in default_patterns:
-                        if key not in patterns:
-                            patterns[key] = []
+                    ext = ".png"
+            elif "css" in content_type:
+                ext = ".css"
+            elif "javascript" in content_type:
+                ext = ".js"
+            elif "font" in content_type:
+                if "woff2" in content_type:
+                    ext = ".woff2"
+                elif "woff" in content_type:
+                    ext = ".woff"
+                elif "ttf" in content_type:
+                    ext = ".ttf"
+                elif "otf" in content_type:
+                    ext = ".otf"
+                else:
+                    ext = ".woff2"
+            elif "video" in content_type:
+                ext = ".mp4"
+            elif "audio" in content_type:
+                ext = ".mp3"
+            else:
+                ext = ".bin"
+            filename += ext
+
+        # Determine save directory
+        if asset_type in ["images", "background_images"]:
+            save_dir = self.assets_dir / "images"
+        elif asset_type == "stylesheets":
+            save_dir = self.assets_dir / "css"
+        elif asset_type == "scripts":
+            save_dir = self.assets_dir / "js"
+        elif asset_type == "fonts":
+            save_dir = self.assets_dir / "fonts"
+        elif asset_type in ["videos", "audio"]:
+            save_dir = self.assets_dir / "videos"
+        else:
+            save_dir = self.assets_dir / "other"
 
-            except Exception as e:
-                print(f"  ⚠️ Pattern detection failed: {e}")
-                patterns = default_patterns
-
-            # Update extraction report with safe access
-            self.extraction_report.update(
-                {
-                    "modals_found": len(patterns.get("modals", [])),
-                    "forms_found": len(patterns.get("forms", [])),
-                    "components_detected": [
-                        f"{len(patterns.get('modals', []))} modals",
-                        f"{len(patterns.get('forms', []))} forms",
-                        f"{len(patterns.get('banners', []))} banners",
-                        f"{len(patterns.get('navigation', []))} navigation menus",
-                    ],
-                }
-            )
+        save_dir.mkdir(parents=True, exist_ok=True)
 
-            return html_content, patterns
+        # Name collisions between different bodies are settled by the store
+        return save_dir, filename
 
     def rewrite_asset_paths(self, html_content):
         """Enhanced asset path rewriting"""
@@ -1744,6 +1763,91 @@ root.render(
 
         print("✅ Project files created successfully")
 
+    def load_previous_clone(self):
+        """Pick up the manifest of the last clone into this directory"""
+        if not self.manifest.load():
+            print("ℹ️ No previous clone manifest found, cloning everything")
+            return
+
+        # New bodies identical to a file already on disk reuse that file
+        for url, entry in self.manifest.assets.items():
+            self.asset_store.adopt(self.manifest.file_path(url), entry["sha256"])
+
+        previous_report = self.manifest.previous_report or {}
+        self.extraction_report["incremental"]["previous_run"] = previous_report.get(
+            "timestamp"
+        )
+        print(
+            f"♻️ Incremental clone: {len(self.manifest.assets)} assets from the previous run ({previous_report.get('timestamp', 'unknown time')})"
+        )
+
+    def resume_from_journal(self):
+        """Rebuild the asset mappings saved by an interrupted run"""
+        entries = self.journal.load()
+        if not entries:
+            print("ℹ️ Nothing to resume, starting from scratch")
+            return
+
+        for url, entry in entries.items():
+            file_path = self.output_dir / entry["path"]
+            self.record_saved_asset(
+                url, file_path, {"sha256": entry["sha256"], "size": entry["size"]}
+            )
+            self.remember_headers(
+                url,
+                entry.get("content_type", ""),
+                entry.get("etag"),
+                entry.get("last_modified"),
+            )
+            self.asset_store.adopt(file_path, entry["sha256"])
+            self.count_asset(entry["asset_type"])
+
+        self.extraction_report["downloads"]["resumed"] = len(entries)
+        print(f"⏯️ Resuming: {len(entries)} assets already downloaded")
+
+    def kept_previous_assets(self):
+        """Previous manifest entries of URLs referenced this run but not saved.
+
+        Their download or revalidation failed, e.g. on a timeout, so the
+        previous file is kept rather than dropped from the clone.
+        """
+        return {
+            url: entry
+            for url, entry in self.manifest.assets.items()
+            if url in self.referenced_assets and url not in self.downloaded_assets
+        }
+
+    def remove_unreferenced_assets(self):
+        """Delete asset files whose URL no page of this run referenced"""
+        referenced = [
+            self.assets_dir / relative_path[len("./assets/") :]
+            for relative_path in self.asset_mappings.values()
+            if relative_path.startswith("./assets/")
+        ]
+        kept = self.kept_previous_assets()
+        referenced += [self.output_dir / entry["path"] for entry in kept.values()]
+        self.extraction_report["incremental"]["kept_after_failure"] = len(kept)
+        if kept:
+            print(f"⚠️ Keeping {len(kept)} previous assets that failed to refresh")
+        removed, removed_bytes = collect_garbage(self.assets_dir, referenced)
+        self.extraction_report["incremental"]["removed"] = removed
+        self.extraction_report["incremental"]["removed_bytes"] = removed_bytes
+        if removed:
+            print(
+                f"🧹 Removed {removed} unreferenced assets ({removed_bytes / (1024 * 1024):.2f} MB)"
+            )
+
+    def write_manifest(self, html_sha256):
+        """Record this run's assets for the next incremental clone"""
+        assets = dict(self.kept_previous_assets())
+        for url, file_path in self.downloaded_assets.items():
+            assets[url] = {
+                "path": Path(file_path).relative_to(self.output_dir).as_posix(),
+                **self.asset_records[url],
+                **self.asset_headers.get(url, {}),
+            }
+        self.manifest.write(self.target_url, assets, html_sha256)
+
     def create_extraction_report(self):
         """Create detailed extraction report with analytics"""
         # Calculate total size
@@ -1773,9 +1877,13 @@ root.render(
         return report_path
 
     def create_zip_archive(self):
-        """Create production-ready zip archive"""
+        """Create production-ready zip archive.
+
+        Named after the output directory, so clones sharing a parent
+        directory never write the same archive.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        zip_path = self.output_dir.parent / f"production_website_{timestamp}.zip"
+        zip_path = self.output_dir.parent / f"{self.output_dir.name}_{timestamp}.zip"
 
         with zipfile.ZipFile(
             zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=6
@@ -1788,244 +1896,405 @@ root.render(
         print(f"📦 Production archive created: {zip_path}")
         return zip_path
 
-    async def crawl_multiple_pages(self, page, start_url, max_depth=1):
-        """Crawl multiple pages if depth > 1"""
-        if max_depth <= 1:
-            return [start_url]
+    async def snapshot_page(self, page):
+        """The loaded page's document from one DOM snapshot, or None to use scripts"""
+        if self.dom_extraction != "snapshot":
+            return None
+        try:
+            return await capture_document(page)
+        except Exception as e:
+            print(f"⚠️ DOM snapshot failed, using extraction scripts: {str(e)}")
+            self.dom_extraction = "scripts"
+            return None
 
-        urls_to_crawl = [start_url]
-        crawled_urls = set()
+    async def find_links(self, page, document=None):
+        """Same-host links of a snapshot or static fetch, else of the loaded page"""
+        if document is None:
+            return await page.evaluate("window.getInternalLinks()")
+        host = urlparse(document["url"]).hostname
+        return extract_links(document["html"], document["url"], host)
+
+    async def find_patterns(self, page, document=None):
+        """UI patterns of a snapshot or static fetch, else of the loaded page"""
+        if document is None:
+            return await page.evaluate("window.detectUIPatterns()")
+        return detect_ui_patterns(document["soup"], document["url"])
+
+    async def extract_page(
+        self, page, url, capture_assets=True, static=None, snapshot=None
+    ):
+        """(assets, patterns) of the page loaded in page, or of a static fetch.
 
-        for depth in range(max_depth):
-            current_level_urls = []
+        A snapshot of the loaded page, or a static fetch, is read in Python;
+        otherwise the page's extraction scripts are run.
+        """
+        document = static or snapshot
+        assets = {}
+        if capture_assets:
+            found = None
+            if static:
+                found = document_assets(static)
+            elif snapshot:
+                css = await page.evaluate(CSS_RESOURCES_SCRIPT)
+                found = document_assets(snapshot, css["resources"], css["fonts"])
+            assets = await self.extract_and_download_assets(
+                page, found, rendered=not static
+            )
+        patterns = await self.find_patterns(page, document)
+        return assets, patterns
 
-            for url in urls_to_crawl:
-                if url in crawled_urls:
-                    continue
+    async def visit_page(self, page, url, depth, max_depth, classifier=None):
+        """Fetch or render one crawled page; returns (links, assets, patterns).
 
-                try:
-                    print(f"🔍 Crawling: {url} (depth {depth + 1})")
-                    await page.goto(url, wait_until="networkidle", timeout=30000)
-                    await self.inject_enhanced_extraction_script(page)
-
-                    # Get internal links
-                    internal_links = await page.evaluate("window.getInternalLinks()")
-                    current_level_urls.extend(
-                        internal_links[:5]
-                    )  # Limit to 5 links per page
-
-                    crawled_urls.add(url)
-                    self.extraction_report["pages_crawled"].append(
-                        {
-                            "url": url,
-                            "depth": depth + 1,
-                            "timestamp": datetime.now().isoformat(),
-                        }
-                    )
-
-                except Exception as e:
-                    print(f"❌ Failed to crawl {url}: {str(e)}")
-                    continue
+        Pages the classifier finds to be plain HTML are never rendered.
+        Pages deeper than extract_depth are only visited for links and UI
+        patterns, with heavy resources and trackers blocked.
+        """
+        follow_links = self.link_discovery != "static" and depth < max_depth
+        capture_assets = self.extract_depth is None or depth <= self.extract_depth
+
+        static = await classifier.classify(url) if classifier else None
+        if static:
+            print(f"🔍 Crawling: {url} (depth {depth}, static HTML)")
+            assets, patterns = await self.extract_page(
+                page, url, capture_assets, static
+            )
+            links = await self.find_links(page, static) if follow_links else []
+            return links, assets, patterns
+
+        async def load():
+            await page.goto(url, wait_until="networkidle", timeout=30000)
+            snapshot = await self.snapshot_page(page)
+
+            # Get internal links
+            links = await self.find_links(page, snapshot) if follow_links else []
+
+            assets, patterns = await self.extract_page(
+                page, url, capture_assets, snapshot=snapshot
+            )
+            return links, assets, patterns
+
+        if capture_assets:
+            print(f"🔍 Crawling: {url} (depth {depth})")
+            return await load()
+
+        print(f"🔍 Crawling: {url} (depth {depth}, links and patterns only)")
+        async with self.discovery_policy.applied(page):
+            return await load()
+
+    async def crawl_multiple_pages(self, pool, page, start_url, max_depth=1):
+        """Visit every page once, collecting its links, assets and UI patterns.
+
+        page already has start_url loaded and keeps it for the final HTML;
+        further pages are crawled through the pool while it is extracted.
+        With static link discovery the frontier is filled over plain HTTP
+        first and rendered pages are only used for their assets. In "auto"
+        render mode crawled pages that don't need JavaScript are read from
+        their raw HTML and never rendered. Links in a page's navigation are
+        crawled first, and the crawl stops early once the budget is spent.
+        Returns {url: (assets, patterns)}.
+        """
+        extracted = {}
+        classifier = None
+        if self.render_mode == "auto" and max_depth > 1:
+            classifier = StaticPageClassifier(page.context.request)
+
+        def record(url, depth, assets, patterns):
+            extracted[url] = (assets, patterns)
+            if max_depth > 1:
+                self.extraction_report["pages_crawled"].append(
+                    {
+                        "url": url,
+                        "depth": depth,
+                        "timestamp": datetime.now().isoformat(),
+                    }
+                )
 
-            urls_to_crawl = list(set(current_level_urls) - crawled_urls)
+        async def visit(page, url, depth):
+            links, assets, patterns = await self.visit_page(
+                page, url, depth, max_depth, classifier
+            )
+            record(url, depth, assets, patterns)
+            priority.note_navigation(patterns)
+            return links
 
-            if not urls_to_crawl:
-                break
+        # One snapshot of the start page serves its links, patterns and assets
+        snapshot = await self.snapshot_page(page)
 
-        return list(crawled_urls)
+        async def extract_start_page():
+            try:
+                record(
+                    start_url,
+                    1,
+                    *await self.extract_page(page, start_url, snapshot=snapshot),
+                )
+            except Exception as e:
+                print(f"❌ Failed to process {start_url}: {str(e)}")
 
-    async def clone_website(self):
-        """Main cloning process with enhanced features"""
+        if max_depth <= 1:
+            await extract_start_page()
+            return extracted
+
+        # The crawl fans out from the start page's links while it is extracted
+        priority = LinkPriority()
+        priority.note_navigation(await self.find_patterns(page, snapshot))
+        start_links = []
+        if self.link_discovery != "static":
+            start_links = await self.find_links(page, snapshot)
+        frontier = UrlFrontier(self.output_dir / FRONTIER_FILENAME, priority)
+        crawler = PageCrawler(pool, frontier, self.links_per_page, self.budget)
+        discovery = None
+
+        async def crawl():
+            nonlocal discovery
+            if self.link_discovery != "browser":
+                print("🗺️ Discovering pages from sitemaps and static HTML...")
+                discovery = LinkDiscovery(
+                    page.context.request, start_url, budget=self.budget
+                )
+                await discovery.seed(frontier, max_depth)
+                print(
+                    f"🗺️ Found {discovery.stats['urls_added']} pages without rendering ({discovery.stats['sitemap_urls']} from sitemaps, {discovery.stats['pages_fetched']} pages fetched)"
+                )
+            await crawler.crawl(start_url, max_depth, visit, start_links=start_links)
+
+        try:
+            await asyncio.gather(extract_start_page(), crawl())
+        finally:
+            self.extraction_report["crawl"] = {
+                **frontier.stats,
+                "link_discovery": self.link_discovery,
+                "discovery": discovery.stats if discovery else None,
+                "blocked_requests": self.discovery_policy.stats,
+                "budget": self.budget.describe(),
+            }
+            self.extraction_report["rendering"] = {
+                "mode": self.render_mode,
+                **(classifier.stats if classifier else {}),
+            }
+            frontier.remove()
+        if self.budget.exhausted_by:
+            print(
+                f"⏹️ Crawl budget spent ({self.budget.exhausted_by}) after {self.budget.pages} pages"
+            )
+        return extracted
+
+    async def clone_website(self, browser=None):
+        """Main cloning process with enhanced features.
+
+        Uses the browser passed in, as batch mode does, or else connects to
+        the browser server or launches Chromium. A passed-in browser is left
+        running.
+        """
         print(f"🚀 Starting production website cloning: {self.target_url}")
         print(f"📁 Output directory: {self.output_dir}")
         print(
-            f"🔧 Configuration: headless={self.headless}, delay={self.delay}ms, depth={self.depth}"
+            f"🔧 Configuration: headless={self.headless}, delay={self.delay}ms, depth={self.depth}, parallel_pages={self.parallel_pages}, concurrency={self.scheduler.concurrency}, backend={self.fetch_backend}"
         )
 
+        self.budget.start()
+
         # Setup project structure
         await self.setup_directories()
 
-        async with async_playwright() as p:
-            # Launch browser with production settings
-            browser = await p.chromium.launch(
-                headless=self.headless,
-                args=[
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-accelerated-2d-canvas",
-                    "--no-first-run",
-                    "--no-zygote",
-                    "--disable-gpu",
-                ],
-            )
-
-            context = await browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                extra_http_headers={
-                    "Accept-Language": "en-US,en;q=0.9",
-                    "Accept-Encoding": "gzip, deflate, br",
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                },
-            )
+        if self.incremental:
+            self.load_previous_clone()
+        if self.resume:
+            self.resume_from_journal()
 
-            page = await context.new_page()
+        if browser is not None:
+            return await self.clone_in_browser(browser)
 
+        async with async_playwright() as p:
+            browser = await open_browser(p, self.browser_endpoint, self.headless)
             try:
-                # Navigate to target URL
-                print(f"🌐 Loading {self.target_url}...")
-                await page.goto(
-                    self.target_url, wait_until="networkidle", timeout=60000
-                )
-
-                # Inject enhanced extraction scripts
-                await self.inject_enhanced_extraction_script(page)
-
-                # Capture initial screenshot
-                await self.capture_screenshot(page, "preview.png")
+                return await self.clone_in_browser(browser)
+            finally:
+                await browser.close()
 
-                # Wait for dynamic content
-                await self.wait_for_dynamic_content(page)
+    async def new_context(self, browser):
+        """A browser context set up for cloning, before any page is opened"""
+        context = await browser.new_context(
+            viewport={"width": 1920, "height": 1080},
+            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            extra_http_headers=EXTRA_HTTP_HEADERS,
+        )
 
-                # Crawl multiple pages if depth > 1
-                crawled_urls = await self.crawl_multiple_pages(
-                    page, self.target_url, self.depth
-                )
+        # Start recording bodies before the first navigation
+        if self.network_capture:
+            self.network_capture.attach(context)
 
-                # Extract and download assets from all pages
-                all_assets = {}
-                all_patterns = {
-                    "modals": [],
-                    "forms": [],
-                    "banners": [],
-                    "navigation": [],
-                }
+        # Every page of the context gets the extraction functions on load
+        await register_extraction_scripts(context)
+        return context
 
-                for url in crawled_urls:
-                    try:
-                        if url != self.target_url:
-                            await page.goto(
-                                url, wait_until="networkidle", timeout=30000
-                            )
-                            await self.inject_enhanced_extraction_script(page)
+    async def clone_in_browser(self, browser):
+        """Clone in a fresh context of an already running browser"""
+        context = await self.new_context(browser)
+        page = await context.new_page()
+        self.settle.watch(page)
 
-                        # Extract assets and patterns
-                        assets = await self.extract_and_download_assets(page)
-                        patterns = await page.evaluate("window.detectUIPatterns()")
+        # Further pages for crawling and extracting several URLs at once
+        pool = PagePool(context, self.parallel_pages)
 
-                        # Merge assets and patterns
-                        for asset_type, asset_list in assets.items():
-                            if asset_type not in all_assets:
-                                all_assets[asset_type] = []
-                            all_assets[asset_type].extend(asset_list)
+        try:
+            # Navigate to target URL
+            print(f"🌐 Loading {self.target_url}...")
+            await page.goto(self.target_url, wait_until="networkidle", timeout=60000)
 
-                        for pattern_type, pattern_list in (patterns or {}).items():
-                            all_patterns[pattern_type].extend(pattern_list)
+            # Capture initial screenshot
+            await self.capture_screenshot(page, "preview.png")
 
-                    except Exception as e:
-                        print(f"❌ Failed to process {url}: {str(e)}")
-                        continue
+            # Wait for dynamic content
+            await self.wait_for_dynamic_content(page)
 
-                # Return to main page for final HTML extraction
-                await page.goto(self.target_url, wait_until="networkidle")
-                await self.inject_enhanced_extraction_script(page)
+            # Crawl and extract every page in one visit each
+            extracted = await self.crawl_multiple_pages(
+                pool, page, self.target_url, self.depth
+            )
 
-                # Extract final HTML and detect patterns
-                # Extract HTML content and patterns
-                html_content = await page.content()
+            # Merge assets and patterns from all pages
+            all_assets = {}
+            all_patterns = {
+                "modals": [],
+                "forms": [],
+                "banners": [],
+                "navigation": [],
+            }
+            for assets, patterns in extracted.values():
+                for asset_type, asset_list in assets.items():
+                    if asset_type not in all_assets:
+                        all_assets[asset_type] = []
+                    all_assets[asset_type].extend(asset_list)
 
-                # Get UI patterns through injected script
-                main_patterns = await page.evaluate("detectUIPatterns()")
-                # Merge main patterns
-                for pattern_type, pattern_list in (main_patterns or {}).items():
+                for pattern_type, pattern_list in (patterns or {}).items():
                     if pattern_type not in all_patterns:
                         all_patterns[pattern_type] = []
                     all_patterns[pattern_type].extend(pattern_list)
 
-                # Remove duplicates from patterns
-                for pattern_type in all_patterns:
-                    seen = set()
-                    unique_patterns = []
-                    for pattern in all_patterns[pattern_type]:
-                        pattern_str = json.dumps(pattern, sort_keys=True)
-                        if pattern_str not in seen:
-                            seen.add(pattern_str)
-                            unique_patterns.append(pattern)
-                    all_patterns[pattern_type] = unique_patterns
-
-                # Update extraction report
-                self.extraction_report["modals_found"] = len(all_patterns["modals"])
-                self.extraction_report["forms_found"] = len(all_patterns["forms"])
-                self.extraction_report["components_detected"] = [
-                    f"{len(all_patterns['modals'])} modals",
-                    f"{len(all_patterns['forms'])} forms",
-                    f"{len(all_patterns['banners'])} banners",
-                    f"{len(all_patterns['navigation'])} navigation components",
-                ]
-
-                # Rewrite asset paths
-                html_content = self.rewrite_asset_paths(html_content)
-
-                # Integrate APIs if enabled
-                if self.inject_apis:
-                    html_content = self.integrate_apis(html_content, all_patterns)
-
-                # Create component files
-                self.create_component_files(all_patterns)
-
-                # Create API files
-                self.create_api_files()
-
-                # Create project files
-                self.create_project_files(html_content)
-
-                # Create extraction report
-                report_path = self.create_extraction_report()
+            # The main page was never navigated away, so its HTML is final
+            html_content = await page.content()
 
-                # Create zip archive
-                zip_path = self.create_zip_archive()
+            # Remove duplicates from patterns
+            for pattern_type in all_patterns:
+                seen = set()
+                unique_patterns = []
+                for pattern in all_patterns[pattern_type]:
+                    pattern_str = json.dumps(pattern, sort_keys=True)
+                    if pattern_str not in seen:
+                        seen.add(pattern_str)
+                        unique_patterns.append(pattern)
+                all_patterns[pattern_type] = unique_patterns
+
+            # Update extraction report
+            self.extraction_report["modals_found"] = len(all_patterns["modals"])
+            self.extraction_report["forms_found"] = len(all_patterns["forms"])
+            self.extraction_report["components_detected"] = [
+                f"{len(all_patterns['modals'])} modals",
+                f"{len(all_patterns['forms'])} forms",
+                f"{len(all_patterns['banners'])} banners",
+                f"{len(all_patterns['navigation'])} navigation components",
+            ]
+
+            # Rewrite asset paths
+            html_content = self.rewrite_asset_paths(html_content)
+
+            # Integrate APIs if enabled
+            if self.inject_apis:
+                html_content = self.integrate_apis(html_content, all_patterns)
+
+            # Create component files
+            self.create_component_files(all_patterns)
+
+            # Create API files
+            self.create_api_files()
+
+            # Create project files, unless an incremental run produced the same HTML
+            html_sha256 = html_digest(html_content)
+            if (
+                self.incremental
+                and html_sha256 == self.manifest.html_sha256
+                and (self.src_dir / "App.js").exists()
+            ):
+                print("⏭️ HTML and asset mappings unchanged, keeping project files")
+                self.extraction_report["incremental"]["html_rewritten"] = False
+            else:
+                self.create_project_files(html_content)
 
-                # Final success message
-                print(f"\n🎉 Production website cloning completed successfully!")
-                print(f"📁 Output directory: {self.output_dir}")
-                print(f"📦 Archive: {zip_path}")
-                print(f"📊 Report: {report_path}")
-                print(f"\n📈 Statistics:")
-                print(
-                    f"   • Pages crawled: {len(self.extraction_report['pages_crawled'])}"
-                )
-                print(
-                    f"   • Total assets: {sum(self.extraction_report['assets'].values())}"
-                )
-                print(
-                    f"   • Project size: {self.extraction_report['total_size_mb']} MB"
-                )
-                print(
-                    f"   • APIs integrated: {len(self.extraction_report['apis_integrated'])}"
-                )
+            if self.incremental:
+                self.remove_unreferenced_assets()
+            self.write_manifest(html_sha256)
+
+            # Finished; the manifest covers what the journal was for
+            self.journal.remove()
+
+            # Drop captured bodies that no page referenced
+            if self.network_capture:
+                await self.network_capture.drain()
+                self.extraction_report["network_capture"] = self.network_capture.stats
+                self.network_capture.cleanup()
+            shutil.rmtree(self.output_dir / ".fetch_staging", ignore_errors=True)
+            self.asset_store.cleanup()
+            if self.http_cache:
+                self.http_cache.save()
+
+            # Create extraction report
+            report_path = self.create_extraction_report()
+
+            # Create zip archive off the event loop; other clones may share it
+            zip_path = await asyncio.to_thread(self.create_zip_archive)
+
+            # Final success message
+            print(f"\n🎉 Production website cloning completed successfully!")
+            print(f"📁 Output directory: {self.output_dir}")
+            print(f"📦 Archive: {zip_path}")
+            print(f"📊 Report: {report_path}")
+            print(f"\n📈 Statistics:")
+            print(f"   • Pages crawled: {len(self.extraction_report['pages_crawled'])}")
+            print(
+                f"   • Total assets: {sum(self.extraction_report['assets'].values())}"
+            )
+            if self.http_cache:
                 print(
-                    f"   • Components detected: {len(self.extraction_report['components_detected'])}"
+                    f"   • Cache: {self.http_cache.stats['revalidated']} assets reused ({self.http_cache.stats['bytes_reused'] / (1024 * 1024):.2f} MB not downloaded)"
                 )
+            print(
+                f"   • Duplicate assets: {self.asset_store.stats['duplicates']} ({self.asset_store.stats['bytes_saved'] / (1024 * 1024):.2f} MB saved)"
+            )
+            print(f"   • Project size: {self.extraction_report['total_size_mb']} MB")
+            print(
+                f"   • APIs integrated: {len(self.extraction_report['apis_integrated'])}"
+            )
+            print(
+                f"   • Components detected: {len(self.extraction_report['components_detected'])}"
+            )
 
-                return {
-                    "success": True,
-                    "output_dir": str(self.output_dir),
-                    "zip_path": str(zip_path),
-                    "report_path": str(report_path),
-                    "stats": self.extraction_report,
-                }
+            return {
+                "success": True,
+                "output_dir": str(self.output_dir),
+                "zip_path": str(zip_path),
+                "report_path": str(report_path),
+                "stats": self.extraction_report,
+            }
 
-            except Exception as e:
-                print(f"❌ Error during cloning: {str(e)}")
-                return {
-                    "success": False,
-                    "error": str(e),
-                    "output_dir": str(self.output_dir),
-                }
+        except Exception as e:
+            print(f"❌ Error during cloning: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "output_dir": str(self.output_dir),
+            }
 
-            finally:
-                await browser.close()
+        finally:
+            await pool.close()
+            await context.close()
+            self.journal.close()
+            if self.network_capture:
+                self.network_capture.cleanup()
+            self.asset_store.cleanup()
+            if self.http_cache:
+                # Keep what this run learned even if it failed part way
+                self.http_cache.save()
 
 
 def main():
@@ -2037,7 +2306,13 @@ def main():
 Examples:
   python production_website_cloner.py --url https://example.com
   python production_website_cloner.py --url https://example.com --output my_project --depth 2
+  python production_website_cloner.py --url https://example.com --depth 3 --parallel-pages 6
+  python production_website_cloner.py --url https://example.com --depth 3 --link-discovery static
+  python production_website_cloner.py --url https://example.com --depth 4 --extract-depth 2
   python production_website_cloner.py --url https://example.com --headless --no-apis
+  python production_website_cloner.py --url https://example.com --concurrency 16 --type-limit videos=2
+  python production_website_cloner.py --url https://example.com --output my_project --incremental
+  python production_website_cloner.py --url https://example.com --output my_project --resume
         """,
     )
 
@@ -2057,7 +2332,19 @@ Examples:
         "--delay",
         type=int,
         default=3000,
-        help="Delay for dynamic content loading in milliseconds (default: 3000)",
+        help="Longest wait for dynamic content to settle after load, in milliseconds (default: 3000)",
+    )
+    parser.add_argument(
+        "--settle-quiet-ms",
+        type=int,
+        default=DEFAULT_QUIET_MS,
+        help=f"Treat the page as settled once DOM and network are quiet this long (default: {DEFAULT_QUIET_MS})",
+    )
+    parser.add_argument(
+        "--max-scroll-steps",
+        type=int,
+        default=DEFAULT_MAX_SCROLL_STEPS,
+        help=f"Viewport-height scroll steps taken at most to trigger lazy loading (default: {DEFAULT_MAX_SCROLL_STEPS})",
     )
     parser.add_argument(
         "--depth",
@@ -2068,6 +2355,115 @@ Examples:
     parser.add_argument(
         "--no-apis", action="store_true", help="Disable API integration"
     )
+    parser.add_argument(
+        "--parallel-pages",
+        type=int,
+        default=DEFAULT_POOL_SIZE,
+        help=f"Pages crawled and extracted at once when --depth > 1 (default: {DEFAULT_POOL_SIZE})",
+    )
+    parser.add_argument(
+        "--links-per-page",
+        type=int,
+        help="Follow at most this many links from each crawled page, best ranked first (default: all)",
+    )
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        help="Stop crawling after this many pages (default: no limit)",
+    )
+    parser.add_argument(
+        "--max-mb",
+        type=float,
+        help="Stop crawling once this many MB of assets have been saved (default: no limit)",
+    )
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        help="Stop crawling this many seconds into the clone (default: no limit)",
+    )
+    parser.add_argument(
+        "--link-discovery",
+        choices=LINK_DISCOVERY_MODES,
+        default="browser",
+        help="Find crawl links in rendered pages, in sitemaps and raw HTML fetched without rendering, or both (default: browser)",
+    )
+    parser.add_argument(
+        "--extract-depth",
+        type=int,
+        help="Download assets only from pages up to this depth; deeper pages are visited for links and UI patterns with heavy resources blocked (default: all pages)",
+    )
+    parser.add_argument(
+        "--discovery-block",
+        default=",".join(DEFAULT_BLOCKED_TYPES),
+        metavar="TYPES",
+        help="Resource types aborted on links-only visits, comma-separated, or 'none' (default: image,media,font); known trackers are always blocked there",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum number of assets downloaded at once (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--type-limit",
+        action="append",
+        default=[],
+        metavar="TYPE=N",
+        help="Per-asset-type download limit, e.g. --type-limit videos=2 (repeatable)",
+    )
+    parser.add_argument(
+        "--fetch-backend",
+        choices=FETCH_BACKENDS,
+        default="page",
+        help="How assets are fetched: in-page fetch() or the browser context's request client (default: page)",
+    )
+    parser.add_argument(
+        "--network-capture",
+        action="store_true",
+        help="Save asset bodies as the browser loads them and only fetch what was never seen",
+    )
+    parser.add_argument(
+        "--stream-threshold-mb",
+        type=float,
+        default=DEFAULT_STREAM_THRESHOLD / (1024 * 1024),
+        help="Write assets of at least this size in chunks instead of in one go (default: 8)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Keep asset bodies here across runs and revalidate them instead of re-downloading",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_CACHE_MAX_BYTES / (1024 * 1024),
+        help="Evict least recently used cache entries beyond this size (default: 512)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Update an earlier clone in --output in place, fetching only new or changed assets",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted clone in --output, skipping assets it already saved",
+    )
+    parser.add_argument(
+        "--render",
+        choices=RENDER_MODES,
+        default="auto",
+        help="auto: render only crawled pages whose HTML needs JavaScript, always: render every page (default: auto)",
+    )
+    parser.add_argument(
+        "--dom-extraction",
+        choices=EXTRACTION_MODES,
+        default="snapshot",
+        help="snapshot: read rendered pages from one DevTools DOM snapshot, scripts: run the injected extraction functions (default: snapshot)",
+    )
+    parser.add_argument(
+        "--browser-endpoint",
+        help=f"Connect to a running browser_server.py here instead of launching Chromium (default: ${ENDPOINT_ENV})",
+    )
     parser.add_argument(
         "--verbose", "-v", action="store_true", help="Enable verbose output"
     )
@@ -2079,9 +2475,65 @@ Examples:
         print("❌ Error: URL must start with http:// or https://")
         return 1
 
+    if args.settle_quiet_ms < 0:
+        print("❌ Error: --settle-quiet-ms can't be negative")
+        return 1
+
+    if args.max_scroll_steps < 0:
+        print("❌ Error: --max-scroll-steps can't be negative")
+        return 1
+
+    if args.concurrency < 1:
+        print("❌ Error: --concurrency must be at least 1")
+        return 1
+
+    if args.parallel_pages < 1:
+        print("❌ Error: --parallel-pages must be at least 1")
+        return 1
+
+    if args.links_per_page is not None and args.links_per_page < 1:
+        print("❌ Error: --links-per-page must be at least 1")
+        return 1
+
+    if args.max_pages is not None and args.max_pages < 1:
+        print("❌ Error: --max-pages must be at least 1")
+        return 1
+
+    if args.max_mb is not None and args.max_mb <= 0:
+        print("❌ Error: --max-mb must be greater than 0")
+        return 1
+
+    if args.max_seconds is not None and args.max_seconds <= 0:
+        print("❌ Error: --max-seconds must be greater than 0")
+        return 1
+
+    if args.extract_depth is not None and args.extract_depth < 1:
+        print("❌ Error: --extract-depth must be at least 1")
+        return 1
+
+    try:
+        discovery_blocked_types = parse_blocked_types(args.discovery_block)
+    except ValueError as e:
+        print(f"❌ Error: {str(e)}")
+        return 1
+
+    try:
+        type_limits = parse_type_limits(args.type_limit)
+    except ValueError as e:
+        print(f"❌ Error: {str(e)}")
+        return 1
+
+    if args.stream_threshold_mb <= 0:
+        print("❌ Error: --stream-threshold-mb must be greater than 0")
+        return 1
+
+    if args.cache_max_mb <= 0:
+        print("❌ Error: --cache-max-mb must be greater than 0")
+        return 1
+
     # Create output directory path
     output_path = Path(args.output)
-    if output_path.exists():
+    if output_path.exists() and not (args.incremental or args.resume):
         response = input(
             f"⚠️  Directory '{output_path}' already exists. Overwrite? (y/N): "
         )
@@ -2098,6 +2550,28 @@ Examples:
         delay=args.delay,
         depth=args.depth,
         inject_apis=not args.no_apis,
+        concurrency=args.concurrency,
+        type_limits=type_limits,
+        network_capture=args.network_capture,
+        fetch_backend=args.fetch_backend,
+        stream_threshold=int(args.stream_threshold_mb * 1024 * 1024),
+        cache_dir=args.cache_dir,
+        cache_max_bytes=int(args.cache_max_mb * 1024 * 1024),
+        incremental=args.incremental,
+        resume=args.resume,
+        parallel_pages=args.parallel_pages,
+        links_per_page=args.links_per_page,
+        link_discovery=args.link_discovery,
+        extract_depth=args.extract_depth,
+        discovery_blocked_types=discovery_blocked_types,
+        settle_quiet_ms=args.settle_quiet_ms,
+        max_scroll_steps=args.max_scroll_steps,
+        browser_endpoint=args.browser_endpoint,
+        render_mode=args.render,
+        max_pages=args.max_pages,
+        max_bytes=int(args.max_mb * 1024 * 1024) if args.max_mb else None,
+        max_seconds=args.max_seconds,
+        dom_extraction=args.dom_extraction,
     )
 
     # Run the cloning process
@@ -2117,6 +2591,7 @@ Examples:
 
     except KeyboardInterrupt:
         print("\n⚠️  Operation cancelled by user")
+        print("   Run again with --resume to keep the assets downloaded so far")
         return 1
     except Exception as e:
         print(f"\n❌ Unexpected error: {str(e)}")
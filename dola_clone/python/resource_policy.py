@@ -0,0 +1,117 @@
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+
+# Playwright's request.resource_type values
+RESOURCE_TYPES = (
+    "document",
+    "stylesheet",
+    "image",
+    "media",
+    "font",
+    "script",
+    "texttrack",
+    "xhr",
+    "fetch",
+    "eventsource",
+    "websocket",
+    "manifest",
+    "other",
+)
+
+# Heavy resources a page's links and DOM structure don't depend on.
+# Stylesheets stay: pattern detection reads computed visibility.
+DEFAULT_BLOCKED_TYPES = ("image", "media", "font")
+
+# Analytics, ad and session-recording hosts, matched with their subdomains
+TRACKER_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "facebook.net",
+    "connect.facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "amplitude.com",
+    "fullstory.com",
+    "newrelic.com",
+    "nr-data.net",
+    "sentry.io",
+    "intercom.io",
+    "tiktok.com",
+    "analytics.twitter.com",
+    "bat.bing.com",
+    "yandex.ru",
+)
+
+
+class ResourcePolicy:
+    """Which requests a discovery-only visit aborts, applied with page.route.
+
+    Routing disables the browser's HTTP cache for the page, so the policy
+    is only attached around visits that don't capture assets and removed
+    again afterwards.
+    """
+
+    def __init__(
+        self, blocked_types=DEFAULT_BLOCKED_TYPES, blocked_domains=TRACKER_DOMAINS
+    ):
+        self.blocked_types = set(blocked_types)
+        self.blocked_domains = tuple(blocked_domains)
+        self.stats = {"allowed": 0, "blocked": 0, "blocked_trackers": 0}
+
+    def is_tracker(self, url):
+        host = urlsplit(url).hostname or ""
+        return any(
+            host == domain or host.endswith("." + domain)
+            for domain in self.blocked_domains
+        )
+
+    def should_block(self, request):
+        # The page itself always loads, whatever else is blocked
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            return False
+        return request.resource_type in self.blocked_types or self.is_tracker(
+            request.url
+        )
+
+    async def handle(self, route):
+        request = route.request
+        if not self.should_block(request):
+            self.stats["allowed"] += 1
+            await route.continue_()
+            return
+
+        self.stats["blocked"] += 1
+        if self.is_tracker(request.url):
+            self.stats["blocked_trackers"] += 1
+        await route.abort("blockedbyclient")
+
+    @asynccontextmanager
+    async def applied(self, page):
+        """Block per this policy for the duration of the block"""
+        await page.route("**/*", self.handle)
+        try:
+            yield page
+        finally:
+            try:
+                await page.unroute("**/*", self.handle)
+            except Exception:
+                # The page was closed during the visit
+                pass
+
+
+def parse_blocked_types(value):
+    """Parse a CLI value like "image,media,font"; "none" blocks nothing"""
+    if value.strip().lower() == "none":
+        return ()
+    blocked = tuple(part.strip().lower() for part in value.split(",") if part.strip())
+    for resource_type in blocked:
+        if resource_type not in RESOURCE_TYPES:
+            raise ValueError(f"Unknown resource type '{resource_type}'")
+    return blocked
@@ -0,0 +1,90 @@
+import time
+
+from page_settle import SettleDetector
+
+
+# Viewport-height steps taken at most on endless pages
+DEFAULT_MAX_SCROLL_STEPS = 100
+
+# Longest wait after each step for the content it triggered
+STEP_WAIT_MS = 1000
+
+# Steps at the bottom without new height or requests before stopping
+STABLE_STEPS = 2
+
+SCROLL_STATE_SCRIPT = """
+() => ({
+    y: window.scrollY,
+    viewport: window.innerHeight,
+    height: Math.max(
+        document.documentElement.scrollHeight,
+        document.body ? document.body.scrollHeight : 0
+    ),
+})
+"""
+
+
+class ScrollDriver:
+    """Scroll a page one viewport at a time until lazy content stops arriving.
+
+    After each step the driver waits only until the requests and DOM
+    changes that step triggered have settled. It stops once it sits at
+    the bottom and neither the scroll height nor the request count moves,
+    so a short page costs no steps and an infinite list keeps loading
+    until it runs out or max_steps is reached. stats adds up every
+    scrolled page.
+    """
+
+    def __init__(self, settle=None, max_steps=DEFAULT_MAX_SCROLL_STEPS):
+        self.settle = settle or SettleDetector()
+        self.max_steps = max_steps
+        self.stats = {
+            "pages": 0,
+            "steps": 0,
+            "requests": 0,
+            "capped": 0,
+        }
+
+    async def scroll(self, page):
+        """Scroll to the end and back to the top; returns what it took"""
+        activity = self.settle.watch(page)
+        state = await page.evaluate(SCROLL_STATE_SCRIPT)
+        requests_before = activity.requests
+        steps = 0
+        stable = 0
+
+        while steps < self.max_steps and stable < STABLE_STEPS:
+            height = state["height"]
+            requests = activity.requests
+            at_bottom = state["y"] + state["viewport"] >= height - 1
+            if at_bottom and steps == 0:
+                # Nothing below the fold
+                break
+
+            await page.evaluate("window.scrollBy(0, window.innerHeight)")
+            scrolled = time.monotonic()
+            steps += 1
+            await self.settle.wait(page, STEP_WAIT_MS, since=scrolled)
+            state = await page.evaluate(SCROLL_STATE_SCRIPT)
+
+            at_bottom = state["y"] + state["viewport"] >= state["height"] - 1
+            if at_bottom and state["height"] == height and activity.requests == requests:
+                stable += 1
+            else:
+                stable = 0
+
+        result = {
+            "steps": steps,
+            "height": state["height"],
+            "requests": activity.requests - requests_before,
+            "capped": steps >= self.max_steps,
+        }
+        self.stats["pages"] += 1
+        self.stats["steps"] += steps
+        self.stats["requests"] += result["requests"]
+        self.stats["capped"] += result["capped"]
+
+        if steps:
+            await page.evaluate("window.scrollTo(0, 0)")
+            await self.settle.wait(page, STEP_WAIT_MS)
+        return result
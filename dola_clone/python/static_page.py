@@ -0,0 +1,370 @@
+import re
+from urllib.parse import urljoin, urlsplit
+
+from bs4 import BeautifulSoup, NavigableString
+
+from host_concurrency import HostConcurrency, classify_status
+
+
+# "auto" renders only pages that need JavaScript; "always" renders every page
+RENDER_MODES = ("auto", "always")
+
+# A scripted page with less text and fewer elements than this is an empty shell
+MIN_TEXT_CHARS = 200
+MIN_BODY_ELEMENTS = 10
+
+# Elements frameworks mount their application into
+MOUNT_POINT_IDS = ("root", "app", "__next", "__nuxt", "___gatsby", "svelte")
+
+# Markup only client-side frameworks leave behind
+SPA_MARKERS = (
+    ("__NEXT_DATA__", "Next.js"),
+    ("window.__NUXT__", "Nuxt"),
+    ("ng-version", "Angular"),
+    ("data-reactroot", "React"),
+    ("data-v-app", "Vue"),
+    ("data-server-rendered", "Vue"),
+    ("data-sveltekit", "SvelteKit"),
+    ("ember-application", "Ember"),
+)
+
+NOSCRIPT_HINTS = ("enable javascript", "javascript is required", "requires javascript")
+
+# Elements whose content never shows up as page text
+NON_CONTENT_ELEMENTS = ["script", "style", "noscript", "template"]
+
+# Same selectors as detectUIPatterns in extraction_scripts.py
+MODAL_SELECTOR = (
+    '[class*="modal"], [id*="modal"], .popup, .dialog, [role="dialog"], '
+    '[aria-modal="true"], .overlay, [class*="popup"], [class*="dialog"]'
+)
+BANNER_SELECTOR = (
+    '[class*="banner"], [class*="slider"], [class*="carousel"], [class*="hero"], '
+    '[class*="swiper"], [id*="banner"], [id*="slider"], [id*="carousel"]'
+)
+NAVIGATION_SELECTOR = 'nav, [role="navigation"], .navbar, .menu'
+
+CSS_URL = re.compile(r"url\s*\(\s*['\"]?([^'\"\)]+)['\"]?\s*\)", re.IGNORECASE)
+FONT_URL = re.compile(
+    r"url\s*\(\s*['\"]?([^'\"\)]+\.(woff2?|ttf|otf|eot))['\"]?\s*\)", re.IGNORECASE
+)
+STYLE_PROPERTY = r"(?:^|;)\s*{}\s*:\s*([^;]+)"
+
+
+def render_reason(html, soup=None):
+    """Why html needs a browser to show its content, or None if it doesn't
+
+    soup, when given, is html already parsed; it is left unchanged.
+    """
+    for marker, framework in SPA_MARKERS:
+        if marker in html:
+            return f"{framework} marker"
+
+    if soup is None:
+        soup = BeautifulSoup(html, "html.parser")
+    body = soup.body or soup
+    has_scripts = soup.find("script") is not None
+
+    for noscript in body.find_all("noscript"):
+        if any(hint in noscript.get_text(" ").lower() for hint in NOSCRIPT_HINTS):
+            return "noscript asks for JavaScript"
+
+    for mount_id in MOUNT_POINT_IDS:
+        mount = body.find(id=mount_id)
+        if mount is not None and not mount.get_text(strip=True):
+            return f"empty #{mount_id} mount point"
+
+    if not has_scripts:
+        return None
+    text = " ".join(
+        string.strip()
+        for string in body.find_all(string=True)
+        # Comments, doctypes and the like are NavigableString subclasses
+        if type(string) is NavigableString
+        and string.strip()
+        and string.find_parent(NON_CONTENT_ELEMENTS) is None
+    )
+    elements = [
+        element
+        for element in body.find_all(True)
+        if element.name not in NON_CONTENT_ELEMENTS
+        and element.find_parent(NON_CONTENT_ELEMENTS) is None
+    ]
+    if len(text) < MIN_TEXT_CHARS and len(elements) < MIN_BODY_ELEMENTS:
+        return "empty body without JavaScript"
+
+    return None
+
+
+def class_names(element):
+    return " ".join(element.get("class", []))
+
+
+def style_property(element, name, default):
+    match = re.search(STYLE_PROPERTY.format(name), element.get("style", ""), re.I)
+    return match.group(1).strip() if match else default
+
+
+def absolute(page_url, value):
+    return urljoin(page_url, value.strip()) if value else ""
+
+
+def extract_assets(soup, page_url):
+    """The assets extractAllAssets() would report, read from static markup.
+
+    Backgrounds come from style attributes and fonts from <style> blocks;
+    url()s inside external stylesheets are only seen on rendered pages.
+    """
+    assets = {
+        "images": [],
+        "stylesheets": [],
+        "scripts": [],
+        "fonts": [],
+        "videos": [],
+        "other": [],
+        "inline_styles": [],
+        "background_images": [],
+    }
+
+    for img in soup.find_all("img", src=True):
+        url = absolute(page_url, img["src"])
+        if url and not url.startswith("data:"):
+            assets["images"].append(
+                {
+                    "url": url,
+                    "alt": img.get("alt", ""),
+                    "width": int(img["width"]) if img.get("width", "").isdigit() else 0,
+                    "height": (
+                        int(img["height"]) if img.get("height", "").isdigit() else 0
+                    ),
+                    "element": "img",
+                    "classes": class_names(img),
+                    "loading": img.get("loading", "eager"),
+                }
+            )
+
+    for link in soup.find_all("link", href=True):
+        if "stylesheet" in [rel.lower() for rel in link.get("rel", [])]:
+            assets["stylesheets"].append(
+                {
+                    "url": absolute(page_url, link["href"]),
+                    "media": link.get("media", "all"),
+                    "integrity": link.get("integrity", ""),
+                    "crossorigin": link.get("crossorigin", ""),
+                }
+            )
+
+    for script in soup.find_all("script", src=True):
+        assets["scripts"].append(
+            {
+                "url": absolute(page_url, script["src"]),
+                "type": script.get("type", "text/javascript"),
+                "async": script.has_attr("async"),
+                "defer": script.has_attr("defer"),
+                "integrity": script.get("integrity", ""),
+            }
+        )
+
+    for style in soup.find_all("style"):
+        content = style.string or style.get_text()
+        if content.strip():
+            assets["inline_styles"].append(
+                {"content": content, "media": style.get("media", "all")}
+            )
+            for match in FONT_URL.finditer(content):
+                assets["fonts"].append(
+                    {"url": absolute(page_url, match.group(1)), "format": match.group(2)}
+                )
+
+    for element in soup.find_all(style=CSS_URL):
+        if "background" not in element["style"].lower():
+            continue
+        for match in CSS_URL.finditer(element["style"]):
+            assets["background_images"].append(
+                {
+                    "url": absolute(page_url, match.group(1)),
+                    "element": element.name,
+                    "classes": class_names(element),
+                    "id": element.get("id", ""),
+                }
+            )
+
+    for media in soup.find_all(["video", "audio", "source"], src=True):
+        assets["videos"].append(
+            {
+                "url": absolute(page_url, media["src"]),
+                "type": media.get("type", ""),
+                "element": media.name,
+            }
+        )
+
+    for asset_type, asset_list in assets.items():
+        seen = set()
+        unique = []
+        for asset in asset_list:
+            key = asset.get("url") or asset.get("content")
+            if key not in seen:
+                seen.add(key)
+                unique.append(asset)
+        assets[asset_type] = unique
+
+    return assets
+
+
+def detect_ui_patterns(soup, page_url):
+    """The patterns detectUIPatterns() would report, read from static markup.
+
+    Visibility, z-index and position come from inline styles only.
+    """
+    patterns = {
+        "modals": [],
+        "forms": [],
+        "banners": [],
+        "navigation": [],
+        "buttons": [],
+        "inputs": [],
+    }
+
+    for modal in soup.select(MODAL_SELECTOR):
+        display = style_property(modal, "display", "")
+        visibility = style_property(modal, "visibility", "")
+        patterns["modals"].append(
+            {
+                "element": modal.name.upper(),
+                "classes": class_names(modal),
+                "id": modal.get("id", ""),
+                "visible": not modal.has_attr("hidden")
+                and display != "none"
+                and visibility != "hidden",
+                "zIndex": style_property(modal, "z-index", "auto"),
+                "position": style_property(modal, "position", "static"),
+            }
+        )
+
+    for form in soup.find_all("form"):
+        inputs = form.find_all(["input", "textarea", "select"])
+        buttons = form.find_all("button") + form.find_all("input", type="submit")
+        patterns["forms"].append(
+            {
+                "action": absolute(page_url, form.get("action")) or page_url,
+                "method": form.get("method", "get").lower(),
+                "id": form.get("id", ""),
+                "classes": class_names(form),
+                "inputs": [
+                    {
+                        "type": (
+                            field.get("type", "text").lower()
+                            if field.name == "input"
+                            else field.name
+                        ),
+                        "name": field.get("name", ""),
+                        "placeholder": field.get("placeholder", ""),
+                        "required": field.has_attr("required"),
+                        "id": field.get("id", ""),
+                        "classes": class_names(field),
+                    }
+                    for field in inputs
+                ],
+                "buttons": [
+                    {
+                        "type": button.get("type", "submit").lower(),
+                        "text": button.get_text(strip=True) or button.get("value", ""),
+                        "classes": class_names(button),
+                    }
+                    for button in buttons
+                ],
+            }
+        )
+
+    for banner in soup.select(BANNER_SELECTOR):
+        patterns["banners"].append(
+            {
+                "element": banner.name.upper(),
+                "classes": class_names(banner),
+                "id": banner.get("id", ""),
+                "images": [
+                    absolute(page_url, img["src"])
+                    for img in banner.find_all("img", src=True)
+                ],
+            }
+        )
+
+    for nav in soup.select(NAVIGATION_SELECTOR):
+        patterns["navigation"].append(
+            {
+                "element": nav.name.upper(),
+                "classes": class_names(nav),
+                "id": nav.get("id", ""),
+                "links": [
+                    {
+                        "href": absolute(page_url, link["href"]),
+                        "text": link.get_text(strip=True),
+                        "classes": class_names(link),
+                    }
+                    for link in nav.find_all("a", href=True)
+                ],
+            }
+        )
+
+    return patterns
+
+
+class StaticPageClassifier:
+    """Fetch pages over plain HTTP and keep those that don't need a browser.
+
+    Pages are fetched through the browser context's request client, so
+    cookies are shared, with an adaptive concurrency limit per host.
+    """
+
+    def __init__(self, request_context, timeout=15000):
+        self.request = request_context
+        self.timeout = timeout
+        self.hosts = HostConcurrency()
+        self.stats = {"static": 0, "rendered": 0, "reasons": {}}
+
+    def count(self, reason):
+        self.stats["rendered"] += 1
+        self.stats["reasons"][reason] = self.stats["reasons"].get(reason, 0) + 1
+
+    async def fetch(self, url):
+        """(final url, html), or None when the page isn't plain HTML"""
+        started = await self.hosts.acquire(url)
+        outcome = "throttled"
+        try:
+            response = await self.request.get(
+                url, timeout=self.timeout, fail_on_status_code=False
+            )
+            try:
+                outcome = classify_status(response.status)
+                content_type = response.headers.get("content-type", "")
+                if not response.ok or "html" not in content_type.lower():
+                    return None
+                return response.url, await response.text()
+            finally:
+                await response.dispose()
+        except Exception:
+            return None
+        finally:
+            self.hosts.release(url, started, outcome)
+
+    async def classify(self, url):
+        """{"url", "html", "soup"} for a page that can skip the browser, else None"""
+        if urlsplit(url).fragment.startswith(("/", "!/")):
+            # The server never sees the route; only the browser can show it
+            self.count("hash route")
+            return None
+
+        fetched = await self.fetch(url)
+        if not fetched:
+            self.count("fetch failed")
+            return None
+
+        final_url, html = fetched
+        soup = BeautifulSoup(html, "html.parser")
+        reason = render_reason(html, soup)
+        if reason:
+            self.count(reason)
+            return None
+
+        self.stats["static"] += 1
+        return {"url": final_url, "html": html, "soup": soup}
@@ -2,7 +2,6 @@ import asyncio
 import os
 import json
 import re
-import base64
 import argparse
 import shutil
 from datetime import datetime
@@ -17,6 +16,28 @@ import requests
 from PIL import Image
 import io
 
+from asset_fetcher import (
+    FETCH_BACKENDS,
+    PageBatchFetcher,
+    RequestContextFetcher,
+    fetch_assets_concurrently,
+    fetch_assets_in_page,
+    iter_page_stream,
+)
+from network_capture import NetworkCapture
+from host_concurrency import summarize_hosts
+from http_cache import DEFAULT_CACHE_MAX_BYTES, HttpCache
+from page_settle import DEFAULT_QUIET_MS, SettleDetector
+from browser_server import ENDPOINT_ENV, open_browser
+from extraction_scripts import register_extraction_scripts
+from scroll_driver import DEFAULT_MAX_SCROLL_STEPS, ScrollDriver
+from asset_storage import (
+    DEFAULT_STREAM_THRESHOLD,
+    ContentStore,
+    write_base64,
+    write_chunks_async,
+)
+
 # Load environment variables
 load_dotenv()
 
@@ -28,6 +49,14 @@ class StaticProductionCloner:
         headless=True,
         delay=3000,
         depth=1,
+        network_capture=False,
+        fetch_backend="page",
+        stream_threshold=DEFAULT_STREAM_THRESHOLD,
+        cache_dir=None,
+        cache_max_bytes=DEFAULT_CACHE_MAX_BYTES,
+        settle_quiet_ms=DEFAULT_QUIET_MS,
+        max_scroll_steps=DEFAULT_MAX_SCROLL_STEPS,
+        browser_endpoint=None,
     ):
         self.target_url = target_url
         self.output_dir = Path(output_dir)
@@ -36,6 +65,34 @@ class StaticProductionCloner:
         self.depth = depth
         self.crawled_urls = set()
 
+        # A running browser server to use instead of launching Chromium
+        self.browser_endpoint = browser_endpoint
+
+        # Waits for dynamic content end once the page has been quiet this long
+        self.settle = SettleDetector(settle_quiet_ms)
+        self.scroll_driver = ScrollDriver(self.settle, max_scroll_steps)
+
+        # "page" fetches inside the page, "request" uses the context's request client
+        if fetch_backend not in FETCH_BACKENDS:
+            raise ValueError(f"Unknown fetch backend: {fetch_backend}")
+        self.fetch_backend = fetch_backend
+
+        # Assets at or above this size are written in chunks, never held whole
+        self.stream_threshold = stream_threshold
+
+        # Asset bodies kept across runs and revalidated instead of re-downloaded
+        self.http_cache = HttpCache(cache_dir, cache_max_bytes) if cache_dir else None
+
+        # Passive capture of response bodies seen during navigation
+        self.network_capture = (
+            NetworkCapture(
+                self.output_dir / ".network_capture",
+                stream_threshold=stream_threshold,
+            )
+            if network_capture
+            else None
+        )
+
         # Static directory structure
         self.css_dir = self.output_dir / "css"
         self.js_dir = self.output_dir / "js"
@@ -46,6 +103,10 @@ class StaticProductionCloner:
         # Asset tracking
         self.downloaded_assets = {}
         self.asset_mappings = {}
+
+        # One file per distinct body; URLs serving the same bytes share it
+        self.asset_store = ContentStore(self.output_dir / ".asset_staging")
+
         self.extraction_report = {
             "url": target_url,
             "timestamp": datetime.now().isoformat(),
@@ -61,6 +122,13 @@ class StaticProductionCloner:
             "modals_found": 0,
             "forms_found": 0,
             "total_size_mb": 0,
+            "streamed_assets": 0,
+            "largest_asset_bytes": 0,
+            "asset_store": self.asset_store.stats,
+            "http_cache": self.http_cache.stats if self.http_cache else None,
+            "hosts": {},
+            "settle": self.settle.stats,
+            "scroll": self.scroll_driver.stats,
         }
 
     async def setup_directories(self):
@@ -79,189 +147,6 @@ class StaticProductionCloner:
 
         print(f"✅ Created static website structure in {self.output_dir}")
 
-    async def inject_enhanced_extraction_script(self, page):
-        """Inject comprehensive asset extraction and UI detection script"""
-        extraction_script = r"""
-        window.extractAllAssets = function() {
-            const assets = {
-                images: [],
-                stylesheets: [],
-                scripts: [],
-                fonts: [],
-                videos: [],
-                other: [],
-                inline_styles: [],
-                background_images: []
-            };
-            
-            // Extract images with better metadata
-            document.querySelectorAll('img').forEach(img => {
-                if (img.src && !img.src.startsWith('data:')) {
-                    assets.images.push({
-                        url: img.src,
-                        alt: img.alt || '',
-                        width: img.naturalWidth || img.width,
-                        height: img.naturalHeight || img.height,
-                        element: 'img',
-                        classes: img.className,
-                        loading: img.loading || 'eager'
-                    });
-                }
-            });
-            
-            // Extract stylesheets
-            document.querySelectorAll('link[rel="stylesheet"]').forEach(link => {
-                assets.stylesheets.push({
-                    url: link.href,
-                    media: link.media || 'all',
-                    integrity: link.integrity || '',
-                    crossorigin: link.crossOrigin || ''
-                });
-            });
-            
-            // Extract scripts
-            document.querySelectorAll('script[src]').forEach(script => {
-                assets.scripts.push({
-                    url: script.src,
-                    type: script.type || 'text/javascript',
-                    async: script.async,
-                    defer: script.defer,
-                    integrity: script.integrity || ''
-                });
-            });
-            
-            // Extract inline styles
-            document.querySelectorAll('style').forEach(style => {
-                if (style.textContent.trim()) {
-                    assets.inline_styles.push({
-                        content: style.textContent,
-                        media: style.media || 'all'
-                    });
-                }
-            });
-            
-            // Extract fonts from CSS
-            const extractFontsFromCSS = (cssText, baseUrl) => {
-                const fontRegex = /url\s*\(\s*['"]*([^'"\)]+\.(woff2?|ttf|otf|eot))['"]*\s*\)/gi;
-                let match;
-                while ((match = fontRegex.exec(cssText)) !== null) {
-                    try {
-                        const fontUrl = new URL(match[1], baseUrl).href;
-                        assets.fonts.push({url: fontUrl, format: match[2]});
-                    } catch (e) {}
-                }
-            };
-            
-            // Process stylesheets for fonts
-            Array.from(document.styleSheets).forEach(sheet => {
-                try {
-                    Array.from(sheet.cssRules || sheet.rules).forEach(rule => {
-                        if (rule.cssText) {
-                            extractFontsFromCSS(rule.cssText, sheet.href || window.location.href);
-                        }
-                    });
-                } catch (e) {}
-            });
-            
-            // Process inline styles for fonts
-            assets.inline_styles.forEach(style => {
-                extractFontsFromCSS(style.content, window.location.href);
-            });
-            
-            // Extract background images
-            document.querySelectorAll('*').forEach(el => {
-                const style = window.getComputedStyle(el);
-                if (style.backgroundImage && style.backgroundImage !== 'none') {
-                    const matches = style.backgroundImage.match(/url\s*\(\s*['"]?([^'"\)]+)['"]?\s*\)/g);
-                    if (matches) {
-                        matches.forEach(match => {
-                            const urlMatch = match.match(/url\s*\(\s*['"]?([^'"\)]+)['"]?\s*\)/);
-                            if (urlMatch) {
-                                try {
-                                    const url = new URL(urlMatch[1], window.location.href).href;
-                                    assets.background_images.push({
-                                        url: url,
-                                        element: el.tagName.toLowerCase(),
-                                        classes: el.className,
-                                        id: el.id
-                                    });
-                                } catch (e) {}
-                            }
-                        });
-                    }
-                }
-            });
-            
-            // Extract videos and audio
-            document.querySelectorAll('video, audio, source').forEach(media => {
-                if (media.src) {
-                    assets.videos.push({
-                        url: media.src,
-                        type: media.type || '',
-                        element: media.tagName.toLowerCase()
-                    });
-                }
-            });
-            
-            // Remove duplicates
-            Object.keys(assets).forEach(key => {
-                if (Array.isArray(assets[key])) {
-                    const seen = new Set();
-                    assets[key] = assets[key].filter(item => {
-                        const url = item.url || item.content;
-                        if (seen.has(url)) return false;
-                        seen.add(url);
-                        return true;
-                    });
-                }
-            });
-            
-            return assets;
-        };
-        
-        // Enhanced asset download with retry logic
-        window.downloadAssetAsBase64 = async function(url, retries = 3) {
-            for (let i = 0; i < retries; i++) {
-                try {
-                    const response = await fetch(url, {
-                        mode: 'cors',
-                        credentials: 'omit'
-                    });
-                    
-                    if (!response.ok) {
-                        throw new Error(`HTTP ${response.status}`);
-                    }
-                    
-                    const blob = await response.blob();
-                    return new Promise((resolve) => {
-                        const reader = new FileReader();
-                        reader.onloadend = () => resolve({
-                            success: true,
-                            data: reader.result,
-                            contentType: blob.type,
-                            size: blob.size,
-                            url: url
-                        });
-                        reader.onerror = () => resolve({
-                            success: false,
-                            error: 'FileReader error',
-                            url: url
-                        });
-                        reader.readAsDataURL(blob);
-                    });
-                } catch (error) {
-                    if (i === retries - 1) {
-                        return {success: false, error: error.message, url: url};
-                    }
-                    await new Promise(resolve => setTimeout(resolve, 1000 * (i + 1)));
-                }
-            }
-        };
-        """
-
-        await page.evaluate(extraction_script)
-        print("✅ Enhanced extraction script injected")
-
     async def capture_screenshot(self, page, filename="preview.png"):
         """Capture screenshot of the page"""
         try:
@@ -277,28 +162,19 @@ class StaticProductionCloner:
         """Enhanced dynamic content loading"""
         print("⏳ Waiting for dynamic content...")
 
-        # Wait for initial load
-        await page.wait_for_load_state("networkidle", timeout=30000)
-        await asyncio.sleep(self.delay / 1000)
-
-        # Enhanced scrolling for lazy loading
-        scroll_positions = [0.25, 0.5, 0.75, 1.0]
-        for position in scroll_positions:
-            await page.evaluate(
-                f"""
-                window.scrollTo(0, document.body.scrollHeight * {position});
-            """
-            )
-            await asyncio.sleep(1)
+        # Wait for initial load, at most self.delay
+        await self.settle.wait(page, self.delay)
 
-        # Scroll back to top
-        await page.evaluate("window.scrollTo(0, 0);")
-        await asyncio.sleep(1)
+        # Scroll one viewport at a time until lazy loading stops
+        scroll = await self.scroll_driver.scroll(page)
+        print(f"  📜 Scrolled {scroll['steps']} steps, {scroll['requests']} lazy requests")
 
         # Wait for any final network requests
-        await page.wait_for_load_state("networkidle", timeout=10000)
+        await self.settle.wait(page, 10000)
 
-        print("✅ Dynamic content loading completed")
+        print(
+            f"✅ Dynamic content loading completed ({self.settle.stats['waited_ms'] / 1000:.1f}s spent waiting for the page to settle)"
+        )
 
     async def extract_and_download_assets(self, page):
         """Enhanced asset extraction with progress tracking"""
@@ -317,54 +193,180 @@ class StaticProductionCloner:
 
         print(f"📊 Found {total_assets} assets to download")
 
-        # Download each asset type
+        # Save inline styles and queue every URL once for the batch fetch
+        queued = {}
         for asset_type, asset_list in assets.items():
             if not asset_list or not isinstance(asset_list, list):
                 continue
 
-            print(f"📥 Downloading {len(asset_list)} {asset_type}...")
-
             for i, asset in enumerate(asset_list):
+                if asset_type == "inline_styles":
+                    # Handle inline styles separately
+                    await self.save_inline_style(asset, i)
+                    downloaded_count += 1
+                    continue
+
+                url = asset.get("url")
+                if url and url not in queued:
+                    queued[url] = (asset_type, asset)
+
+        # Save bodies already recorded on the wire without fetching them again
+        if self.network_capture:
+            await self.network_capture.drain()
+            captured_count = 0
+            for url, (asset_type, asset) in queued.items():
+                captured = self.network_capture.take(url)
+                if not captured:
+                    continue
+
+                if self.http_cache:
+                    self.http_cache.store_capture(url, captured)
+                saved_path = await self.save_asset_file(
+                    url,
+                    captured["path"],
+                    asset_type,
+                    captured["content_type"],
+                    {"sha256": captured["sha256"], "size": captured["size"]},
+                )
+                if saved_path:
+                    total_size += captured["size"]
+                    downloaded_count += 1
+                    captured_count += 1
+                    self.extraction_report["assets"][
+                        self.get_asset_category(asset_type)
+                    ] += 1
+
+            print(f"📡 {captured_count} assets taken from the network capture")
+
+        # Revalidate bodies cached by earlier runs; a 304 costs no body bytes
+        if self.http_cache:
+            revalidated = await self.http_cache.revalidate_all(
+                page.context.request,
+                [url for url in queued if url not in self.downloaded_assets],
+                self.output_dir / ".fetch_staging",
+                stream_threshold=self.stream_threshold,
+            )
+            for url, result in revalidated.items():
+                asset_type, asset = queued[url]
+                saved_path = await self.save_asset_file(
+                    url,
+                    result["path"],
+                    asset_type,
+                    result["contentType"],
+                    {"sha256": result["sha256"], "size": result["size"]},
+                )
+                if saved_path:
+                    total_size += result["size"]
+                    downloaded_count += 1
+                    self.extraction_report["assets"][
+                        self.get_asset_category(asset_type)
+                    ] += 1
+
+            print(f"♻️ {len(revalidated)} assets served from the cache")
+
+        stats = {"round_trips": 0}
+        batch_items = [
+            {"url": url, "type": asset_type}
+            for url, (asset_type, _) in queued.items()
+            if url not in self.downloaded_assets
+        ]
+        fetcher = None
+        if self.fetch_backend == "request":
+            # The in-page path stays available for URLs the request client can't get
+            fetcher = RequestContextFetcher(
+                page,
+                self.output_dir / ".fetch_staging",
+                fallback=PageBatchFetcher(page, stream_threshold=self.stream_threshold),
+                stream_threshold=self.stream_threshold,
+            )
+            fetcher.prefetch([(item["url"], item["type"]) for item in batch_items])
+            stats = fetcher.stats
+            print(f"📥 Downloading {len(batch_items)} assets with the request client...")
+            results = fetch_assets_concurrently(
+                fetcher, [item["url"] for item in batch_items]
+            )
+        else:
+            print(f"📥 Downloading {len(batch_items)} assets in one batch...")
+            results = fetch_assets_in_page(
+                page,
+                batch_items,
+                stats=stats,
+                stream_threshold=self.stream_threshold,
+            )
+
+        try:
+            async for result in results:
+                url = result.get("url")
+                asset_type, asset = queued.get(url, ("other", {"url": url}))
                 try:
-                    if asset_type == "inline_styles":
-                        # Handle inline styles separately
-                        await self.save_inline_style(asset, i)
-                        downloaded_count += 1
+                    if not result["success"]:
+                        print(f"  ❌ Failed: {url} - {result['error']}")
                         continue
 
-                    # Download asset
-                    result = await page.evaluate(
-                        "window.downloadAssetAsBase64(arguments[0])", asset["url"]
-                    )
+                    if self.http_cache:
+                        # Keep a copy for the next run; the result now points at a file
+                        result = await self.http_cache.materialize(
+                            result,
+                            self.http_cache.next_staging_path(self.output_dir / ".fetch_staging"),
+                            chunks=iter_page_stream(page, result) if result.get("streamId") else None,
+                            stream_threshold=self.stream_threshold,
+                        )
 
-                    if result["success"]:
+                    if result.get("path"):
+                        # Already on disk, written by the request backend
+                        saved_path = await self.save_asset_file(
+                            url,
+                            result["path"],
+                            asset_type,
+                            result["contentType"],
+                            {"sha256": result["sha256"], "size": result["size"]},
+                        )
+                    elif result.get("streamId"):
+                        # Too large to hand over in one piece; read it out of the page in chunks
+                        saved_path = await self.save_asset_stream(
+                            url,
+                            iter_page_stream(page, result),
+                            asset_type,
+                            result["contentType"],
+                        )
+                    else:
                         # Save asset
                         saved_path = await self.save_asset(
-                            asset["url"],
+                            url,
                             result["data"],
                             asset_type,
                             result["contentType"],
                             asset,
                         )
 
-                        if saved_path:
-                            total_size += result["size"]
-                            downloaded_count += 1
-                            self.extraction_report["assets"][
-                                self.get_asset_category(asset_type)
-                            ] += 1
-
-                            # Progress indicator
-                            progress = (downloaded_count / total_assets) * 100
-                            print(
-                                f"  📦 {downloaded_count}/{total_assets} ({progress:.1f}%) - {os.path.basename(saved_path)}"
-                            )
-                    else:
-                        print(f"  ❌ Failed: {asset['url']} - {result['error']}")
+                    if saved_path:
+                        total_size += result["size"]
+                        downloaded_count += 1
+                        self.extraction_report["assets"][
+                            self.get_asset_category(asset_type)
+                        ] += 1
+
+                        # Progress indicator
+                        progress = (downloaded_count / total_assets) * 100
+                        print(
+                            f"  📦 {downloaded_count}/{total_assets} ({progress:.1f}%) - {os.path.basename(saved_path)}"
+                        )
+                        if downloaded_count % 10 == 0 and stats.get("hosts"):
+                            print(f"  🌐 Hosts: {summarize_hosts(stats['hosts'])}")
 
                 except Exception as e:
-                    print(f"  ❌ Error downloading {asset.get('url', 'unknown')}: {str(e)}")
+                    print(f"  ❌ Error downloading {url}: {str(e)}")
                     continue
+        finally:
+            if fetcher:
+                await fetcher.close()
+
+        print(f"  🔁 {stats['round_trips']} browser round trips for {len(batch_items)} assets")
+        self.extraction_report["fetch_backend"] = self.fetch_backend
+        self.extraction_report["hosts"].update(stats.get("hosts", {}))
+        self.extraction_report["fetch_fallbacks"] = (
+            self.extraction_report.get("fetch_fallbacks", 0) + stats.get("fallbacks", 0)
+        )
 
         self.extraction_report["total_size_mb"] = round(total_size / (1024 * 1024), 2)
         print(f"✅ Downloaded {downloaded_count} assets ({self.extraction_report['total_size_mb']} MB)")
@@ -391,72 +393,104 @@ class StaticProductionCloner:
     ):
         """Save asset to appropriate directory"""
         try:
-            # Determine file extension and directory
-            parsed_url = urlparse(url)
-            original_filename = os.path.basename(parsed_url.path)
-            
-            # Get file extension from URL or content type
-            if "." in original_filename:
-                file_ext = os.path.splitext(original_filename)[1]
-            else:
-                file_ext = self.get_extension_from_content_type(content_type)
-                original_filename = f"asset_{hash(url) % 10000}{file_ext}"
-
-            # Determine target directory
-            if asset_type in ["stylesheets", "inline_styles"]:
-                target_dir = self.css_dir
-                category = "css"
-            elif asset_type in ["scripts"]:
-                target_dir = self.js_dir
-                category = "js"
-            elif asset_type in ["images", "background_images"]:
-                target_dir = self.images_dir
-                category = "images"
-            elif asset_type in ["fonts"]:
-                target_dir = self.fonts_dir
-                category = "fonts"
-            elif asset_type in ["videos"]:
-                target_dir = self.videos_dir
-                category = "videos"
-            else:
-                target_dir = self.output_dir
-                category = "other"
-
-            # Create unique filename if exists
-            file_path = target_dir / original_filename
-            counter = 1
-            while file_path.exists():
-                name, ext = os.path.splitext(original_filename)
-                file_path = target_dir / f"{name}_{counter}{ext}"
-                counter += 1
-
-            # Decode and save file
-            if base64_data.startswith("data:"):
-                # Remove data URL prefix
-                base64_content = base64_data.split(",", 1)[1]
-                file_content = base64.b64decode(base64_content)
-            else:
-                file_content = base64.b64decode(base64_data)
-
-            with open(file_path, "wb") as f:
-                f.write(file_content)
-
-            # Store mapping for HTML rewriting
-            relative_path = f"{category}/{file_path.name}"
-            self.asset_mappings[url] = relative_path
-            self.downloaded_assets[url] = {
-                "local_path": str(file_path),
-                "relative_path": relative_path,
-                "size": len(file_content),
-                "content_type": content_type,
-            }
+            # Decode and save file; large payloads are written chunk by chunk
+            staging_path = self.asset_store.staging_path()
+            written = write_base64(staging_path, base64_data, self.stream_threshold)
+
+            return await self.save_asset_file(
+                url, staging_path, asset_type, content_type, written
+            )
+
+        except Exception as e:
+            print(f"❌ Failed to save asset {url}: {str(e)}")
+            return None
 
+    async def save_asset_stream(self, url, chunks, asset_type, content_type):
+        """Write an asset from an async iterator of chunks"""
+        staging_path = self.asset_store.staging_path()
+        try:
+            written = await write_chunks_async(staging_path, chunks)
+        except Exception as e:
+            # Don't leave a truncated file behind
+            staging_path.unlink(missing_ok=True)
+            print(f"❌ Failed to save asset {url}: {str(e)}")
+            return None
+
+        return await self.save_asset_file(
+            url, staging_path, asset_type, content_type, written
+        )
+
+    async def save_asset_file(self, url, source_path, asset_type, content_type, written):
+        """Move a body already written to disk into the content store"""
+        try:
+            target_dir, filename, category = self.get_asset_target(
+                url, asset_type, content_type
+            )
+            file_path = self.asset_store.commit(
+                source_path, target_dir, filename, written
+            )
+            self.record_saved_asset(url, file_path, category, content_type, written)
             return file_path
 
         except Exception as e:
             print(f"❌ Failed to save asset {url}: {str(e)}")
             return None
 
+    def get_asset_target(self, url, asset_type, content_type):
+        """Pick the directory, preferred filename and report category for an asset"""
+        # Determine file extension and directory
+        parsed_url = urlparse(url)
+        original_filename = os.path.basename(parsed_url.path)
+        
+        # Get file extension from URL or content type
+        if "." in original_filename:
+            file_ext = os.path.splitext(original_filename)[1]
+        else:
+            file_ext = self.get_extension_from_content_type(content_type)
+            original_filename = f"asset_{hash(url) % 10000}{file_ext}"
+
+        # Determine target directory
+        if asset_type in ["stylesheets", "inline_styles"]:
+            target_dir = self.css_dir
+            category = "css"
+        elif asset_type in ["scripts"]:
+            target_dir = self.js_dir
+            category = "js"
+        elif asset_type in ["images", "background_images"]:
+            target_dir = self.images_dir
+            category = "images"
+        elif asset_type in ["fonts"]:
+            target_dir = self.fonts_dir
+            category = "fonts"
+        elif asset_type in ["videos"]:
+            target_dir = self.videos_dir
+            category = "videos"
+        else:
+            target_dir = self.output_dir
+            category = "other"
+
+        # Name collisions between different bodies are settled by the store
+        return target_dir, original_filename, category
+
+    def record_saved_asset(self, url, file_path, category, content_type, written):
+        """Store mapping for HTML rewriting"""
+        # Shared bodies keep the directory they were first stored in
+        relative_path = file_path.relative_to(self.output_dir).as_posix()
+        self.asset_mappings[url] = relative_path
+        self.downloaded_assets[url] = {
+            "local_path": str(file_path),
+            "relative_path": relative_path,
+            "size": written["size"],
+            "sha256": written["sha256"],
+            "content_type": content_type,
+        }
+
+        if written.get("streamed"):
+            self.extraction_report["streamed_assets"] += 1
+        self.extraction_report["largest_asset_bytes"] = max(
+            self.extraction_report["largest_asset_bytes"], written["size"]
+        )
+
     def get_extension_from_content_type(self, content_type):
         """Get file extension from content type"""
         content_type_map = {
@@ -591,9 +625,11 @@ class StaticProductionCloner:
         print(f"🚀 Starting static website cloning: {self.target_url}")
         
         async with async_playwright() as p:
-            # Launch browser
-            browser = await p.chromium.launch(
-                headless=self.headless,
+            # Connect to the browser server, or launch a browser
+            browser = await open_browser(
+                p,
+                self.browser_endpoint,
+                self.headless,
                 args=[
                     "--no-sandbox",
                     "--disable-setuid-sandbox",
@@ -613,15 +649,20 @@ class StaticProductionCloner:
                     user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
                 )
                 
+                # Start recording bodies before the first navigation
+                if self.network_capture:
+                    self.network_capture.attach(context)
+                
+                # Every page of the context gets the extraction functions on load
+                await register_extraction_scripts(context)
+                
                 page = await context.new_page()
+                self.settle.watch(page)
                 
                 # Navigate to target URL
                 print(f"🌐 Loading: {self.target_url}")
                 await page.goto(self.target_url, wait_until="networkidle", timeout=60000)
                 
-                # Inject extraction scripts
-                await self.inject_enhanced_extraction_script(page)
-                
                 # Wait for dynamic content
                 await self.wait_for_dynamic_content(page)
                 
@@ -644,6 +685,16 @@ class StaticProductionCloner:
                 
                 print(f"💾 Main HTML saved: {index_path}")
                 
+                # Drop captured bodies that no page referenced
+                if self.network_capture:
+                    await self.network_capture.drain()
+                    self.extraction_report["network_capture"] = self.network_capture.stats
+                    self.network_capture.cleanup()
+                shutil.rmtree(self.output_dir / ".fetch_staging", ignore_errors=True)
+                self.asset_store.cleanup()
+                if self.http_cache:
+                    self.http_cache.save()
+                
                 # Create extraction report
                 self.create_extraction_report()
                 
@@ -659,6 +710,9 @@ class StaticProductionCloner:
                 print(f"   - Images: {self.extraction_report['assets']['images']}")
                 print(f"   - Fonts: {self.extraction_report['assets']['fonts']}")
                 print(f"   - Total size: {self.extraction_report['total_size_mb']} MB")
+                if self.http_cache:
+                    print(f"   - Cache: {self.http_cache.stats['revalidated']} reused ({self.http_cache.stats['bytes_reused'] / (1024 * 1024):.2f} MB not downloaded)")
+                print(f"   - Duplicates: {self.asset_store.stats['duplicates']} ({self.asset_store.stats['bytes_saved'] / (1024 * 1024):.2f} MB saved)")
                 print(f"\n📖 Usage: Open {self.output_dir}/index.html in your browser")
                 
                 return True
@@ -668,6 +722,12 @@ class StaticProductionCloner:
                 return False
             finally:
                 await browser.close()
+                if self.network_capture:
+                    self.network_capture.cleanup()
+                self.asset_store.cleanup()
+                if self.http_cache:
+                    # Keep what this run learned even if it failed part way
+                    self.http_cache.save()
 
 def main():
     parser = argparse.ArgumentParser(description="Static Production Website Cloner")
@@ -687,7 +747,50 @@ def main():
         "--delay", 
         type=int, 
         default=3000,
-        help="Delay in milliseconds for dynamic content loading"
+        help="Longest wait in milliseconds for dynamic content to settle after load"
+    )
+    parser.add_argument(
+        "--settle-quiet-ms",
+        type=int,
+        default=DEFAULT_QUIET_MS,
+        help="Treat the page as settled once DOM and network are quiet this long"
+    )
+    parser.add_argument(
+        "--max-scroll-steps",
+        type=int,
+        default=DEFAULT_MAX_SCROLL_STEPS,
+        help="Viewport-height scroll steps taken at most to trigger lazy loading"
+    )
+    parser.add_argument(
+        "--browser-endpoint",
+        help=f"Connect to a running browser_server.py here instead of launching Chromium (default: ${ENDPOINT_ENV})"
+    )
+    parser.add_argument(
+        "--fetch-backend",
+        choices=FETCH_BACKENDS,
+        default="page",
+        help="How assets are fetched: in-page fetch() or the browser context's request client"
+    )
+    parser.add_argument(
+        "--network-capture",
+        action="store_true",
+        help="Save asset bodies as the browser loads them and only fetch what was never seen"
+    )
+    parser.add_argument(
+        "--stream-threshold-mb",
+        type=float,
+        default=DEFAULT_STREAM_THRESHOLD / (1024 * 1024),
+        help="Write assets of at least this size in chunks instead of in one go"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Keep asset bodies here across runs and revalidate them instead of re-downloading"
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_CACHE_MAX_BYTES / (1024 * 1024),
+        help="Evict least recently used cache entries beyond this size"
     )
     
     args = parser.parse_args()
@@ -709,7 +812,15 @@ def main():
         target_url=args.url,
         output_dir=args.output,
         headless=args.headless,
-        delay=args.delay
+        delay=args.delay,
+        network_capture=args.network_capture,
+        fetch_backend=args.fetch_backend,
+        stream_threshold=int(args.stream_threshold_mb * 1024 * 1024),
+        cache_dir=args.cache_dir,
+        cache_max_bytes=int(args.cache_max_mb * 1024 * 1024),
+        settle_quiet_ms=args.settle_quiet_ms,
+        max_scroll_steps=args.max_scroll_steps,
+        browser_endpoint=args.browser_endpoint
     )
     
     try:
@@ -0,0 +1,237 @@
+import re
+import sqlite3
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+FRONTIER_FILENAME = ".crawl_frontier.sqlite"
+
+# Query parameters that only track where a visitor came from
+TRACKING_PARAMS = {
+    "gclid",
+    "fbclid",
+    "msclkid",
+    "dclid",
+    "yclid",
+    "_ga",
+    "_gl",
+    "mc_cid",
+    "mc_eid",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+# Directory index files served for the directory URL itself
+INDEX_FILES = {"index.html", "index.htm", "index.php"}
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Links a site puts in its navigation rank half a crawl level higher
+NAVIGATION_BONUS = 500
+
+# Listing, archive and utility URLs that add little a clone needs
+LOW_VALUE_URL = re.compile(
+    r"/page/\d+(/|$)"
+    r"|/(tag|tags|author|archive|archives|feed|search|login|logout|cart)(/|$)"
+    r"|/\d{4}/\d{2}(/|$)"
+    r"|[?&](page|p|sort|order|orderby|filter|replytocom)=",
+    re.IGNORECASE,
+)
+LOW_VALUE_PENALTY = 300
+
+
+def canonicalize_path(path):
+    """Collapse duplicate slashes and dot segments, drop index files and trailing slashes"""
+    segments = []
+    for segment in path.split("/"):
+        if segment in ("", "."):
+            continue
+        if segment == "..":
+            if segments:
+                segments.pop()
+            continue
+        segments.append(segment)
+
+    if segments and segments[-1].lower() in INDEX_FILES:
+        segments.pop()
+    return "/" + "/".join(segments)
+
+
+def canonicalize_url(url):
+    """The key two URLs share when they load the same page.
+
+    Scheme and host are lowercased, default ports dropped, paths
+    normalized, tracking parameters removed and the rest sorted. Plain
+    fragments are dropped; hash routes ("#/about", "#!/about") select a
+    page in single-page apps, so they are kept and normalized like paths.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{port}"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS
+        and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+
+    fragment = ""
+    if parts.fragment.startswith(("/", "!/")):
+        prefix = "!" if parts.fragment.startswith("!") else ""
+        route = canonicalize_path(parts.fragment.lstrip("!"))
+        if route != "/":
+            fragment = prefix + route
+
+    return urlunsplit(
+        (scheme, netloc, canonicalize_path(parts.path), urlencode(query), fragment)
+    )
+
+
+def default_priority(url, depth):
+    """Lower runs first: shallow crawl depth, then short paths, then no query"""
+    parts = urlsplit(url)
+    segments = len([segment for segment in parts.path.split("/") if segment])
+    return depth * 1000 + segments * 10 + (5 if parts.query else 0)
+
+
+class LinkPriority:
+    """default_priority, adjusted for where a link sits on the site.
+
+    Links seen in a page's navigation (detectUIPatterns().navigation) move
+    up; pagination, archive and other low-value URLs move down.
+    """
+
+    def __init__(self):
+        self.navigation = set()
+
+    def note_navigation(self, patterns):
+        """Remember the navigation links of a visited page's UI patterns"""
+        for navigation in (patterns or {}).get("navigation", []):
+            for link in navigation.get("links", []):
+                if link.get("href"):
+                    self.navigation.add(canonicalize_url(link["href"]))
+
+    def __call__(self, url, depth):
+        priority = default_priority(url, depth)
+        if canonicalize_url(url) in self.navigation:
+            priority -= NAVIGATION_BONUS
+        if LOW_VALUE_URL.search(url):
+            priority += LOW_VALUE_PENALTY
+        return priority
+
+
+class UrlFrontier:
+    """Crawl queue and seen-set kept in SQLite, so large crawls stay out of memory.
+
+    Every URL is stored under its canonical form; adding a URL whose
+    canonical form was seen before is a no-op, except that a queued URL
+    found again with a better priority moves up. pop() hands out the queued
+    URL with the lowest priority value, ties broken by discovery order.
+    """
+
+    def __init__(self, path=FRONTIER_FILENAME, priority=default_priority):
+        self.path = Path(path)
+        self.priority = priority
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Each crawl starts from an empty frontier
+        self.delete_files()
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute(
+            """
+            CREATE TABLE urls (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE NOT NULL,
+                url TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                priority REAL NOT NULL,
+                state TEXT NOT NULL DEFAULT 'queued'
+            )
+            """
+        )
+        self.db.execute("CREATE INDEX urls_queue ON urls (state, priority, seq)")
+        self.stats = {
+            "seen": 0,
+            "duplicates": 0,
+            "queued": 0,
+            "visited": 0,
+            "failed": 0,
+        }
+
+    def add(self, url, depth):
+        """Queue url unless its canonical form was seen; True when it is new"""
+        return self.add_many([url], depth) == 1
+
+    def add_many(self, urls, depth):
+        """Queue several URLs found at the same depth; returns how many were new"""
+        added = 0
+        with self.db:
+            for url in urls:
+                key = canonicalize_url(url)
+                priority = self.priority(url, depth)
+                cursor = self.db.execute(
+                    "INSERT OR IGNORE INTO urls (key, url, depth, priority) VALUES (?, ?, ?, ?)",
+                    (key, url, depth, priority),
+                )
+                added += cursor.rowcount
+                if not cursor.rowcount:
+                    self.db.execute(
+                        "UPDATE urls SET priority = MIN(priority, ?), depth = MIN(depth, ?) WHERE key = ? AND state = 'queued' AND (priority > ? OR depth > ?)",
+                        (priority, depth, key, priority, depth),
+                    )
+
+        self.stats["seen"] += added
+        self.stats["queued"] += added
+        self.stats["duplicates"] += len(urls) - added
+        return added
+
+    def pop(self):
+        """Take the next queued (url, depth), or None when the queue is empty"""
+        row = self.db.execute(
+            "SELECT seq, url, depth FROM urls WHERE state = 'queued' ORDER BY priority, seq LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+
+        with self.db:
+            self.db.execute("UPDATE urls SET state = 'active' WHERE seq = ?", (row[0],))
+        self.stats["queued"] -= 1
+        return row[1], row[2]
+
+    def mark(self, url, state):
+        """Record that url was "visited" or "failed", popped or not"""
+        key = canonicalize_url(url)
+        row = self.db.execute("SELECT state FROM urls WHERE key = ?", (key,)).fetchone()
+        with self.db:
+            self.db.execute("UPDATE urls SET state = ? WHERE key = ?", (state, key))
+        if row and row[0] == "queued":
+            self.stats["queued"] -= 1
+        self.stats[state] += 1
+
+    def seen(self, url):
+        return (
+            self.db.execute(
+                "SELECT 1 FROM urls WHERE key = ?", (canonicalize_url(url),)
+            ).fetchone()
+            is not None
+        )
+
+    def close(self):
+        self.db.close()
+
+    def remove(self):
+        """Close and delete the frontier once the crawl is done"""
+        self.close()
+        self.delete_files()
+
+    def delete_files(self):
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{self.path}{suffix}").unlink(missing_ok=True)